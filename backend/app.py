@@ -1,23 +1,63 @@
-from flask import Flask, request, jsonify, send_from_directory
+from flask import (Flask, Request, Response, request, jsonify, g, has_request_context,
+                   stream_with_context)
 from flask_cors import CORS
 import pandas as pd
 import numpy as np
 import os
+import json
+import hashlib
+import gzip
+import uuid
 import logging
 import re
+import csv
+import codecs
 import time
+import operator
+import functools
+import itertools
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from datetime import datetime
 from werkzeug.utils import secure_filename
+from werkzeug.wsgi import ClosingIterator, FileWrapper
 import matplotlib.pyplot as plt
 import seaborn as sns
 import io
 import base64
 import warnings
+import shutil
+import posixpath
+import tempfile
+import zipfile
+from collections import OrderedDict
 warnings.filterwarnings('ignore')
 
+class DataWashRequest(Request):
+    """Requests whose body limit depends on the route: only the upload routes accept large bodies"""
+
+    @property
+    def max_content_length(self):
+        if self.endpoint == 'upload_file':
+            return app.config['UPLOAD_MAX_CONTENT_LENGTH']
+        if self.endpoint == 'upload_chunk':
+            return app.config['UPLOAD_CHUNK_MAX_MB'] * 1024 * 1024
+        return super().max_content_length
+
 app = Flask(__name__)
+app.request_class = DataWashRequest
 CORS(app)
 
+@app.before_request
+def reject_oversized_body():
+    """Refuse a declared body over the route's limit before a handler reads it"""
+    limit = request.max_content_length
+    if limit is not None and request.content_length is not None and request.content_length > limit:
+        return jsonify({'error': f'Request body of {request.content_length} bytes exceeds the {limit} byte limit for {request.path}'}), 413
+    return None
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -32,38 +72,490 @@ logger = logging.getLogger(__name__)
 # Configuration
 UPLOAD_FOLDER = 'uploads'
 ALLOWED_EXTENSIONS = {'csv', 'xlsx', 'xls'}
+COMPRESSED_EXTENSIONS = {'gz': 'gzip', 'zst': 'zstd', 'zip': 'zip'}  # CSV exports may arrive compressed or zipped
 app.config['UPLOAD_FOLDER'] = UPLOAD_FOLDER
-app.config['MAX_CONTENT_LENGTH'] = 100 * 1024 * 1024  # 100MB max file size
+app.config['MAX_CONTENT_LENGTH'] = 100 * 1024 * 1024  # 100MB max request body
+app.config['UPLOAD_MAX_CONTENT_LENGTH'] = 8 * 1024 * 1024 * 1024  # 8GB max file size on /api/upload (large CSVs are handled out of core)
+app.config['STREAMING_CHUNK_ROWS'] = 50000  # Rows parsed per chunk in streaming ingest
+app.config['STREAMING_THRESHOLD_MB'] = 10  # CSV files at least this large are parsed in chunks
+app.config['PROGRESSIVE_LOAD'] = True  # Publish the first rows of large background uploads for preview before the full parse
+app.config['PROGRESSIVE_MIN_MB'] = 5  # Uploads at least this large (uncompressed) are loaded progressively
+app.config['PROVISIONAL_ROWS'] = 1000  # Rows in the provisional frame shown while the full parse runs
+app.config['SCHEMA_SNIFFING'] = True  # Infer CSV dialect and column types from a sample before the full parse
+app.config['SNIFF_SAMPLE_MB'] = 4  # Leading bytes of a CSV file read by the schema sniffer
+app.config['CSV_PARSE_ENGINE'] = 'auto'  # 'pandas', 'pyarrow' (multithreaded) or 'auto' (pyarrow when installed)
+app.config['COMPACT_DTYPES'] = True  # Downcast numerics and categorize text columns at load time
+app.config['CATEGORY_MAX_UNIQUE_RATIO'] = 0.5  # Text columns below this unique/rows ratio become categorical
+app.config['DATETIME_DETECTION_WORKERS'] = os.cpu_count() or 1  # Processes used for datetime detection (read when the pool starts)
+app.config['DATETIME_PARALLEL_MIN_COLUMNS'] = 16  # Fewer candidate columns than this are detected serially
+app.config['DATETIME_PARALLEL_MIN_CELLS'] = 500000  # Smaller frames (rows x candidate columns) stay serial
+app.config['SNAPSHOT_FOLDER'] = os.path.join(UPLOAD_FOLDER, 'snapshots')  # Feather snapshots of parsed/cleaned data
+app.config['SNAPSHOTS_ENABLED'] = True  # Snapshot after upload and after every mutating operation
+app.config['RESTORE_SNAPSHOT_ON_START'] = True  # After a restart, sessions reload their last snapshot on first use
+app.config['PARSED_CACHE_ENABLED'] = True  # Reuse the parsed frame when identical file content is re-uploaded
+app.config['PARSED_CACHE_MAX_ENTRIES'] = 8  # Parsed frames kept on disk (least recently used are evicted)
+app.config['PARSED_CACHE_MAX_MB'] = 4096  # Total on-disk size budget for cached parsed frames
+app.config['UPLOAD_JOB_WORKERS'] = 1  # Background upload jobs run one at a time so datasets load in order
+app.config['UPLOAD_JOB_HISTORY'] = 50  # Finished upload jobs kept for status queries
+app.config['CHUNKED_UPLOAD_FOLDER'] = os.path.join(UPLOAD_FOLDER, 'partial')  # Resumable uploads being received
+app.config['UPLOAD_CHUNK_MB'] = 8  # Default chunk size for resumable uploads
+app.config['UPLOAD_CHUNK_MAX_MB'] = 64  # Largest chunk accepted in one request
+app.config['CHUNKED_UPLOAD_MAX_GB'] = 32  # Largest file accepted through resumable uploads
+app.config['CHUNKED_UPLOAD_EXPIRY_HOURS'] = 24  # Unfinished resumable uploads are deleted after this long
+app.config['SESSION_MEMORY_BUDGET_MB'] = 2048  # In-memory datasets across all sessions before LRU sessions spill to disk
+app.config['SESSION_IDLE_SPILL_MINUTES'] = 30  # Sessions idle this long are spilled to disk regardless of the budget
+app.config['SESSION_EVICT_MINUTES'] = 240  # Spilled sessions idle this long are dropped from memory entirely (restored from disk on use)
+app.config['OUT_OF_CORE_THRESHOLD_MB'] = 512  # CSV uploads at least this large are kept on disk as partitions
+app.config['OUT_OF_CORE_PARTITION_ROWS'] = 500000  # Rows per on-disk partition in out-of-core mode
+app.config['DATA_PAGE_ROWS'] = 100  # Rows returned by /api/data when no limit is given
+app.config['DATA_PAGE_MAX_ROWS'] = 10000  # Largest page /api/data will format and return
+app.config['NDJSON_BATCH_ROWS'] = 5000  # Rows formatted and sent per line of a streamed NDJSON response
+app.config['ARROW_BATCH_ROWS'] = 65536  # Rows per record batch of an Arrow IPC stream response
+app.config['RESULT_CACHE_ENABLED'] = True  # Reuse analysis responses while the data version is unchanged
+app.config['RESULT_CACHE_MAX_MB'] = 256  # Memory cap for cached analysis responses (least recently used are evicted)
+
+DEFAULT_SESSION_ID = 'default'
+
+class DatasetSession:
+    """Dataset, operation log and caches belonging to one client session"""
+
+    def __init__(self, session_id):
+        self.session_id = session_id
+        self.data = None
+        self.filename = None
+        self.operations = []  # Track all cleaning operations performed
+
+        # Caching variables for data preview
+        self.preview_cache = None
+        self.preview_cache_version = None
+
+        # Bumped by every mutation; with the token (new per server process) it is the data's ETag
+        self.version = 0
+        self.version_token = uuid.uuid4().hex[:12]
+
+        # Per-column statistics ((kind, column) -> value) kept until their column or the rows change
+        self.column_stats = {}
+        self.column_versions = {}  # Bumped for each column an edit touches
+        self.rows_version = 0  # Bumped by edits that affect every column (row removal, reloads)
+        self.correlation_matrix = None  # Correlations of the columns not touched since they were computed
+
+        # Progress of the most recent file ingest (polled via /api/upload-progress)
+        self.ingest_progress = {
+            'status': 'idle',
+            'filename': None,
+            'rows_parsed': 0,
+            'bytes_parsed': 0,
+            'total_bytes': 0
+        }
+
+        # First rows of an upload still being parsed, served by the preview endpoints until the full frame lands
+        self.provisional = None
+        self.provisional_total_rows = None
+
+        self.snapshot_folder = os.path.join(app.config['SNAPSHOT_FOLDER'], 'sessions', session_id)
+        self.upload_folder = os.path.join(app.config['UPLOAD_FOLDER'], 'sessions', session_id)
+        self.out_of_core = None  # PartitionedDataset when the dataset is too large to hold in memory
+        self.lock = threading.RLock()
+        self.last_access = time.time()
+        self.active_requests = 0
+        self.dirty = False  # Data changed since the last successful snapshot
+        self.spilled = False  # Data lives only in the session's snapshot until next use
+        self.evicted = False  # Dropped from the session store; requests must look the session up again
+        self._memory_bytes = None
+
+    def clear_derived(self):
+        """Drop caches computed from the data (the data itself is unchanged)"""
+        self.preview_cache = None
+        self.preview_cache_version = None
+        self._memory_bytes = None
+
+    def data_changed(self, columns=None):
+        """
+        Drop everything derived from the data after a mutation and move to a
+        new version. columns lists the columns the mutation touched; None
+        (rows removed, a new dataset, ...) marks every column dirty. Column
+        statistics survive for the columns that were not touched.
+        """
+        self.clear_derived()
+        self.version += 1
+        self.dirty = True
+        result_cache.invalidate(self.session_id)
+
+        if columns is None:
+            self.rows_version += 1
+            self.column_stats = {}
+            self.correlation_matrix = None
+            return
+        dirty = set(columns)
+        for column in dirty:
+            self.column_versions[column] = self.column_versions.get(column, 0) + 1
+        self.column_stats = {key: value for key, value in self.column_stats.items() if key[1] not in dirty}
+        if self.correlation_matrix is not None:
+            stale = [column for column in self.correlation_matrix.columns if column in dirty]
+            self.correlation_matrix = self.correlation_matrix.drop(index=stale, columns=stale)
+
+    def column_stamp(self, column):
+        """Changes whenever the column's values may have changed"""
+        return (self.rows_version, self.column_versions.get(column, 0))
+
+    def memory_bytes(self):
+        """In-memory size of the dataset, cached until the data changes"""
+        if self.data is None:
+            return 0
+        if self._memory_bytes is None:
+            self._memory_bytes = int(self.data.memory_usage(deep=True).sum())
+        return self._memory_bytes
+
+class SessionStore:
+    """
+    Registry of DatasetSessions keyed by session id. Keeps the combined size
+    of in-memory datasets under SESSION_MEMORY_BUDGET_MB by spilling least
+    recently used (and long idle) sessions to their Feather snapshot; a
+    spilled session is memory-mapped back in on its next request. Sessions
+    idle for SESSION_EVICT_MINUTES are dropped altogether and rebuilt from
+    disk when used again.
+
+    A session's active_requests is only changed under session.lock, the lock
+    spill and evict hold while they check it, so a request can never start
+    on a session whose data is being spilled.
+    """
+
+    def __init__(self):
+        self.sessions = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, session_id, acquire=False):
+        """Return the session for session_id, creating or reloading it as needed"""
+        while True:
+            session = self._lookup(session_id)
+            with session.lock:
+                if session.evicted:
+                    # Evicted between the lookup and the lock - a fresh session is rebuilt from disk
+                    continue
+                if acquire:
+                    session.active_requests += 1
+                spilled = session.spilled
+            break
+
+        if spilled:
+            self.reload(session)
+            self.enforce_budget()
+        return session
+
+    def _lookup(self, session_id):
+        """Find or create the session object for session_id and mark it as used"""
+        with self.lock:
+            session = self.sessions.get(session_id)
+            if session is None:
+                session = DatasetSession(session_id)
+                # A snapshot left by a previous server process is picked up lazily
+                if app.config['RESTORE_SNAPSHOT_ON_START']:
+                    out_of_core_folder = os.path.join(session.snapshot_folder, OUT_OF_CORE_FOLDER)
+                    if os.path.exists(os.path.join(out_of_core_folder, PartitionedDataset.MANIFEST)):
+                        session.out_of_core = PartitionedDataset.load(out_of_core_folder)
+                        session.filename = session.out_of_core.filename
+                        session.operations = list(session.out_of_core.operations)
+                    elif os.path.exists(snapshot_paths(CURRENT_SNAPSHOT, session.snapshot_folder)[0]):
+                        session.spilled = True
+                self.sessions[session_id] = session
+            self.sessions.move_to_end(session_id)
+            session.last_access = time.time()
+            return session
+
+    def release(self, session):
+        """Mark a request on the session as finished and re-check the memory budget"""
+        with session.lock:
+            session.active_requests = max(0, session.active_requests - 1)
+            session.last_access = time.time()
+        self.enforce_budget()
+
+    def reload(self, session):
+        """Bring a spilled session's dataset back from its snapshot"""
+        with session.lock:
+            if not session.spilled:
+                return
+            try:
+                start_time = time.time()
+                df, meta = read_snapshot(CURRENT_SNAPSHOT, folder=session.snapshot_folder)
+                session.data = df
+                if session.filename is None:
+                    session.filename = meta.get('filename')
+                    session.operations = list(meta.get('operations', []))
+                logger.info(f"✅ Reloaded session {session.session_id} {df.shape} in {time.time() - start_time:.2f}s")
+            except Exception as e:
+                logger.error(f"❌ Could not reload session {session.session_id}: {str(e)}")
+                session.data = None
+            session.clear_derived()
+            session.dirty = False
+            session.spilled = False
 
-# Global variable to store current dataset
-current_data = None
-current_filename = None
-cleaning_operations = []  # Track all cleaning operations performed
+    def spill(self, session):
+        """Write a session's dataset to its snapshot (if needed) and free the memory"""
+        with session.lock:
+            if session.data is None or session.active_requests:
+                return False
+            if session.dirty and not write_snapshot(session.data, CURRENT_SNAPSHOT, {
+                'filename': session.filename,
+                'operations': session.operations
+            }, folder=session.snapshot_folder):
+                return False
+            session.data = None
+            session.clear_derived()
+            session.dirty = False
+            session.spilled = True
+            logger.info(f"💤 Spilled session {session.session_id} to disk")
+            return True
 
-# Caching variables for data preview
-preview_cache = None
-preview_cache_hash = None
+    def evict(self, session):
+        """
+        Drop an idle session whose dataset is safely on disk (or that has none),
+        freeing its provisional frame, cached statistics and operation log too
+        """
+        with self.lock:
+            with session.lock:
+                if session.active_requests or session.data is not None:
+                    return False
+                has_dataset = session.spilled or session.out_of_core is not None
+                if has_dataset and not app.config['RESTORE_SNAPSHOT_ON_START']:
+                    # It could not be rebuilt from disk, so keep it
+                    return False
+                session.evicted = True
+                if self.sessions.get(session.session_id) is session:
+                    del self.sessions[session.session_id]
+        result_cache.invalidate(session.session_id)
+        logger.info(f"🗑️ Evicted idle session {session.session_id}")
+        return True
+
+    def enforce_budget(self):
+        """Spill idle sessions, then least recently used ones until the budget is met"""
+        budget = app.config['SESSION_MEMORY_BUDGET_MB'] * 1024 * 1024
+        idle_cutoff = time.time() - app.config['SESSION_IDLE_SPILL_MINUTES'] * 60
+        evict_cutoff = time.time() - app.config['SESSION_EVICT_MINUTES'] * 60
+
+        with self.lock:
+            sessions = list(self.sessions.values())  # Least recently used first
+
+        total_bytes = sum(session.memory_bytes() for session in sessions)
+        for session in sessions:
+            if total_bytes <= budget and session.last_access >= idle_cutoff:
+                continue
+            freed = session.memory_bytes()
+            if freed and self.spill(session):
+                total_bytes -= freed
+
+        for session in sessions:
+            if session.last_access < evict_cutoff:
+                self.evict(session)
+
+session_store = SessionStore()
+
+class ResultCache:
+    """
+    Serialized responses of analysis endpoints keyed on (session, data
+    version, endpoint, normalized parameters). Entries are kept in LRU order
+    under RESULT_CACHE_MAX_MB; a session's entries are dropped as soon as its
+    data changes, since no later request can ask for the old version.
+    """
+
+    def __init__(self):
+        self.entries = OrderedDict()  # key -> (body bytes, mimetype)
+        self.size_bytes = 0
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.endpoint_stats = {}
+
+    def _count(self, endpoint, outcome):
+        stats = self.endpoint_stats.setdefault(endpoint, {'hits': 0, 'misses': 0})
+        stats[outcome] += 1
+
+    def get(self, key):
+        """Cached (body, mimetype) for key, or None; counts the hit or miss"""
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                self.misses += 1
+                self._count(key[3], 'misses')
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            self._count(key[3], 'hits')
+            return entry
+
+    def put(self, key, body, mimetype):
+        """Store a response body, evicting least recently used entries to stay under the cap"""
+        max_bytes = app.config['RESULT_CACHE_MAX_MB'] * 1024 * 1024
+        if len(body) > max_bytes:
+            return
+        with self.lock:
+            previous = self.entries.pop(key, None)
+            if previous is not None:
+                self.size_bytes -= len(previous[0])
+            self.entries[key] = (body, mimetype)
+            self.size_bytes += len(body)
+            while self.size_bytes > max_bytes:
+                _, (evicted_body, _) = self.entries.popitem(last=False)
+                self.size_bytes -= len(evicted_body)
+                self.evictions += 1
+
+    def invalidate(self, session_id):
+        """Drop every entry belonging to a session"""
+        with self.lock:
+            for key in [key for key in self.entries if key[0] == session_id]:
+                self.size_bytes -= len(self.entries.pop(key)[0])
+
+    def stats(self):
+        """Counters and size for /api/result-cache"""
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self.entries),
+                'size_mb': round(self.size_bytes / (1024 * 1024), 3),
+                'max_mb': app.config['RESULT_CACHE_MAX_MB'],
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else None,
+                'evictions': self.evictions,
+                'endpoints': {name: dict(stats) for name, stats in self.endpoint_stats.items()}
+            }
+
+result_cache = ResultCache()
+
+def request_params_key():
+    """Canonical form of the request's parameters (query string, form and JSON body)"""
+    body = request.get_json(silent=True)
+    return json.dumps({
+        'args': sorted(request.args.items(multi=True)),
+        'form': sorted(request.form.items(multi=True)),
+        'json': body
+    }, sort_keys=True, default=str)
+
+def cached_result(view):
+    """
+    Serve an analysis endpoint from the result cache while the session's data
+    version is unchanged. Only successful JSON responses are stored.
+    """
+    @functools.wraps(view)
+    def wrapper(*args, **kwargs):
+        if not app.config['RESULT_CACHE_ENABLED']:
+            return view(*args, **kwargs)
+
+        session = get_session()
+        # Versioned before computing, so a concurrent mutation only leaves an unreachable entry
+        key = (session.session_id, session.version_token, session.version, request.endpoint, request_params_key())
+        cached = result_cache.get(key)
+        if cached is not None:
+            body, mimetype = cached
+            return Response(body, status=200, mimetype=mimetype)
+
+        response = app.make_response(view(*args, **kwargs))
+        if response.status_code == 200 and response.is_json:
+            result_cache.put(key, response.get_data(), response.mimetype)
+        return response
+    return wrapper
+
+def get_session_id():
+    """Session token from the X-Session-Id header or a session_id parameter"""
+    session_id = request.headers.get('X-Session-Id') or request.args.get('session_id') or request.form.get('session_id')
+    if not session_id:
+        body = request.get_json(silent=True)
+        if isinstance(body, dict):
+            session_id = body.get('session_id')
+    # Session ids name snapshot folders, so keep them filesystem-safe
+    session_id = secure_filename(str(session_id or ''))[:64]
+    return session_id or DEFAULT_SESSION_ID
+
+def get_session():
+    """Return the DatasetSession for the current request (or background upload job)"""
+    if has_request_context():
+        if 'dataset_session' not in g:
+            g.dataset_session = session_store.get(get_session_id(), acquire=True)
+        return g.dataset_session
+    return getattr(upload_job_context, 'session', None) or session_store.get(DEFAULT_SESSION_ID)
+
+@app.teardown_request
+def release_session(exc=None):
+    """Let the session store account for memory once the request is done"""
+    session = g.pop('dataset_session', None)
+    if session is not None:
+        session_store.release(session)
+
+def split_upload_extension(filename):
+    """(file_ext, compression) for an upload name, e.g. ('csv', 'gzip') for data.csv.gz"""
+    parts = filename.lower().rsplit('.', 2)
+    if len(parts) < 2:
+        return None, None
+    compression = COMPRESSED_EXTENSIONS.get(parts[-1])
+    if compression is None:
+        return parts[-1], None
+    if compression == 'zip':
+        # Archives are expected to hold one CSV export, whatever the archive is called
+        return 'csv', compression
+    return (parts[-2] if len(parts) == 3 else None), compression
 
 def allowed_file(filename):
-    return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
+    file_ext, compression = split_upload_extension(filename)
+    # Only CSV is parsed from a stream; workbooks are already compressed containers
+    return file_ext in ALLOWED_EXTENSIONS and (compression is None or file_ext == 'csv')
 
-def generate_data_hash(data):
-    """Generate a hash for the current data to check for changes"""
-    if data is None:
-        return None
-    # Use shape, columns, and a sample of the data to create a hash
-    hash_components = [
-        str(data.shape),
-        str(data.columns.tolist()),
-        str(data.head(2).to_dict()) if len(data) > 0 else "empty"
-    ]
-    return hash(''.join(hash_components))
+def csv_archive_member(archive):
+    """The CSV file inside a .zip upload (OS metadata entries are ignored)"""
+    members = [info for info in archive.infolist()
+               if not info.is_dir() and not info.filename.startswith('__MACOSX/')
+               and not posixpath.basename(info.filename).startswith('.')]
+    csv_members = [info for info in members if info.filename.lower().endswith('.csv')]
+    if len(members) == 1:
+        return members[0]
+    if len(csv_members) == 1:
+        return csv_members[0]
+    raise ValueError(f'ZIP archive must contain exactly one CSV file (found {len(csv_members)})')
+
+def open_upload_stream(filepath, compression=None):
+    """Binary stream of an upload's CSV bytes, decompressed on the fly (never expanded to disk)"""
+    if compression is None:
+        return open(filepath, 'rb')
+    if compression == 'gzip':
+        return gzip.open(filepath, 'rb')
+    if compression == 'zstd':
+        try:
+            import zstandard
+        except ImportError:
+            raise ValueError('zstandard is not installed - .zst uploads are not supported')
+        return zstandard.ZstdDecompressor().stream_reader(open(filepath, 'rb'), closefd=True)
+    if compression == 'zip':
+        # The member stream keeps the archive file open until it is closed itself
+        with zipfile.ZipFile(filepath) as archive:
+            return archive.open(csv_archive_member(archive))
+    raise ValueError(f"Unsupported compression '{compression}'")
+
+def uncompressed_size(filepath, compression=None):
+    """Size of the CSV bytes inside an upload (the compressed size when the format does not record it)"""
+    compressed_size = os.path.getsize(filepath)
+    try:
+        if compression == 'gzip':
+            # The gzip trailer holds the expanded size modulo 4 GB
+            with open(filepath, 'rb') as f:
+                f.seek(-4, os.SEEK_END)
+                size = int.from_bytes(f.read(4), 'little')
+            while size < compressed_size:
+                size += 2 ** 32
+            return size
+        if compression == 'zip':
+            with zipfile.ZipFile(filepath) as archive:
+                return csv_archive_member(archive).file_size
+        if compression == 'zstd':
+            import zstandard
+            with open(filepath, 'rb') as f:
+                size = zstandard.frame_content_size(f.read(18))
+            return size if size > 0 else compressed_size
+    except Exception as e:
+        logger.debug(f"Could not read the uncompressed size of {filepath}: {e}")
+    return compressed_size
 
-def invalidate_preview_cache():
-    """Clear the preview cache when data changes"""
-    global preview_cache, preview_cache_hash
-    preview_cache = None
-    preview_cache_hash = None
+def invalidate_preview_cache(columns=None):
+    """Clear the preview cache when data changes (columns: the only columns that changed, if known)"""
+    get_session().data_changed(columns)
 
 def create_plot_base64(fig):
     """Convert matplotlib figure to base64 string with optimized settings"""
@@ -84,293 +576,2222 @@ def sample_data_for_plotting(data, max_points=10000):
     # For large datasets, take a random sample to speed up plotting
     return data.sample(n=max_points, random_state=42)
 
-def prepare_data_for_plotting(df):
-    """Prepare data for plotting by converting date objects to datetime for matplotlib"""
-    plot_df = df.copy()
-    
-    for column in plot_df.columns:
-        if plot_df[column].dtype == 'object':
-            # Check if it contains date objects
-            sample = plot_df[column].dropna().head(5)
-            if len(sample) > 0:
-                first_val = sample.iloc[0]
-                if hasattr(first_val, 'year') and hasattr(first_val, 'month') and hasattr(first_val, 'day'):
-                    # Convert date objects to datetime for matplotlib
-                    plot_df[column] = pd.to_datetime(plot_df[column], errors='coerce')
-    
-    return plot_df
-
-def prepare_data_for_plotting(df):
-    """Prepare data for plotting by converting date objects back to datetime for proper plotting"""
-    plot_df = df.copy()
-    
-    for column in plot_df.columns:
-        col_data = plot_df[column]
-        
-        # Check if column contains date objects and convert them to datetime for plotting
-        if col_data.dtype == 'object':
-            sample = col_data.dropna().head(5)
-            if len(sample) > 0:
-                first_val = sample.iloc[0]
-                if hasattr(first_val, 'strftime'):
-                    # Convert date objects back to datetime for plotting
-                    plot_df[column] = pd.to_datetime(col_data, errors='coerce')
-    
-    return plot_df
+def format_display_dates(series):
+    """DD/MM/YYYY strings (NaN for NaT) for a datetime column, running strftime once per distinct day"""
+    codes, days = pd.factorize(series.dt.normalize())
+    # NaT has code -1, which picks the trailing NaN
+    labels = np.append(np.asarray(days.strftime('%d/%m/%Y'), dtype=object), np.nan)
+    return pd.Series(labels.take(codes), index=series.index, name=series.name)
 
-def format_date_columns_for_display(df):
-    """Format date columns for display in DD/MM/YYYY format"""
-    display_df = df.copy()
+def format_date_columns_for_display(df, rows=None):
+    """
+    Format date columns for display in DD/MM/YYYY format. rows (a slice or
+    positions) selects the rows being returned before anything is
+    formatted, so only that slice is ever converted to text.
+    """
+    if rows is not None:
+        df = df.iloc[rows]
+    # Shallow copy: only the replaced date columns are new, the rest share the original data
+    display_df = df.copy(deep=False)
     
     for column in display_df.columns:
-        col_data = display_df[column]
-        
-        # Check if column contains date objects
-        if col_data.dtype == 'object':
-            sample = col_data.dropna().head(5)
-            if len(sample) > 0:
-                first_val = sample.iloc[0]
-                if hasattr(first_val, 'strftime'):
-                    # Format date objects as DD/MM/YYYY
-                    display_df[column] = col_data.apply(
-                        lambda x: x.strftime('%d/%m/%Y') if hasattr(x, 'strftime') else x
-                    )
-        elif pd.api.types.is_datetime64_any_dtype(col_data):
+        if pd.api.types.is_datetime64_any_dtype(display_df[column]):
             # Format datetime64 columns as DD/MM/YYYY (remove time)
-            display_df[column] = col_data.dt.strftime('%d/%m/%Y')
+            display_df[column] = format_display_dates(display_df[column])
     
     return display_df
 
-def detect_datetime_columns(df):
-    """
-    Enhanced comprehensive datetime detection for DataFrame columns
-    """
-    import re
-    
-    # Enhanced datetime patterns to match more formats
-    datetime_patterns = [
-        # ISO formats
-        r'^\d{4}-\d{1,2}-\d{1,2}$',  # YYYY-MM-DD
-        r'^\d{4}-\d{1,2}-\d{1,2}\s+\d{1,2}:\d{1,2}:\d{1,2}$',  # YYYY-MM-DD HH:MM:SS
-        r'^\d{4}-\d{1,2}-\d{1,2}T\d{1,2}:\d{1,2}:\d{1,2}$',  # YYYY-MM-DDTHH:MM:SS
-        r'^\d{4}-\d{1,2}-\d{1,2}T\d{1,2}:\d{1,2}:\d{1,2}Z$',  # ISO with Z
-        r'^\d{4}-\d{1,2}-\d{1,2}T\d{1,2}:\d{1,2}:\d{1,2}\.\d+$',  # ISO with microseconds
-        
-        # US formats
-        r'^\d{1,2}/\d{1,2}/\d{4}$',  # MM/DD/YYYY
-        r'^\d{1,2}/\d{1,2}/\d{2}$',  # MM/DD/YY
-        r'^\d{1,2}/\d{1,2}/\d{4}\s+\d{1,2}:\d{1,2}:\d{1,2}$',  # MM/DD/YYYY HH:MM:SS
-        r'^\d{1,2}/\d{1,2}/\d{4}\s+\d{1,2}:\d{1,2}$',  # MM/DD/YYYY HH:MM
-        
-        # European formats
-        r'^\d{1,2}\.\d{1,2}\.\d{4}$',  # DD.MM.YYYY
-        r'^\d{1,2}-\d{1,2}-\d{4}$',  # DD-MM-YYYY
-        r'^\d{1,2}\.\d{1,2}\.\d{4}\s+\d{1,2}:\d{1,2}:\d{1,2}$',  # DD.MM.YYYY HH:MM:SS
-        r'^\d{1,2}-\d{1,2}-\d{4}\s+\d{1,2}:\d{1,2}:\d{1,2}$',  # DD-MM-YYYY HH:MM:SS
-        
-        # Other formats
-        r'^\d{8}$',  # YYYYMMDD
-        r'^\d{4}/\d{1,2}/\d{1,2}$',  # YYYY/MM/DD
-        r'^\d{4}/\d{1,2}/\d{1,2}\s+\d{1,2}:\d{1,2}:\d{1,2}$',  # YYYY/MM/DD HH:MM:SS
-        
-        # Month names (English)
-        r'^[A-Za-z]{3,9}\s+\d{1,2},?\s+\d{4}$',  # Month DD, YYYY
-        r'^\d{1,2}\s+[A-Za-z]{3,9}\s+\d{4}$',  # DD Month YYYY
-        r'^[A-Za-z]{3,9}\s+\d{4}$',  # Month YYYY
-        
-        # Timestamps (Unix)
-        r'^\d{10}$',  # Unix timestamp (10 digits)
-        r'^\d{13}$',  # Unix timestamp milliseconds (13 digits)
-        r'^\d{10}\.\d+$',  # Unix timestamp with decimal
-        
-        # Compact formats
-        r'^\d{6}$',  # YYMMDD or DDMMYY
-        
-        # Excel serial numbers (potential dates)
-        r'^[1-9]\d{4,5}$',  # 5-6 digit numbers (Excel date serials)
-        
-        # Time only formats (for potential time series)
-        r'^\d{1,2}:\d{1,2}:\d{1,2}$',  # HH:MM:SS
-        r'^\d{1,2}:\d{1,2}$',  # HH:MM
-        
-        # 12-hour format with AM/PM
-        r'^\d{1,2}/\d{1,2}/\d{4}\s+\d{1,2}:\d{1,2}:\d{1,2}\s+[AaPp][Mm]$',
-        r'^\d{1,2}-\d{1,2}-\d{4}\s+\d{1,2}:\d{1,2}:\d{1,2}\s+[AaPp][Mm]$',
-        r'^\d{1,2}/\d{1,2}/\d{4}\s+\d{1,2}:\d{1,2}\s+[AaPp][Mm]$',
-        r'^\d{1,2}-\d{1,2}-\d{4}\s+\d{1,2}:\d{1,2}\s+[AaPp][Mm]$',
-    ]
-    
-    # Expanded datetime format strings
-    datetime_formats = [
-        # Basic date formats
-        '%Y-%m-%d', '%m/%d/%Y', '%d/%m/%Y', '%Y/%m/%d', 
-        '%m-%d-%Y', '%d-%m-%Y', '%d.%m.%Y', '%Y.%m.%d', '%m.%d.%Y',
-        
-        # Short year formats
-        '%y-%m-%d', '%m/%d/%y', '%d/%m/%y', '%y/%m/%d',
-        '%m-%d-%y', '%d-%m-%y', '%d.%m.%y', '%y.%m.%d', '%m.%d.%y',
-        
-        # With full time
-        '%Y-%m-%d %H:%M:%S', '%m/%d/%Y %H:%M:%S', '%d/%m/%Y %H:%M:%S',
-        '%Y/%m/%d %H:%M:%S', '%m-%d-%Y %H:%M:%S', '%d-%m-%Y %H:%M:%S',
-        '%d.%m.%Y %H:%M:%S', '%Y.%m.%d %H:%M:%S', '%m.%d.%Y %H:%M:%S',
-        
-        # With hours and minutes only
-        '%Y-%m-%d %H:%M', '%m/%d/%Y %H:%M', '%d/%m/%Y %H:%M',
-        '%Y/%m/%d %H:%M', '%m-%d-%Y %H:%M', '%d-%m-%Y %H:%M',
-        '%d.%m.%Y %H:%M', '%Y.%m.%d %H:%M', '%m.%d.%Y %H:%M',
-        
-        # Month names (full and abbreviated)
-        '%B %d, %Y', '%b %d, %Y', '%d %B %Y', '%d %b %Y',
-        '%B %d %Y', '%b %d %Y', '%B %Y', '%b %Y',
-        '%B %d, %Y %H:%M:%S', '%b %d, %Y %H:%M:%S',
-        '%d %B %Y %H:%M:%S', '%d %b %Y %H:%M:%S',
-        
-        # Compact formats
-        '%Y%m%d', '%d%m%Y', '%m%d%Y', '%y%m%d', '%d%m%y', '%m%d%y',
-        '%Y%m%d%H%M%S', '%y%m%d%H%M%S',
-        
-        # ISO formats
-        '%Y-%m-%dT%H:%M:%S', '%Y-%m-%dT%H:%M:%SZ',
-        '%Y-%m-%dT%H:%M:%S.%f', '%Y-%m-%dT%H:%M:%S.%fZ',
-        
-        # 12-hour formats with AM/PM
-        '%m/%d/%Y %I:%M:%S %p', '%d/%m/%Y %I:%M:%S %p',
-        '%Y-%m-%d %I:%M:%S %p', '%m-%d-%Y %I:%M:%S %p',
-        '%d-%m-%Y %I:%M:%S %p', '%Y/%m/%d %I:%M:%S %p',
-        '%m/%d/%Y %I:%M %p', '%d/%m/%Y %I:%M %p',
-        '%Y-%m-%d %I:%M %p', '%m-%d-%Y %I:%M %p',
-        '%d-%m-%Y %I:%M %p', '%Y/%m/%d %I:%M %p',
-        
-        # Time only
-        '%H:%M:%S', '%H:%M', '%I:%M:%S %p', '%I:%M %p',
-    ]
-    
-    converted_columns = []
-    
-    for column in df.columns:
+# Shapes a frame can be serialized in: one object per row, one array per row, or one array per column
+JSON_ORIENTS = ('records', 'rows', 'columns')
+
+def encode_frame_json(df, orient='records'):
+    """
+    Encode a (display formatted) frame straight from its column arrays to a
+    JSON string with pandas' C encoder instead of building a dict per row.
+    Missing values become null; 'rows' and 'columns' omit the repeated
+    column names ('columns' encodes each column array on its own).
+    """
+    options = {'double_precision': 15, 'default_handler': str}
+    if orient == 'rows':
+        return df.to_json(orient='values', **options)
+    if orient == 'columns':
+        return '[' + ','.join(df.iloc[:, i].to_json(orient='values', **options) for i in range(df.shape[1])) + ']'
+    return df.to_json(orient='records', **options)
+
+def requested_orient():
+    """Serialization shape asked for with ?orient= (records by default)"""
+    orient = request.args.get('orient', 'records').lower()
+    if orient not in JSON_ORIENTS:
+        raise ValueError(f"Unknown orient '{orient}' (use one of {', '.join(JSON_ORIENTS)})")
+    return orient
+
+def frame_json_response(meta, df, orient='records', key='data'):
+    """JSON response of the meta fields plus the frame encoded under key, spliced in as text"""
+    encoded = encode_frame_json(df, orient)
+    meta = dict(meta, orient=orient)
+    body = json.dumps(meta, default=str)[:-1] + f', {json.dumps(key)}: {encoded}}}'
+    return Response(body, status=200, mimetype='application/json')
+
+# Date/time format families recognised by the datetime classifier.
+# Each family is one regex plus the strptime formats it can correspond to,
+# listed in order of preference when several formats parse equally well.
+DATETIME_FAMILIES = [
+    # ISO formats
+    ('iso_date', r'\d{4}-\d{1,2}-\d{1,2}', ['%Y-%m-%d']),
+    ('iso_datetime', r'\d{4}-\d{1,2}-\d{1,2}\s+\d{1,2}:\d{1,2}:\d{1,2}', ['%Y-%m-%d %H:%M:%S']),
+    ('iso_datetime_minutes', r'\d{4}-\d{1,2}-\d{1,2}\s+\d{1,2}:\d{1,2}', ['%Y-%m-%d %H:%M']),
+    ('iso_datetime_ampm', r'\d{4}-\d{1,2}-\d{1,2}\s+\d{1,2}:\d{1,2}(?::\d{1,2})?\s*[AaPp][Mm]',
+     ['%Y-%m-%d %I:%M:%S %p', '%Y-%m-%d %I:%M %p']),
+    ('iso_t', r'\d{4}-\d{1,2}-\d{1,2}T\d{1,2}:\d{1,2}:\d{1,2}', ['%Y-%m-%dT%H:%M:%S']),
+    ('iso_t_z', r'\d{4}-\d{1,2}-\d{1,2}T\d{1,2}:\d{1,2}:\d{1,2}Z', ['%Y-%m-%dT%H:%M:%SZ']),
+    ('iso_t_fraction', r'\d{4}-\d{1,2}-\d{1,2}T\d{1,2}:\d{1,2}:\d{1,2}\.\d+', ['%Y-%m-%dT%H:%M:%S.%f']),
+    ('iso_t_fraction_z', r'\d{4}-\d{1,2}-\d{1,2}T\d{1,2}:\d{1,2}:\d{1,2}\.\d+Z', ['%Y-%m-%dT%H:%M:%S.%fZ']),
+
+    # Slash separated (US first, then European)
+    ('slash_date', r'\d{1,2}/\d{1,2}/\d{4}', ['%m/%d/%Y', '%d/%m/%Y']),
+    ('slash_date_short', r'\d{1,2}/\d{1,2}/\d{2}', ['%m/%d/%y', '%d/%m/%y']),
+    ('slash_datetime', r'\d{1,2}/\d{1,2}/\d{4}\s+\d{1,2}:\d{1,2}:\d{1,2}', ['%m/%d/%Y %H:%M:%S', '%d/%m/%Y %H:%M:%S']),
+    ('slash_datetime_minutes', r'\d{1,2}/\d{1,2}/\d{4}\s+\d{1,2}:\d{1,2}', ['%m/%d/%Y %H:%M', '%d/%m/%Y %H:%M']),
+    ('slash_datetime_ampm', r'\d{1,2}/\d{1,2}/\d{4}\s+\d{1,2}:\d{1,2}:\d{1,2}\s*[AaPp][Mm]',
+     ['%m/%d/%Y %I:%M:%S %p', '%d/%m/%Y %I:%M:%S %p']),
+    ('slash_datetime_minutes_ampm', r'\d{1,2}/\d{1,2}/\d{4}\s+\d{1,2}:\d{1,2}\s*[AaPp][Mm]',
+     ['%m/%d/%Y %I:%M %p', '%d/%m/%Y %I:%M %p']),
+    ('ymd_slash', r'\d{4}/\d{1,2}/\d{1,2}', ['%Y/%m/%d']),
+    ('ymd_slash_datetime', r'\d{4}/\d{1,2}/\d{1,2}\s+\d{1,2}:\d{1,2}:\d{1,2}', ['%Y/%m/%d %H:%M:%S']),
+    ('ymd_slash_datetime_minutes', r'\d{4}/\d{1,2}/\d{1,2}\s+\d{1,2}:\d{1,2}', ['%Y/%m/%d %H:%M']),
+    ('ymd_slash_datetime_ampm', r'\d{4}/\d{1,2}/\d{1,2}\s+\d{1,2}:\d{1,2}(?::\d{1,2})?\s*[AaPp][Mm]',
+     ['%Y/%m/%d %I:%M:%S %p', '%Y/%m/%d %I:%M %p']),
+
+    # Dash and dot separated
+    ('dash_date', r'\d{1,2}-\d{1,2}-\d{4}', ['%m-%d-%Y', '%d-%m-%Y']),
+    ('dash_date_short', r'\d{1,2}-\d{1,2}-\d{2}', ['%m-%d-%y', '%d-%m-%y', '%y-%m-%d']),
+    ('dash_datetime', r'\d{1,2}-\d{1,2}-\d{4}\s+\d{1,2}:\d{1,2}:\d{1,2}', ['%m-%d-%Y %H:%M:%S', '%d-%m-%Y %H:%M:%S']),
+    ('dash_datetime_minutes', r'\d{1,2}-\d{1,2}-\d{4}\s+\d{1,2}:\d{1,2}', ['%m-%d-%Y %H:%M', '%d-%m-%Y %H:%M']),
+    ('dash_datetime_ampm', r'\d{1,2}-\d{1,2}-\d{4}\s+\d{1,2}:\d{1,2}:\d{1,2}\s*[AaPp][Mm]',
+     ['%m-%d-%Y %I:%M:%S %p', '%d-%m-%Y %I:%M:%S %p']),
+    ('dash_datetime_minutes_ampm', r'\d{1,2}-\d{1,2}-\d{4}\s+\d{1,2}:\d{1,2}\s*[AaPp][Mm]',
+     ['%m-%d-%Y %I:%M %p', '%d-%m-%Y %I:%M %p']),
+    ('dot_date', r'\d{1,2}\.\d{1,2}\.\d{4}', ['%d.%m.%Y', '%m.%d.%Y']),
+    ('dot_date_short', r'\d{1,2}\.\d{1,2}\.\d{2}', ['%d.%m.%y', '%m.%d.%y', '%y.%m.%d']),
+    ('dot_datetime', r'\d{1,2}\.\d{1,2}\.\d{4}\s+\d{1,2}:\d{1,2}:\d{1,2}', ['%d.%m.%Y %H:%M:%S', '%m.%d.%Y %H:%M:%S']),
+    ('dot_datetime_minutes', r'\d{1,2}\.\d{1,2}\.\d{4}\s+\d{1,2}:\d{1,2}', ['%d.%m.%Y %H:%M', '%m.%d.%Y %H:%M']),
+    ('ymd_dot', r'\d{4}\.\d{1,2}\.\d{1,2}', ['%Y.%m.%d']),
+    ('ymd_dot_datetime', r'\d{4}\.\d{1,2}\.\d{1,2}\s+\d{1,2}:\d{1,2}(?::\d{1,2})?', ['%Y.%m.%d %H:%M:%S', '%Y.%m.%d %H:%M']),
+
+    # Compact digit-only formats
+    ('compact_date', r'\d{8}', ['%Y%m%d', '%d%m%Y', '%m%d%Y']),
+    ('compact_date_short', r'\d{6}', ['%y%m%d', '%d%m%y', '%m%d%y']),
+    ('compact_datetime', r'\d{14}', ['%Y%m%d%H%M%S']),
+    ('compact_datetime_short', r'\d{12}', ['%y%m%d%H%M%S']),
+
+    # Month names (English)
+    ('month_day_year', r'[A-Za-z]{3,9}\s+\d{1,2},?\s+\d{4}', ['%B %d, %Y', '%b %d, %Y', '%B %d %Y', '%b %d %Y']),
+    ('month_day_year_time', r'[A-Za-z]{3,9}\s+\d{1,2},?\s+\d{4}\s+\d{1,2}:\d{1,2}:\d{1,2}',
+     ['%B %d, %Y %H:%M:%S', '%b %d, %Y %H:%M:%S']),
+    ('day_month_year', r'\d{1,2}\s+[A-Za-z]{3,9}\s+\d{4}', ['%d %B %Y', '%d %b %Y']),
+    ('day_month_year_time', r'\d{1,2}\s+[A-Za-z]{3,9}\s+\d{4}\s+\d{1,2}:\d{1,2}:\d{1,2}', ['%d %B %Y %H:%M:%S', '%d %b %Y %H:%M:%S']),
+    ('month_year', r'[A-Za-z]{3,9}\s+\d{4}', ['%B %Y', '%b %Y']),
+]
+
+# All families compiled into one alternation so each value is classified with a single match
+DATETIME_FAMILY_REGEX = re.compile('|'.join(
+    f'(?P<{name}>{pattern})' for name, pattern, _ in DATETIME_FAMILIES
+))
+DATETIME_FAMILY_FORMATS = {name: formats for name, _, formats in DATETIME_FAMILIES}
+
+# Share of values that must look like (and parse as) dates before a column is converted
+DATETIME_MATCH_THRESHOLD = 0.75
+
+def classify_datetime_sample(sample_str):
+    """
+    Sort sample values into datetime format families in one pass over the unique values.
+    Returns the dominant family and the share of sample values that belong to it.
+    """
+    family_counts = {}
+    for value, count in sample_str.value_counts().items():
+        match = DATETIME_FAMILY_REGEX.fullmatch(value.strip())
+        if match:
+            family_counts[match.lastgroup] = family_counts.get(match.lastgroup, 0) + count
+
+    if not family_counts:
+        return None, 0.0
+
+    family = max(family_counts, key=family_counts.get)
+    return family, family_counts[family] / len(sample_str)
+
+def choose_datetime_format(sample, family):
+    """Pick the format of a family that parses the most sample values"""
+    unique_values = pd.Series(sample.astype(str).str.strip().unique())
+    best_format = None
+    best_success_rate = 0
+
+    for fmt in DATETIME_FAMILY_FORMATS[family]:
+        parsed = pd.to_datetime(unique_values, format=fmt, errors='coerce')
+        success_rate = parsed.notna().sum() / len(unique_values)
+        if success_rate > best_success_rate:
+            best_success_rate = success_rate
+            best_format = fmt
+        if success_rate == 1:
+            break
+
+    if best_success_rate < DATETIME_MATCH_THRESHOLD:
+        # Values of one family can still mix formats (e.g. "Jan 5, 2020" and "January 5 2020")
+        parsed = pd.to_datetime(unique_values, format='mixed', errors='coerce')
+        mixed_success_rate = parsed.notna().sum() / len(unique_values)
+        if mixed_success_rate > best_success_rate:
+            best_success_rate = mixed_success_rate
+            best_format = 'mixed'
+
+    return best_format, best_success_rate
+
+def parse_datetime_column(series, parser):
+    """
+    Convert a column with a parser chosen by detect_datetime_column:
+    {'unit': 's'|'ms'} for Unix timestamps or {'format': fmt} for text.
+    Values the parser cannot read become NaT.
+    """
+    if 'unit' in parser:
+        return pd.to_datetime(series, unit=parser['unit'], errors='coerce')
+
+    values = series
+    if series.dtype == 'object':
+        text = series.dropna().astype(str)
+        if (text != text.str.strip()).any():
+            values = series.astype(str).str.strip().where(series.notna())
+    # Single parse over distinct values only (dates repeat a lot)
+    codes, uniques = pd.factorize(values)
+    parsed = pd.to_datetime(pd.Series(uniques, dtype=object), format=parser['format'], errors='coerce').to_numpy()
+    # Code -1 marks missing values, which pick up the trailing NaT
+    parsed = np.append(parsed, np.datetime64('NaT', 'ns'))
+    return pd.Series(parsed[codes], index=series.index)
+
+def detect_datetime_column(series):
+    """
+    Detect whether a single column holds dates and convert it.
+    Returns (converted_series, description, parser) or (None, reason, None); the parser
+    (see parse_datetime_column) converts other chunks of the same column the same way.
+    The full column is parsed at most once.
+    """
+    if pd.api.types.is_bool_dtype(series):
+        return None, 'boolean column', None
+
+    sample = series.dropna()
+    if len(sample) == 0:
+        return None, 'no values', None
+
+    non_null_count = len(sample)
+    sample = sample.head(100)
+
+    # Numeric columns are only considered as Unix timestamps
+    if pd.api.types.is_numeric_dtype(series):
+        sample_numeric = sample.head(50).astype('float64')
+        in_seconds_range = sample_numeric.between(946684800, 2524608000)
+        in_millis_range = sample_numeric.between(946684800000, 2524608000000)
+        if (in_seconds_range | in_millis_range).mean() < DATETIME_MATCH_THRESHOLD:
+            return None, 'numeric values outside Unix timestamp range', None
+
+        parser = {'unit': 'ms' if sample_numeric.iloc[0] > 1e10 else 's'}
+        converted = parse_datetime_column(series, parser)
+        success_rate = converted.notna().sum() / non_null_count
+        if success_rate >= DATETIME_MATCH_THRESHOLD:
+            return converted, f"Unix timestamp ({parser['unit']}, {success_rate:.2%} success)", parser
+        return None, f'Unix timestamp parse rate {success_rate:.2%}', None
+
+    if series.dtype != 'object':
+        return None, f'unsupported dtype {series.dtype}', None
+
+    family, likelihood = classify_datetime_sample(sample.astype(str))
+    if family is None or likelihood < DATETIME_MATCH_THRESHOLD:
+        return None, f'{likelihood:.2%} datetime-like values', None
+
+    fmt, sample_success_rate = choose_datetime_format(sample, family)
+    if fmt is None or sample_success_rate < DATETIME_MATCH_THRESHOLD:
+        return None, f'family {family} matched but best format parsed {sample_success_rate:.2%} of sample', None
+
+    parser = {'format': fmt}
+    converted = parse_datetime_column(series, parser)
+    success_rate = converted.notna().sum() / non_null_count
+    if success_rate >= DATETIME_MATCH_THRESHOLD:
+        return converted, f'format {fmt} ({success_rate:.2%} success)', parser
+    return None, f'format {fmt} parsed only {success_rate:.2%} of values', None
+
+# Worker pool for parallel datetime detection, created once on first use and shared by every upload
+datetime_detection_pool = None
+datetime_detection_pool_lock = threading.Lock()
+
+def datetime_detection_context():
+    """
+    Start workers from a clean process: forking the multithreaded server
+    could copy locks (logging, session locks) held by other threads
+    """
+    methods = multiprocessing.get_all_start_methods()
+    return multiprocessing.get_context('forkserver' if 'forkserver' in methods else 'spawn')
+
+def get_datetime_detection_pool():
+    """Return the shared datetime detection process pool (DATETIME_DETECTION_WORKERS processes)"""
+    global datetime_detection_pool
+
+    with datetime_detection_pool_lock:
+        if datetime_detection_pool is None:
+            workers = app.config['DATETIME_DETECTION_WORKERS']
+            datetime_detection_pool = ProcessPoolExecutor(max_workers=workers,
+                                                          mp_context=datetime_detection_context())
+            logger.info(f"Started datetime detection pool with {workers} workers")
+        return datetime_detection_pool
+
+def reset_datetime_detection_pool(broken_pool):
+    """Drop a broken pool so the next parallel detection starts a fresh one"""
+    global datetime_detection_pool
+
+    with datetime_detection_pool_lock:
+        # Another upload may already have replaced it; never shut down a healthy pool
+        if datetime_detection_pool is broken_pool:
+            datetime_detection_pool = None
+    broken_pool.shutdown(wait=False)
+
+def detect_datetime_columns_parallel(df, columns):
+    """Run detect_datetime_column for each column across the process pool, yielding (column, result)"""
+    pool = get_datetime_detection_pool()
+    try:
+        futures = [(column, pool.submit(detect_datetime_column, df[column])) for column in columns]
+        for column, future in futures:
+            try:
+                yield column, future.result()
+            except BrokenProcessPool:
+                raise
+            except Exception as e:
+                yield column, (None, f'detection failed: {e}', None)
+    except BrokenProcessPool:
+        reset_datetime_detection_pool(pool)
+        raise
+
+def detect_datetime_columns_serial(df, columns):
+    """Run detect_datetime_column for each column on the calling thread, yielding (column, result)"""
+    for column in columns:
+        try:
+            yield column, detect_datetime_column(df[column])
+        except Exception as e:
+            yield column, (None, f'detection failed: {e}', None)
+
+def detect_datetime_columns(df, workers=None, columns=None, parsers=None):
+    """
+    Detect and convert datetime columns in place using the single-pass format classifier.
+    Wide frames are spread across a process pool; small ones are handled serially.
+    columns limits detection to those candidates (e.g. the ones a schema sniff left open).
+    When a parsers dict is given, the parser chosen for each converted column is stored in it.
+    Returns the list of converted column names.
+    """
+    if workers is None:
+        workers = app.config['DATETIME_DETECTION_WORKERS']
+
+    candidate_columns = []
+    for column in (df.columns if columns is None else columns):
         # Skip if already datetime
         if pd.api.types.is_datetime64_any_dtype(df[column]):
             logger.info(f"Column '{column}' is already datetime")
             continue
-            
-        # Only check object/string columns and numeric columns (for timestamps)
-        if df[column].dtype not in ['object', 'int64', 'float64']:
+        if df[column].dtype == 'object' or pd.api.types.is_numeric_dtype(df[column]):
+            candidate_columns.append(column)
+
+    use_parallel = (
+        workers > 1
+        and len(candidate_columns) >= app.config['DATETIME_PARALLEL_MIN_COLUMNS']
+        and len(df) * len(candidate_columns) >= app.config['DATETIME_PARALLEL_MIN_CELLS']
+    )
+
+    results = []
+    if use_parallel:
+        logger.info(f"Detecting datetime columns in parallel: {len(candidate_columns)} columns, {workers} workers")
+        try:
+            results = list(detect_datetime_columns_parallel(df, candidate_columns))
+        except Exception as e:
+            logger.warning(f"Parallel datetime detection failed ({e}), falling back to serial detection")
+            results = []
+    if not results:
+        results = detect_datetime_columns_serial(df, candidate_columns)
+
+    converted_columns = []
+    for column, (converted, description, parser) in results:
+        if converted is None:
+            logger.debug(f"Column '{column}' not converted: {description}")
             continue
-            
-        # Get a sample of non-null values
-        sample = df[column].dropna()
-        if len(sample) == 0:
+
+        # Keep dates as native datetime64, normalized to midnight (remove time component)
+        df[column] = converted.dt.normalize()
+        converted_columns.append(column)
+        if parsers is not None:
+            parsers[column] = parser
+        logger.info(f"✅ Converted '{column}' to date-only format using {description}")
+
+    if converted_columns:
+        logger.info(f"🎉 Successfully converted {len(converted_columns)} columns to datetime: {converted_columns}")
+    else:
+        logger.info("ℹ️ No datetime columns detected or converted")
+
+    return converted_columns
+
+def is_text_column(series):
+    """Check whether a column holds text values (object or categorical dtype)"""
+    return series.dtype == 'object' or isinstance(series.dtype, pd.CategoricalDtype)
+
+def expand_categorical(df, column):
+    """Convert a categorical column back to object so arbitrary values can be written into it"""
+    if isinstance(df[column].dtype, pd.CategoricalDtype):
+        df[column] = df[column].astype(object)
+
+def compact_column(series, category_max_ratio):
+    """Return the most compact lossless representation of a single column"""
+    if series.dtype == 'object':
+        non_null = series.dropna()
+        # Only plain string columns are categorized (date objects and mixed values are left alone)
+        if len(non_null) == 0 or not isinstance(non_null.iloc[0], str):
+            return series
+        unique_count = non_null.nunique()
+        if unique_count < len(non_null) and unique_count / len(series) <= category_max_ratio:
+            return series.astype('category')
+        return series
+
+    if pd.api.types.is_bool_dtype(series) or not pd.api.types.is_numeric_dtype(series):
+        return series
+
+    if pd.api.types.is_integer_dtype(series):
+        return pd.to_numeric(series, downcast='integer')
+
+    if pd.api.types.is_float_dtype(series):
+        non_null = series.dropna()
+        if len(non_null) == 0:
+            return series
+
+        # Integers upcast to float because of missing values become nullable integers
+        if series.isnull().any() and np.isfinite(non_null).all() and (non_null % 1 == 0).all():
+            return pd.to_numeric(series.astype('Int64'), downcast='integer')
+
+        # Only narrow floats when every value survives the round trip
+        narrowed = series.astype('float32')
+        if narrowed.astype('float64').equals(series.astype('float64')):
+            return narrowed
+
+    return series
+
+def compact_dtypes(df, category_max_ratio=None):
+    """
+    Shrink DataFrame memory in place: low-cardinality text columns become categorical,
+    integers are downcast to the smallest width, float-upcast integers become nullable
+    integers and floats are narrowed where lossless. Returns a per-column memory report.
+    """
+    if category_max_ratio is None:
+        category_max_ratio = app.config['CATEGORY_MAX_UNIQUE_RATIO']
+
+    report = {}
+    total_before = 0
+    total_after = 0
+
+    for column in df.columns:
+        before_dtype = str(df[column].dtype)
+        before_bytes = int(df[column].memory_usage(deep=True, index=False))
+
+        try:
+            compacted = compact_column(df[column], category_max_ratio)
+        except Exception as e:
+            logger.debug(f"Could not compact column '{column}': {e}")
+            compacted = df[column]
+
+        if compacted is not df[column]:
+            df[column] = compacted
+
+        after_bytes = int(df[column].memory_usage(deep=True, index=False))
+        total_before += before_bytes
+        total_after += after_bytes
+
+        report[column] = {
+            'before_dtype': before_dtype,
+            'after_dtype': str(df[column].dtype),
+            'before_bytes': before_bytes,
+            'after_bytes': after_bytes
+        }
+
+    logger.info(f"Dtype compaction: {total_before / (1024*1024):.2f} MB -> {total_after / (1024*1024):.2f} MB")
+
+    return {
+        'columns': report,
+        'total_before_bytes': total_before,
+        'total_after_bytes': total_after,
+        'saved_percentage': round((1 - total_after / total_before) * 100, 2) if total_before > 0 else 0
+    }
+
+def ensure_fillable(df, column, fill_value):
+    """Widen a compacted column in place so fill_value can be stored in it without loss"""
+    series = df[column]
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        if pd.notna(fill_value) and fill_value not in series.cat.categories:
+            df[column] = series.cat.add_categories([fill_value])
+    elif pd.api.types.is_integer_dtype(series):
+        try:
+            value = float(fill_value)
+        except (TypeError, ValueError):
+            df[column] = series.astype(object)
+            return
+        if not value.is_integer():
+            df[column] = series.astype('float64')
+        else:
+            numpy_dtype = getattr(series.dtype, 'numpy_dtype', series.dtype)
+            limits = np.iinfo(numpy_dtype)
+            if not limits.min <= value <= limits.max:
+                df[column] = series.astype('Int64')
+
+# Background upload jobs (polled via /api/upload-jobs/<job_id>)
+upload_jobs = {}
+upload_jobs_lock = threading.Lock()
+upload_job_executor = None
+upload_job_context = threading.local()  # job_id and session of the upload being processed on this thread
+
+def update_ingest_progress(**fields):
+    """Update the session's ingest progress record (and the running upload job, if any)"""
+    get_session().ingest_progress.update(fields)
+
+    job_id = getattr(upload_job_context, 'job_id', None)
+    if job_id:
+        job_fields = {key: value for key, value in fields.items() if key != 'filename'}
+        if 'status' in job_fields:
+            job_fields['phase'] = job_fields.pop('status')
+        update_upload_job(job_id, **job_fields)
+
+def sniff_csv_schema(filepath, categorize=True, compression=None):
+    """
+    Infer encoding, delimiter, header and per-column types from the first
+    SNIFF_SAMPLE_MB of a CSV file, so the full parse can be given explicit
+    dtype/parse_dates arguments instead of guessing and fixing types later.
+
+    Columns are classified as float64, object or category (low-cardinality
+    text, when categorize is set), dates with one resolved strptime format
+    (parsed by read_csv itself), or datetime candidates that still need the
+    full detector (numeric timestamps, mixed formats, no sampled values).
+    """
+    sample_limit = int(app.config['SNIFF_SAMPLE_MB'] * 1024 * 1024)
+    with open_upload_stream(filepath, compression) as f:
+        # Decompressing streams may return short reads
+        blocks = []
+        remaining = sample_limit
+        while remaining > 0:
+            block = f.read(remaining)
+            if not block:
+                break
+            blocks.append(block)
+            remaining -= len(block)
+    raw = b''.join(blocks)
+    if len(raw) == sample_limit and b'\n' in raw:
+        # Only keep complete lines
+        raw = raw[:raw.rindex(b'\n') + 1]
+
+    encoding = 'utf-8-sig' if raw.startswith(codecs.BOM_UTF8) else None
+    text = None
+    for candidate in ([encoding] if encoding else ['utf-8', 'cp1252', 'latin-1']):
+        try:
+            text = raw.decode(candidate)
+            encoding = candidate
+            break
+        except UnicodeDecodeError:
             continue
-            
-        # Convert to string for pattern matching
-        sample_str = sample.astype(str).head(100)
-        
-        # Special handling for potential Unix timestamps (numeric columns)
-        if df[column].dtype in ['int64', 'float64']:
+
+    # csv.Sniffer's regexes get very slow on long quoted text, so only show it the first lines
+    head_text = ''.join(io.StringIO(text).readlines(8192)[:20])
+    try:
+        delimiter = csv.Sniffer().sniff(head_text, delimiters=',;\t|').delimiter
+    except csv.Error:
+        delimiter = ','
+
+    # has_header() is a heuristic, so only trust "no header" when the first row is all numbers
+    header = True
+    try:
+        if not csv.Sniffer().has_header(head_text):
+            first_row = next(csv.reader(io.StringIO(head_text), delimiter=delimiter))
+            header = not pd.to_numeric(pd.Series(first_row), errors='coerce').notna().all()
+    except (csv.Error, StopIteration):
+        pass
+
+    schema = {
+        'encoding': encoding,
+        'delimiter': delimiter,
+        'header': header,
+        'sniffed_bytes': len(raw),
+        'sniffed_rows': raw.count(b'\n') - (1 if header else 0),
+        'dtypes': {},
+        'date_formats': {},
+        'datetime_candidates': []
+    }
+
+    try:
+        sample = pd.read_csv(io.StringIO(text), sep=delimiter, header=0 if header else None)
+    except Exception as e:
+        logger.warning(f"Schema sniffing could not parse the sample ({e}), types will be inferred by the full parse")
+        schema['datetime_candidates'] = None
+        return schema
+
+    category_ratio = app.config['CATEGORY_MAX_UNIQUE_RATIO']
+    for column in sample.columns:
+        values = sample[column].dropna()
+        if len(values) == 0:
+            # Nothing to go on - leave the column to pandas and the full detector
+            schema['datetime_candidates'].append(column)
+            continue
+
+        if pd.api.types.is_numeric_dtype(values) and not pd.api.types.is_bool_dtype(values):
+            converted, _, _ = detect_datetime_column(values)
+            if converted is not None:
+                schema['datetime_candidates'].append(column)
+            # Integers stay unfixed: a later missing value would make the column float
+            if values.dtype == 'float64':
+                schema['dtypes'][column] = 'float64'
+            continue
+
+        if values.dtype != 'object':
+            continue
+
+        date_sample = values.head(1000)
+        family, likelihood = classify_datetime_sample(date_sample.astype(str))
+        if family is not None and likelihood >= DATETIME_MATCH_THRESHOLD:
+            fmt, success_rate = choose_datetime_format(date_sample, family)
+            padded = (date_sample.astype(str) != date_sample.astype(str).str.strip()).any()
+            if fmt is not None and fmt != 'mixed' and success_rate == 1 and not padded:
+                schema['date_formats'][column] = fmt
+            else:
+                schema['datetime_candidates'].append(column)
+            continue
+
+        is_text = values.map(type).eq(str).all()
+        if categorize and is_text and values.nunique() / len(values) <= category_ratio:
+            schema['dtypes'][column] = 'category'
+        else:
+            schema['dtypes'][column] = 'object'
+
+    logger.info(f"🔎 Sniffed schema: encoding={encoding}, delimiter={delimiter!r}, header={header}, "
+                f"{len(schema['dtypes'])} typed columns, {len(schema['date_formats'])} date columns")
+    return schema
+
+def csv_read_options(schema=None, usecols=None):
+    """Dialect, column selection and date parsing arguments for pd.read_csv from a sniffed schema"""
+    options = {}
+    if usecols:
+        options['usecols'] = usecols
+    if schema:
+        options['sep'] = schema['delimiter']
+        options['encoding'] = schema['encoding']
+        options['header'] = 0 if schema['header'] else None
+        date_formats = {column: fmt for column, fmt in schema['date_formats'].items()
+                        if not usecols or column in usecols}
+        if date_formats:
+            options['parse_dates'] = list(date_formats)
+            options['date_format'] = date_formats
+    return options
+
+def sniffed_dtypes(schema, allow_category=True):
+    """Explicit dtype mapping for pd.read_csv from a sniffed schema"""
+    return {
+        column: ('object' if dtype == 'category' and not allow_category else dtype)
+        for column, dtype in schema['dtypes'].items()
+    }
+
+def finish_sniffed_dates(df, schema):
+    """
+    Normalize the date columns read_csv parsed from sniffed formats and return
+    the columns that still need full datetime detection (None means all).
+    """
+    if schema is None or schema['datetime_candidates'] is None:
+        return None
+
+    remaining = [column for column in schema['datetime_candidates'] if column in df.columns]
+    for column in schema['date_formats']:
+        if column not in df.columns:
+            continue
+        if pd.api.types.is_datetime64_any_dtype(df[column]):
+            df[column] = df[column].dt.normalize()
+        else:
+            # Some value outside the sampled format made read_csv keep text
+            remaining.append(column)
+    return remaining
+
+CSV_PARSE_ENGINES = ('auto', 'pandas', 'pyarrow')
+
+# pd.read_csv's default missing-value markers, so the pyarrow engine reads the same NaNs
+PANDAS_NA_VALUES = ['', '#N/A', '#N/A N/A', '#NA', '-1.#IND', '-1.#QNAN', '-NaN', '-nan', '1.#IND',
+                    '1.#QNAN', '<NA>', 'N/A', 'NA', 'NULL', 'NaN', 'None', 'n/a', 'nan', 'null']
+
+def resolve_csv_engine(requested=None, streaming=False):
+    """Pick the engine ('pandas' or 'pyarrow') that parses a CSV upload"""
+    engine = (requested or app.config['CSV_PARSE_ENGINE']).lower()
+    if engine not in CSV_PARSE_ENGINES:
+        raise ValueError(f"Unknown CSV parse engine '{engine}' (expected one of {', '.join(CSV_PARSE_ENGINES)})")
+
+    # Streaming parses are chunked to bound memory, which only the pandas reader does here
+    if engine == 'pandas' or streaming:
+        return 'pandas'
+    try:
+        from pyarrow import csv as pa_csv  # noqa: F401
+    except ImportError:
+        if engine == 'pyarrow':
+            logger.warning("pyarrow is not installed - using the pandas CSV parser")
+        return 'pandas'
+    return 'pyarrow'
+
+def read_csv_pyarrow(filepath, read_options=None, dtypes=None, compression=None):
+    """
+    Parse a whole CSV file with pyarrow's multithreaded reader and convert it
+    to the numpy-backed DataFrame pd.read_csv would produce for the same options.
+
+    Date, time and timestamp columns pyarrow infers on its own are kept as text
+    so datetime detection handles them exactly as on the pandas path, and
+    sniffed date columns are parsed with their format (bad values become NaT).
+    """
+    import pyarrow as pa
+    from pyarrow import csv as pa_csv
+
+    read_options = read_options or {}
+    has_header = read_options.get('header', 0) is not None
+    usecols = read_options.get('usecols')
+    date_formats = read_options.get('date_format') or {}
+    if usecols and not has_header:
+        raise ValueError("column selection by name needs a header row")
+
+    def arrow_name(column):
+        # Headerless files get pyarrow's generated names instead of pandas' positions
+        return column if has_header else f"f{column}"
+
+    arrow_types = {'float64': pa.float64(), 'object': pa.string(),
+                   'category': pa.dictionary(pa.int32(), pa.string())}
+    column_types = {arrow_name(column): arrow_types[dtype] for column, dtype in (dtypes or {}).items()}
+    for column in date_formats:
+        column_types[arrow_name(column)] = pa.string()
+
+    arrow_read = pa_csv.ReadOptions(use_threads=True, encoding=read_options.get('encoding') or 'utf8',
+                                    autogenerate_column_names=not has_header)
+    arrow_parse = pa_csv.ParseOptions(delimiter=read_options.get('sep', ','))
+
+    def convert_options():
+        return pa_csv.ConvertOptions(column_types=column_types, null_values=PANDAS_NA_VALUES,
+                                     strings_can_be_null=True,
+                                     include_columns=[arrow_name(column) for column in usecols or []])
+
+    def source():
+        # pyarrow decompresses gzip/zstd natively; zip members come through Python
+        if compression in ('gzip', 'zstd'):
+            return pa.input_stream(filepath, compression=compression)
+        return filepath if compression is None else open_upload_stream(filepath, compression)
+
+    # Look at the types inferred from the first block and keep temporal columns as text
+    with pa_csv.open_csv(source(), read_options=arrow_read, parse_options=arrow_parse,
+                         convert_options=convert_options()) as reader:
+        for field in reader.schema:
+            if pa.types.is_temporal(field.type):
+                column_types[field.name] = pa.string()
+
+    table = pa_csv.read_csv(source(), read_options=arrow_read, parse_options=arrow_parse,
+                            convert_options=convert_options())
+    df = table.to_pandas(split_blocks=True, self_destruct=True)
+    del table
+
+    if not has_header:
+        df.columns = range(len(df.columns))
+    for column in df.columns:
+        if isinstance(df[column].dtype, pd.CategoricalDtype):
+            # pd.read_csv sorts the categories it reads, pyarrow keeps first-seen order
+            df[column] = df[column].cat.reorder_categories(sorted(df[column].cat.categories))
+    for column, fmt in date_formats.items():
+        if column in df.columns:
+            df[column] = pd.to_datetime(df[column], format=fmt, errors='coerce')
+    return df
+
+def infer_fixed_dtypes(filepath, chunk_rows, read_options=None, compression=None, nullable=False):
+    """
+    Infer column dtypes from the first chunk of a CSV file. Float and text
+    columns are always fixed; with nullable, integer and boolean columns are
+    fixed as Int64/boolean so a later missing value cannot change their dtype
+    between chunks.
+    """
+    with open_upload_stream(filepath, compression) as handle:
+        first_chunk = pd.read_csv(handle, nrows=chunk_rows, **(read_options or {}))
+    return fixed_dtypes_from_chunk(first_chunk, nullable)
+
+def fixed_dtypes_from_chunk(first_chunk, nullable=False):
+    """The dtypes infer_fixed_dtypes fixes, taken from an already parsed first chunk"""
+    fixed_dtypes = {}
+    for column in first_chunk.columns:
+        dtype = first_chunk[column].dtype
+        if dtype == 'float64':
+            fixed_dtypes[column] = 'float64'
+        elif dtype == 'object':
+            fixed_dtypes[column] = 'object'
+        elif nullable and pd.api.types.is_bool_dtype(dtype):
+            fixed_dtypes[column] = 'boolean'
+        elif nullable and pd.api.types.is_integer_dtype(dtype):
+            fixed_dtypes[column] = 'Int64'
+    return fixed_dtypes
+
+def unpin_nullable_column(values):
+    """
+    The dtype a one-shot read_csv gives a column parsed as Int64/boolean:
+    int64/bool without missing values, float64/object with them
+    """
+    if isinstance(values, np.ndarray):
+        return values
+    has_missing = values.isna().any()
+    if isinstance(values.dtype, pd.BooleanDtype):
+        return values.to_numpy(dtype=object, na_value=np.nan) if has_missing else values.to_numpy(dtype=bool)
+    if isinstance(values.dtype, pd.Int64Dtype):
+        return values.to_numpy(dtype='float64', na_value=np.nan) if has_missing else values.to_numpy(dtype='int64')
+    return values
+
+def buffer_chunk_columns(column_buffers, chunk):
+    """Copy a parsed chunk's columns into per-column buffers so the chunk itself can be freed"""
+    if not column_buffers:
+        column_buffers.update((column, []) for column in chunk.columns)
+    for column in chunk.columns:
+        if isinstance(chunk[column].dtype, np.dtype):
+            # A view would keep the chunk's whole 2-D block alive; copy the column out
+            column_buffers[column].append(chunk[column].to_numpy(copy=True))
+        else:
+            column_buffers[column].append(chunk[column].array)
+
+def assemble_column_buffers(column_buffers):
+    """Build the final frame column by column, releasing each column's chunks as soon as they are merged"""
+    columns = list(column_buffers.keys())
+    assembled = {}
+    for column in columns:
+        parts = column_buffers.pop(column)
+        if len(parts) == 1:
+            merged = parts[0]
+        elif all(isinstance(part, np.ndarray) for part in parts):
+            merged = np.concatenate(parts)
+        else:
+            merged = pd.concat([pd.Series(part, copy=False) for part in parts], ignore_index=True).array
+        del parts
+        assembled[column] = unpin_nullable_column(merged)
+        del merged
+    return pd.DataFrame(assembled, columns=columns, copy=False)
+
+def read_csv_streaming(filepath, chunk_rows=None, progress_callback=None, read_options=None, fixed_dtypes=None,
+                       date_formats=None, compression=None):
+    """
+    Read a CSV file chunk by chunk into a compact columnar buffer.
+
+    Column dtypes are inferred from the first chunk and fixed for the rest of
+    the parse (integer and boolean columns as their nullable dtypes, restored
+    to what a one-shot parse gives once assembled), each chunk is copied into
+    per-column arrays straight away, and the final frame is assembled one
+    column at a time so peak memory stays close to the size of the finished
+    DataFrame. fixed_dtypes (e.g. from a sniffed schema) take precedence.
+    Columns in date_formats are parsed per chunk (unparseable values become
+    NaT) so every buffer is datetime64.
+    """
+    chunk_rows = chunk_rows or app.config['STREAMING_CHUNK_ROWS']
+    total_bytes = uncompressed_size(filepath, compression)
+    read_options = read_options or {}
+    fixed_dtypes = {**infer_fixed_dtypes(filepath, chunk_rows, read_options, compression, nullable=True),
+                    **(fixed_dtypes or {})}
+
+    try:
+        return _read_csv_chunks(filepath, chunk_rows, fixed_dtypes, total_bytes, progress_callback,
+                                read_options, date_formats, compression)
+    except (ValueError, TypeError) as e:
+        # A later chunk did not fit the dtypes seen in the first one - reparse letting pandas infer
+        logger.warning(f"Fixed dtypes from first chunk did not hold ({e}), re-reading with per-chunk inference")
+        return _read_csv_chunks(filepath, chunk_rows, None, total_bytes, progress_callback,
+                                read_options, date_formats, compression)
+
+def _read_csv_chunks(filepath, chunk_rows, fixed_dtypes, total_bytes, progress_callback, read_options,
+                     date_formats=None, compression=None):
+    """Parse CSV chunks into per-column array buffers and assemble the final frame"""
+    column_buffers = {}
+    rows_parsed = 0
+    chunk_count = 0
+
+    with open_upload_stream(filepath, compression) as handle:
+        reader = pd.read_csv(handle, chunksize=chunk_rows, dtype=fixed_dtypes, **read_options)
+        for chunk in reader:
+            for column, fmt in (date_formats or {}).items():
+                chunk[column] = pd.to_datetime(chunk[column], format=fmt, errors='coerce')
+            buffer_chunk_columns(column_buffers, chunk)
+
+            rows_parsed += len(chunk)
+            chunk_count += 1
+            del chunk
+
+            bytes_parsed = min(handle.tell(), total_bytes)
+            if progress_callback:
+                progress_callback(rows_parsed, bytes_parsed, total_bytes)
+
+    df = assemble_column_buffers(column_buffers)
+
+    ingest_stats = {
+        'mode': 'streaming',
+        'engine': 'pandas',
+        'chunks': chunk_count,
+        'chunk_rows': chunk_rows,
+        'rows_parsed': rows_parsed,
+        'bytes_parsed': total_bytes
+    }
+    return df, ingest_stats
+
+EXCEL_SHEET_COLUMN = 'source_sheet'  # Added when several sheets are stacked into one dataset
+
+def list_excel_sheets(filepath, file_ext):
+    """Sheet names of a workbook, read without loading any cell data"""
+    if file_ext == 'xls':
+        import xlrd
+        book = xlrd.open_workbook(filepath, on_demand=True)
+        try:
+            return book.sheet_names()
+        finally:
+            book.release_resources()
+    from openpyxl import load_workbook
+    workbook = load_workbook(filepath, read_only=True, keep_links=False)
+    try:
+        return workbook.sheetnames
+    finally:
+        workbook.close()
+
+def iter_xlsx_rows(worksheet):
+    """
+    Rows of a read-only openpyxl worksheet with cells converted the way
+    pd.read_excel converts them: empty cells as '', error cells as NaN and
+    integral numbers as int. Trailing empty cells are dropped, and empty rows
+    are held back until a later row has data, so trailing empty rows are
+    never yielded.
+    """
+    from openpyxl.cell.cell import TYPE_ERROR, TYPE_NUMERIC
+
+    blank_rows = 0
+    for row in worksheet.iter_rows():
+        values = []
+        for cell in row:
+            value = cell.value
+            if value is None:
+                value = ''
+            elif cell.data_type == TYPE_ERROR:
+                value = np.nan
+            elif cell.data_type == TYPE_NUMERIC and int(value) == value:
+                value = int(value)
+            values.append(value)
+        while values and values[-1] == '':
+            values.pop()
+
+        if not values:
+            blank_rows += 1
+            continue
+        for _ in range(blank_rows):
+            yield []
+        blank_rows = 0
+        yield values
+
+def read_xlsx_sheet(filepath, sheet_name, usecols=None, progress_callback=None, nrows=None):
+    """
+    Parse one .xlsx sheet from openpyxl's read-only row stream, STREAMING_CHUNK_ROWS
+    rows at a time. Each chunk goes through pandas' TextParser (the parser behind
+    pd.read_excel) with the dtypes of the first chunk pinned, and is copied into
+    per-column buffers, so only one chunk of rows is held at once. Raises
+    ValueError when a later chunk does not fit the pinned dtypes.
+    """
+    from openpyxl import load_workbook
+    from pandas.io.parsers import TextParser
+
+    chunk_rows = app.config['STREAMING_CHUNK_ROWS'] if nrows is None else nrows
+    workbook = load_workbook(filepath, read_only=True, data_only=True, keep_links=False)
+    try:
+        worksheet = workbook[sheet_name]
+        # Read-only sheets trust the stored dimensions, which are often wrong
+        worksheet.reset_dimensions()
+        rows = iter_xlsx_rows(worksheet)
+        header = next(rows, None)
+        if header is None:
+            return pd.DataFrame()
+
+        def parse(chunk, dtype=None):
+            # Pad as pd.read_excel does, so blank cells read as missing values; a wider row
+            # widens the header, adding the same 'Unnamed: n' columns
+            width = max([len(header)] + [len(values) for values in chunk])
+            header.extend([''] * (width - len(header)))
+            for values in chunk:
+                values.extend([''] * (width - len(values)))
+            return TextParser([header] + chunk, header=0, skip_blank_lines=False, usecols=usecols,
+                              dtype=dtype).read()
+
+        column_buffers = {}
+        fixed_dtypes = None
+        date_columns = {}
+        rows_parsed = 0
+        while True:
+            chunk = list(itertools.islice(rows, chunk_rows))
+            if not chunk and fixed_dtypes is not None:
+                break
+            frame = parse(chunk, fixed_dtypes)
+            if fixed_dtypes is None:
+                # The python parser cannot cast cell booleans to 'boolean'; bool chunks merge with object ones anyway
+                fixed_dtypes = {column: dtype for column, dtype in fixed_dtypes_from_chunk(frame, nullable=True).items()
+                                if dtype != 'boolean'}
+                date_columns = {column: dtype for column, dtype in frame.dtypes.items()
+                                if pd.api.types.is_datetime64_any_dtype(dtype)}
+                frame = parse(chunk, fixed_dtypes) if fixed_dtypes else frame
+            del chunk
+
+            # TextParser still converts an all-date chunk of a text column; keep it text like the rest
+            for column, dtype in fixed_dtypes.items():
+                if dtype == 'object' and frame[column].dtype != object:
+                    values = frame[column].astype(object)
+                    frame[column] = values.where(values.notna(), np.nan)
+            # TextParser cannot pin datetimes; a chunk without any dates keeps the column's dtype
+            for column, dtype in date_columns.items():
+                if frame[column].dtype != dtype:
+                    if frame[column].notna().any():
+                        raise ValueError(f"Column '{column}' is not all dates in sheet '{sheet_name}'")
+                    frame[column] = pd.Series(pd.NaT, index=frame.index, dtype=dtype)
+            # Columns added by a widened header were blank in every earlier row
+            for column in frame.columns:
+                if column_buffers and column not in column_buffers:
+                    column_buffers[column] = [np.full(rows_parsed, np.nan)]
+            buffer_chunk_columns(column_buffers, frame)
+            rows_parsed += len(frame)
+            del frame
+
+            if progress_callback:
+                progress_callback(rows_parsed)
+            if nrows is not None:
+                break
+        return assemble_column_buffers(column_buffers)
+    finally:
+        workbook.close()
+
+def read_excel_sheet(filepath, file_ext, sheet_name, usecols=None, progress_callback=None, nrows=None):
+    """Parse one sheet (or its first nrows rows) into a DataFrame with pd.read_excel's type inference"""
+    if file_ext == 'xlsx':
+        try:
+            return read_xlsx_sheet(filepath, sheet_name, usecols, progress_callback, nrows)
+        except (ValueError, TypeError) as e:
+            # A later chunk did not fit the first one's dtypes
+            logger.warning(f"Chunked .xlsx read of '{sheet_name}' did not hold ({e}), falling back to pd.read_excel")
+    return pd.read_excel(filepath, sheet_name=sheet_name, usecols=usecols, nrows=nrows)
+
+def read_excel_sheets_parallel(filepath, file_ext, sheet_names, usecols):
+    """Parse several sheets across the worker process pool, returning frames in sheet order"""
+    # Sheets share the process pool used for datetime detection
+    pool = get_datetime_detection_pool()
+    try:
+        futures = [pool.submit(read_excel_sheet, filepath, file_ext, name, usecols) for name in sheet_names]
+        return [future.result() for future in futures]
+    except BrokenProcessPool:
+        reset_datetime_detection_pool(pool)
+        raise
+
+def read_excel_file(filepath, file_ext, sheets=None, usecols=None, nrows=None):
+    """
+    Parse the requested sheets of an Excel upload (the first sheet by default,
+    '*' for all). Several sheets are parsed in parallel and stacked into one
+    frame with a source_sheet column. Returns the frame and sheet statistics.
+    With nrows only the head of the first requested sheet is read.
+    """
+    available = list_excel_sheets(filepath, file_ext)
+    if not available:
+        raise ValueError('Workbook has no sheets')
+
+    if not sheets:
+        selected = available[:1]
+    elif sheets == ['*']:
+        selected = available
+    else:
+        missing = [name for name in sheets if name not in available]
+        if missing:
+            raise ValueError(f"Worksheet(s) not found: {', '.join(missing)} (available: {', '.join(available)})")
+        selected = list(dict.fromkeys(sheets))
+
+    def report_rows(rows_parsed):
+        update_ingest_progress(rows_parsed=rows_parsed)
+        logger.info(f"Parsed {rows_parsed:,} rows")
+
+    workers = min(app.config['DATETIME_DETECTION_WORKERS'], len(selected))
+    frames = None
+    if nrows is not None:
+        frames = [read_excel_sheet(filepath, file_ext, selected[0], usecols, nrows=nrows)]
+    elif workers > 1:
+        logger.info(f"Reading {len(selected)} sheets in parallel with {workers} workers")
+        try:
+            frames = read_excel_sheets_parallel(filepath, file_ext, selected, usecols)
+        except BrokenProcessPool as e:
+            logger.warning(f"Parallel sheet parsing failed ({e}), reading sheets one by one")
+    if frames is None:
+        frames = [read_excel_sheet(filepath, file_ext, name, usecols, progress_callback=report_rows)
+                  for name in selected]
+
+    if len(selected) == 1:
+        df = frames[0]
+    else:
+        for name, frame in zip(selected, frames):
+            frame.insert(0, EXCEL_SHEET_COLUMN, name)
+        df = pd.concat(frames, ignore_index=True)
+    return df, {'sheets': available, 'sheets_loaded': selected}
+
+def read_uploaded_file(filepath, file_ext, streaming=False, schema=None, usecols=None, engine=None, sheets=None,
+                       compression=None):
+    """Parse a saved upload into a DataFrame, returning the frame and ingest statistics"""
+    total_bytes = uncompressed_size(filepath, compression)
+
+    def report_progress(rows_parsed, bytes_parsed, total):
+        update_ingest_progress(rows_parsed=rows_parsed, bytes_parsed=bytes_parsed)
+        logger.info(f"Parsed {rows_parsed:,} rows ({bytes_parsed / (1024*1024):.2f} of {total / (1024*1024):.2f} MB)")
+
+    read_options = csv_read_options(schema, usecols)
+    engine_stats = {}
+
+    if file_ext == 'csv' and streaming:
+        logger.info("Reading as CSV file in streaming mode...")
+        fixed_dtypes = sniffed_dtypes(schema, allow_category=False) if schema else None
+        # Dates are converted chunk by chunk so a stray value cannot leave mixed buffers behind
+        date_formats = read_options.pop('date_format', None)
+        read_options.pop('parse_dates', None)
+        return read_csv_streaming(filepath, progress_callback=report_progress, read_options=read_options,
+                                  fixed_dtypes=fixed_dtypes, date_formats=date_formats, compression=compression)
+
+    if file_ext == 'csv':
+        engine = resolve_csv_engine(engine)
+        dtypes = sniffed_dtypes(schema) if schema else None
+        df = None
+        if engine == 'pyarrow':
+            logger.info("Reading as CSV file with the pyarrow engine...")
             try:
-                # Check if values are in Unix timestamp range
-                sample_numeric = sample.head(50)
-                timestamp_candidates = 0
-                
-                for val in sample_numeric:
-                    # Unix timestamp range check (1970-2050)
-                    if 946684800 <= val <= 2524608000:  # seconds range
-                        timestamp_candidates += 1
-                    elif 946684800000 <= val <= 2524608000000:  # milliseconds range
-                        timestamp_candidates += 1
-                
-                if timestamp_candidates / len(sample_numeric) >= 0.75:
-                    # Try to convert as Unix timestamp
-                    test_val = float(sample_numeric.iloc[0])
-                    if test_val > 1e10:  # Likely milliseconds
-                        converted = pd.to_datetime(df[column], unit='ms', errors='coerce')
-                    else:  # Likely seconds
-                        converted = pd.to_datetime(df[column], unit='s', errors='coerce')
-                    
-                    success_rate = converted.notna().sum() / df[column].notna().sum()
-                    if success_rate >= 0.75:
-                        # Convert to date-only format (remove time component)
-                        df[column] = converted.dt.date
-                        converted_columns.append(column)
-                        logger.info(f"✅ Converted '{column}' from Unix timestamp to date-only format ({success_rate:.2%} success)")
-                        continue
+                df = read_csv_pyarrow(filepath, read_options, dtypes, compression)
             except Exception as e:
-                logger.debug(f"Unix timestamp check failed for '{column}': {e}")
-        
-        # Check if string values match datetime patterns
-        datetime_likelihood = 0
-        matching_pattern = None
-        
-        for pattern in datetime_patterns:
-            matches = sample_str.str.match(pattern, na=False).sum()
-            if matches > 0:
-                likelihood = matches / len(sample_str)
-                if likelihood > datetime_likelihood:
-                    datetime_likelihood = likelihood
-                    matching_pattern = pattern
-        
-        # If at least 75% of values look like dates, try to convert
-        if datetime_likelihood >= 0.75:
-            logger.info(f"Column '{column}' has {datetime_likelihood:.2%} datetime-like values (pattern: {matching_pattern})")
-            
-            # Try pandas automatic parsing first
+                # Anything pyarrow cannot handle goes through the pandas parser as before
+                logger.warning(f"pyarrow engine could not parse the file ({e}), falling back to pandas")
+                engine = 'pandas'
+                engine_stats['engine_fallback'] = str(e)
+        if df is None:
+            logger.info("Reading as CSV file...")
             try:
-                converted = pd.to_datetime(df[column], errors='coerce', infer_datetime_format=True)
-                success_rate = converted.notna().sum() / df[column].notna().sum()
-                if success_rate >= 0.75:
-                    # Convert to date-only format (remove time component)
-                    df[column] = converted.dt.date
-                    converted_columns.append(column)
-                    logger.info(f"✅ Converted '{column}' to date-only format using automatic parsing ({success_rate:.2%} success)")
-                    continue
-            except Exception as e:
-                logger.debug(f"Auto parsing failed for '{column}': {e}")
-            
-            # Try specific formats
-            best_format = None
-            best_success_rate = 0
-            
-            for fmt in datetime_formats:
-                try:
-                    # Test on a subset first for efficiency
-                    test_sample = sample.head(20)
-                    test_converted = pd.to_datetime(test_sample, format=fmt, errors='coerce')
-                    test_success_rate = test_converted.notna().sum() / len(test_sample)
-                    
-                    if test_success_rate >= 0.75:  # If test is promising, try full column
-                        converted = pd.to_datetime(df[column], format=fmt, errors='coerce')
-                        success_rate = converted.notna().sum() / df[column].notna().sum()
-                        if success_rate > best_success_rate:
-                            best_success_rate = success_rate
-                            best_format = fmt
-                except Exception as e:
-                    continue
-            
-            # Apply the best format if success rate is good enough
-            if best_format and best_success_rate >= 0.75:
-                try:
-                    converted = pd.to_datetime(df[column], format=best_format, errors='coerce')
-                    # Convert to date-only format (remove time component)
-                    df[column] = converted.dt.date
-                    converted_columns.append(column)
-                    logger.info(f"✅ Converted '{column}' to date-only format using format {best_format} ({best_success_rate:.2%} success)")
-                except Exception as e:
-                    logger.warning(f"Failed to convert '{column}' despite good format match: {e}")
+                with open_upload_stream(filepath, compression) as handle:
+                    df = pd.read_csv(handle, dtype=dtypes, **read_options)
+            except ValueError as e:
+                if not dtypes:
+                    raise
+                # The sample did not represent the whole file - let pandas infer the types
+                logger.warning(f"Sniffed dtypes did not hold ({e}), re-reading with inferred dtypes")
+                with open_upload_stream(filepath, compression) as handle:
+                    df = pd.read_csv(handle, **read_options)
+        engine_stats['engine'] = engine
+    else:
+        logger.info("Reading as Excel file...")
+        df, sheet_stats = read_excel_file(filepath, file_ext, sheets=sheets, usecols=usecols)
+        engine_stats.update(sheet_stats)
+
+    update_ingest_progress(rows_parsed=len(df), bytes_parsed=total_bytes)
+    return df, {
+        'mode': 'full',
+        'rows_parsed': len(df),
+        'bytes_parsed': total_bytes,
+        **engine_stats
+    }
+
+CURRENT_SNAPSHOT = 'current'
+
+def snapshot_paths(name, folder=None):
+    """Return the (data, metadata) file paths for a named snapshot"""
+    base = os.path.join(folder or app.config['SNAPSHOT_FOLDER'], secure_filename(name))
+    return f"{base}.feather", f"{base}.json"
+
+def write_snapshot(df, name, metadata=None, folder=None):
+    """
+    Persist a DataFrame as an uncompressed Feather file plus a JSON sidecar.
+    Uncompressed Arrow IPC can be memory-mapped back without a decode pass,
+    and dtypes (datetime64, category, nullable ints) round-trip exactly.
+    Returns True when the snapshot was written.
+    """
+    if not app.config['SNAPSHOTS_ENABLED'] or df is None:
+        return False
+    try:
+        import pyarrow as pa
+        from pyarrow import feather
+    except ImportError:
+        logger.warning("pyarrow is not installed - snapshots are disabled")
+        return False
+
+    data_path, meta_path = snapshot_paths(name, folder)
+    try:
+        start_time = time.time()
+        os.makedirs(os.path.dirname(data_path), exist_ok=True)
+        table = pa.Table.from_pandas(df)
+        # Write to a temp file first so a crash never leaves a truncated snapshot
+        feather.write_feather(table, f"{data_path}.tmp", compression='uncompressed')
+        os.replace(f"{data_path}.tmp", data_path)
+
+        meta = {
+            'name': name,
+            'shape': list(df.shape),
+            'columns': [str(col) for col in df.columns],
+            'saved_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        }
+        meta.update(metadata or {})
+        with open(f"{meta_path}.tmp", 'w') as f:
+            json.dump(meta, f, default=str)
+        os.replace(f"{meta_path}.tmp", meta_path)
+
+        logger.info(f"💾 Snapshot '{name}' written in {time.time() - start_time:.2f}s "
+                    f"({os.path.getsize(data_path) / (1024*1024):.2f} MB)")
+        return True
+    except Exception as e:
+        logger.warning(f"Could not write snapshot '{name}': {str(e)}")
+        return False
+
+def link_snapshot(source_name, target_name, metadata=None, source_folder=None, target_folder=None):
+    """Expose an existing snapshot under another name without rewriting the data"""
+    source_data, source_meta = snapshot_paths(source_name, source_folder)
+    target_data, target_meta = snapshot_paths(target_name, target_folder)
+    if not os.path.exists(source_data):
+        return False
+    try:
+        os.makedirs(os.path.dirname(target_data), exist_ok=True)
+        if os.path.exists(target_data):
+            os.remove(target_data)
+        try:
+            os.link(source_data, target_data)
+        except OSError:
+            shutil.copyfile(source_data, target_data)
+
+        with open(source_meta) as f:
+            meta = json.load(f)
+        meta['name'] = target_name
+        meta.update(metadata or {})
+        with open(target_meta, 'w') as f:
+            json.dump(meta, f, default=str)
+        return True
+    except Exception as e:
+        logger.warning(f"Could not link snapshot '{source_name}' to '{target_name}': {str(e)}")
+        return False
+
+def read_snapshot(name, columns=None, folder=None):
+    """
+    Memory-map a snapshot back into a DataFrame. When columns is given only
+    those columns are materialized; the rest of the file is never paged in.
+    The frame is copied out of the mapping so it can be edited in place.
+    Returns (df, metadata).
+    """
+    from pyarrow import feather
+
+    data_path, meta_path = snapshot_paths(name, folder)
+    if not os.path.exists(data_path):
+        raise FileNotFoundError(f"Snapshot '{name}' not found")
+
+    table = feather.read_table(data_path, memory_map=True)
+    if columns:
+        missing = [col for col in columns if col not in table.column_names]
+        if missing:
+            raise KeyError(f"Columns not in snapshot: {missing}")
+        # Keep any serialized index columns so the row labels survive the subset
+        index_columns = [col for col in table.column_names if col.startswith('__index_level_')]
+        table = table.select(list(columns) + index_columns)
+
+    # Zero-copy conversion leaves numpy buffers (and categorical codes) read-only;
+    # one deep copy from the file-backed pages makes the frame writable
+    df = table.to_pandas(split_blocks=True).copy()
+    del table
+
+    meta = {}
+    if os.path.exists(meta_path):
+        with open(meta_path) as f:
+            meta = json.load(f)
+    return df, meta
+
+def list_snapshots(folder=None):
+    """Return metadata for every snapshot in a folder, newest first"""
+    snapshots = []
+    folder = folder or app.config['SNAPSHOT_FOLDER']
+    if not os.path.isdir(folder):
+        return snapshots
+
+    for entry in os.listdir(folder):
+        if not entry.endswith('.json'):
+            continue
+        data_path = os.path.join(folder, entry[:-len('.json')] + '.feather')
+        if not os.path.exists(data_path):
+            continue
+        try:
+            with open(os.path.join(folder, entry)) as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            continue
+        snapshots.append({
+            'name': meta.get('name'),
+            'filename': meta.get('filename'),
+            'shape': meta.get('shape'),
+            'operations_count': len(meta.get('operations', [])),
+            'saved_at': meta.get('saved_at'),
+            'size_mb': round(os.path.getsize(data_path) / (1024*1024), 2)
+        })
+    snapshots.sort(key=lambda snap: snap['saved_at'] or '', reverse=True)
+    return snapshots
+
+PARSED_CACHE_PREFIX = 'parsed-'
+
+def save_upload_with_hash(file_storage, filepath, block_size=1024 * 1024):
+    """Stream an uploaded file to disk while computing its SHA-256 digest"""
+    digest = hashlib.sha256()
+    with open(filepath, 'wb') as out:
+        while True:
+            block = file_storage.stream.read(block_size)
+            if not block:
+                break
+            digest.update(block)
+            out.write(block)
+    return digest.hexdigest()
+
+def parsed_cache_key(content_hash, file_ext, compact, usecols=None, sheets=None):
+    """Snapshot name for a parsed upload; parse options that change the frame are part of the key"""
+    key = f"{PARSED_CACHE_PREFIX}{content_hash}-{file_ext}-{'compact' if compact else 'raw'}"
+    if usecols:
+        key += '-' + hashlib.sha256('\x1f'.join(usecols).encode()).hexdigest()[:12]
+    if sheets:
+        key += '-sheets-' + hashlib.sha256('\x1f'.join(sheets).encode()).hexdigest()[:12]
+    return key
+
+def lookup_parsed_cache(cache_key):
+    """Return (df, metadata) for a cached parsed upload, or None on a miss"""
+    if not app.config['PARSED_CACHE_ENABLED']:
+        return None
+    data_path, meta_path = snapshot_paths(cache_key)
+    if not os.path.exists(data_path):
+        return None
+    try:
+        df, meta = read_snapshot(cache_key)
+        # An entry whose sidecar disagrees with its frame was linked from the wrong snapshot
+        if meta.get('shape') != list(df.shape) or meta.get('columns') != [str(col) for col in df.columns]:
+            logger.warning(f"Ignoring parsed cache entry {cache_key}: frame does not match its metadata")
+            return None
+        # The sidecar's mtime is the LRU clock
+        os.utime(meta_path)
+        return df, meta
+    except Exception as e:
+        logger.warning(f"Ignoring unreadable parsed cache entry {cache_key}: {str(e)}")
+        return None
+
+def evict_parsed_cache():
+    """Drop least recently used parsed frames beyond the entry and size budgets"""
+    folder = app.config['SNAPSHOT_FOLDER']
+    if not os.path.isdir(folder):
+        return
+
+    entries = []
+    for entry in os.listdir(folder):
+        if not (entry.startswith(PARSED_CACHE_PREFIX) and entry.endswith('.json')):
+            continue
+        name = entry[:-len('.json')]
+        data_path, meta_path = snapshot_paths(name)
+        size = os.path.getsize(data_path) if os.path.exists(data_path) else 0
+        entries.append((os.path.getmtime(meta_path), name, size))
+
+    # Most recently used first
+    entries.sort(reverse=True)
+    max_entries = app.config['PARSED_CACHE_MAX_ENTRIES']
+    max_bytes = app.config['PARSED_CACHE_MAX_MB'] * 1024 * 1024
+    kept_bytes = 0
+    for position, (_, name, size) in enumerate(entries):
+        if position < max_entries and kept_bytes + size <= max_bytes:
+            kept_bytes += size
+            continue
+        for path in snapshot_paths(name):
+            if os.path.exists(path):
+                os.remove(path)
+        logger.info(f"🗑️ Evicted parsed cache entry {name}")
+
+def save_current_snapshot():
+    """Snapshot the session's dataset together with its filename and operation log"""
+    session = get_session()
+    if session.out_of_core is not None:
+        # Partitions are already on disk; only the manifest needs the new operation log
+        session.out_of_core.filename = session.filename
+        session.out_of_core.operations = session.operations
+        session.out_of_core.save_manifest()
+        session.dirty = False
+        return True
+    saved = write_snapshot(session.data, CURRENT_SNAPSHOT, {
+        'filename': session.filename,
+        'operations': session.operations
+    }, folder=session.snapshot_folder)
+    if saved:
+        session.dirty = False
+    return saved
+
+def restore_snapshot(name=CURRENT_SNAPSHOT, columns=None):
+    """Load one of the session's snapshots as its dataset and return the snapshot metadata"""
+    session = get_session()
+
+    start_time = time.time()
+    df, meta = read_snapshot(name, columns=columns, folder=session.snapshot_folder)
+    clear_out_of_core(session)
+    session.data = df
+    session.filename = meta.get('filename')
+    session.operations = list(meta.get('operations', []))
+    invalidate_preview_cache()
+    logger.info(f"✅ Restored snapshot '{name}' {session.data.shape} in {time.time() - start_time:.2f}s")
+    return meta
+
+OUT_OF_CORE_FOLDER = 'out_of_core'
+
+# Endpoints that work on partitioned datasets (everything else under /api/ needs an in-memory frame)
+OUT_OF_CORE_ROUTES = ['/api/preview', '/api/info', '/api/detect-outliers', '/api/check-duplicates',
+                      '/api/impute-missing', '/api/download-csv']
+OUT_OF_CORE_ENDPOINTS = {
+    'upload_file', 'get_excel_sheets', 'init_chunked_upload', 'get_chunked_upload', 'upload_chunk',
+    'finalize_chunked_upload', 'get_upload_progress', 'get_upload_job', 'get_snapshots', 'restore_snapshot_endpoint',
+    'get_result_cache_stats', 'preview_data', 'get_data_info', 'detect_outliers', 'check_duplicates', 'impute_missing_values', 'download_csv'
+}
+
+class PartitionedDataset:
+    """
+    A dataset kept on disk as uncompressed Feather partitions of at most
+    OUT_OF_CORE_PARTITION_ROWS rows. Partitions are memory-mapped one at a
+    time (optionally only some columns), so peak memory is bounded by one
+    partition or one column rather than the whole frame. Each partition keeps
+    its global row labels, so indices match what an in-memory frame reports.
+    """
+
+    MANIFEST = 'manifest.json'
+
+    def __init__(self, folder):
+        self.folder = folder
+        self.partitions = []
+        self.row_counts = []
+        self.columns = []
+        self.dtypes = {}
+        self.filename = None
+        self.operations = []
+
+    @classmethod
+    def load(cls, folder):
+        """Open a partitioned dataset from its manifest"""
+        dataset = cls(folder)
+        with open(os.path.join(folder, cls.MANIFEST)) as f:
+            manifest = json.load(f)
+        dataset.partitions = manifest['partitions']
+        dataset.row_counts = manifest['row_counts']
+        dataset.columns = manifest['columns']
+        dataset.dtypes = manifest['dtypes']
+        dataset.filename = manifest.get('filename')
+        dataset.operations = manifest.get('operations', [])
+        return dataset
+
+    def save_manifest(self):
+        """Persist partition layout, schema and operation log"""
+        manifest = {
+            'partitions': self.partitions,
+            'row_counts': self.row_counts,
+            'columns': self.columns,
+            'dtypes': self.dtypes,
+            'filename': self.filename,
+            'operations': self.operations
+        }
+        manifest_path = os.path.join(self.folder, self.MANIFEST)
+        with open(f"{manifest_path}.tmp", 'w') as f:
+            json.dump(manifest, f, default=str)
+        os.replace(f"{manifest_path}.tmp", manifest_path)
+
+    @property
+    def shape(self):
+        return (sum(self.row_counts), len(self.columns))
+
+    def size_bytes(self):
+        """On-disk size of all partitions"""
+        return sum(os.path.getsize(os.path.join(self.folder, name)) for name in self.partitions)
+
+    def _record_dtypes(self, df):
+        """Widen the recorded column dtypes to cover a partition's dtypes"""
+        for column in df.columns:
+            dtype = str(df[column].dtype)
+            known = self.dtypes.get(column)
+            if known is None or known == dtype:
+                self.dtypes[column] = dtype
+            elif pd.api.types.is_numeric_dtype(df[column]) and pd.api.types.is_numeric_dtype(pd.api.types.pandas_dtype(known)):
+                self.dtypes[column] = 'float64'
+            else:
+                self.dtypes[column] = 'object'
+
+    def append_partition(self, df):
+        """Write the next partition"""
+        from pyarrow import feather
+
+        name = f"part-{len(self.partitions):05d}.feather"
+        feather.write_feather(df, os.path.join(self.folder, name), compression='uncompressed')
+        if not self.columns:
+            self.columns = [str(column) for column in df.columns]
+        self.partitions.append(name)
+        self.row_counts.append(len(df))
+        self._record_dtypes(df)
+
+    def write_partition(self, position, df):
+        """Replace a partition in place (atomically, so readers never see a partial file)"""
+        from pyarrow import feather
+
+        path = os.path.join(self.folder, self.partitions[position])
+        feather.write_feather(df, f"{path}.tmp", compression='uncompressed')
+        os.replace(f"{path}.tmp", path)
+        self.row_counts[position] = len(df)
+        self._record_dtypes(df)
+
+    def read_partition(self, position, columns=None):
+        """Memory-map one partition (or some of its columns) into a DataFrame"""
+        from pyarrow import feather
+
+        table = feather.read_table(os.path.join(self.folder, self.partitions[position]),
+                                   columns=columns, memory_map=True)
+        return table.to_pandas(split_blocks=True)
+
+    def iter_partitions(self, columns=None, reverse=False):
+        """Yield (position, DataFrame) for each partition in row order"""
+        positions = range(len(self.partitions))
+        for position in (reversed(positions) if reverse else positions):
+            yield position, self.read_partition(position, columns)
+
+    def column(self, name):
+        """Materialize a single column across all partitions"""
+        parts = [df[name] for _, df in self.iter_partitions(columns=[name])]
+        if not parts:
+            return pd.Series(dtype='float64', name=name)
+        return parts[0] if len(parts) == 1 else pd.concat(parts)
+
+    def head(self, rows=5):
+        """First rows of the dataset without converting whole partitions"""
+        from pyarrow import feather
+
+        if not self.partitions:
+            return pd.DataFrame(columns=self.columns)
+        table = feather.read_table(os.path.join(self.folder, self.partitions[0]), memory_map=True)
+        return table.slice(0, rows).to_pandas()
+
+    def to_csv(self, path):
+        """Write the dataset to a single CSV file, one partition at a time"""
+        for position, df in self.iter_partitions():
+            df.to_csv(path, index=False, mode='w' if position == 0 else 'a', header=position == 0)
+
+def build_partitioned_dataset(filepath, folder, partition_rows=None, schema=None, usecols=None, compression=None):
+    """
+    Parse a CSV file straight into on-disk partitions. Dtypes come from the
+    sniffed schema (or the first chunk, as in streaming ingest). Datetime
+    columns and their formats are chosen on the first partition, and every
+    later partition is parsed with exactly those formats, so an ambiguous
+    value like 05/03/2024 means the same day in every partition.
+    """
+    partition_rows = partition_rows or app.config['OUT_OF_CORE_PARTITION_ROWS']
+    read_options = csv_read_options(schema, usecols)
+    fixed_dtypes = (sniffed_dtypes(schema) if schema
+                    else infer_fixed_dtypes(filepath, partition_rows, read_options, compression))
+    try:
+        return _build_partitions(filepath, folder, partition_rows, fixed_dtypes, read_options, schema, compression)
+    except ValueError as e:
+        logger.warning(f"Fixed dtypes from first chunk did not hold ({e}), rebuilding partitions with per-chunk inference")
+        return _build_partitions(filepath, folder, partition_rows, None, read_options, schema, compression)
+
+def _build_partitions(filepath, folder, partition_rows, fixed_dtypes, read_options, schema, compression=None):
+    """Write CSV chunks as Feather partitions and return the PartitionedDataset"""
+    if os.path.isdir(folder):
+        shutil.rmtree(folder)
+    os.makedirs(folder)
+
+    dataset = PartitionedDataset(folder)
+    total_bytes = uncompressed_size(filepath, compression)
+    datetime_parsers = None  # column -> parser chosen on the first partition
+    sniffed_parsers = {column: {'format': fmt} for column, fmt in ((schema or {}).get('date_formats') or {}).items()}
+    rows_parsed = 0
+
+    with open_upload_stream(filepath, compression) as handle:
+        reader = pd.read_csv(handle, chunksize=partition_rows, dtype=fixed_dtypes, **read_options)
+        for chunk in reader:
+            chunk.index = pd.RangeIndex(rows_parsed, rows_parsed + len(chunk))
+            remaining = finish_sniffed_dates(chunk, schema)
+
+            # Sniffed date columns that read_csv could not parse in this chunk keep their sniffed format
+            stragglers = [column for column in (remaining or []) if column in sniffed_parsers]
+            if datetime_parsers is None:
+                datetime_parsers = {}
+                detect_datetime_columns(chunk, columns=[column for column in (chunk.columns if remaining is None else remaining)
+                                                        if column not in sniffed_parsers], parsers=datetime_parsers)
+                pending = stragglers
             else:
-                logger.info(f"❌ Could not convert '{column}' - best success rate was {best_success_rate:.2%}")
+                pending = list(datetime_parsers) + stragglers
+            for column in pending:
+                parser = datetime_parsers.get(column) or sniffed_parsers[column]
+                chunk[column] = parse_datetime_column(chunk[column], parser).dt.normalize()
+
+            dataset.append_partition(chunk)
+            rows_parsed += len(chunk)
+            del chunk
+
+            bytes_parsed = min(handle.tell(), total_bytes)
+            update_ingest_progress(rows_parsed=rows_parsed, bytes_parsed=bytes_parsed)
+            logger.info(f"Partitioned {rows_parsed:,} rows ({bytes_parsed / (1024*1024):.2f} of {total_bytes / (1024*1024):.2f} MB)")
+
+    dataset.save_manifest()
+    return dataset, {
+        'mode': 'out_of_core',
+        'partitions': len(dataset.partitions),
+        'partition_rows': partition_rows,
+        'rows_parsed': rows_parsed,
+        'bytes_parsed': total_bytes
+    }
+
+def clear_out_of_core(session):
+    """Drop a session's on-disk partitions once it holds an in-memory dataset again"""
+    if session.out_of_core is not None:
+        shutil.rmtree(session.out_of_core.folder, ignore_errors=True)
+        session.out_of_core = None
+
+def get_data_info_out_of_core(dataset):
+    """/api/info for a partitioned dataset: counts per partition, statistics one column at a time"""
+    missing_values = None
+    for _, df in dataset.iter_partitions():
+        counts = df.isnull().sum()
+        missing_values = counts if missing_values is None else missing_values + counts
+    missing_values = missing_values[missing_values > 0] if missing_values is not None else pd.Series(dtype='int64')
+    missing_values = {column: int(count) for column, count in missing_values.items()}
+
+    dtypes = {}
+    numeric_cols = []
+    datetime_cols = []
+    categorical_cols = []
+    for column in dataset.columns:
+        dtype = pd.api.types.pandas_dtype(dataset.dtypes[column])
+        if pd.api.types.is_datetime64_any_dtype(dtype):
+            dtypes[column] = 'datetime64[ns]'
+            datetime_cols.append(column)
+        elif pd.api.types.is_numeric_dtype(dtype):
+            dtypes[column] = dataset.dtypes[column]
+            numeric_cols.append(column)
+        else:
+            dtypes[column] = dataset.dtypes[column]
+            categorical_cols.append(column)
+
+    stats = {}
+    if numeric_cols:
+        stats['numeric'] = {column: dataset.column(column).describe().to_dict() for column in numeric_cols}
+
+    datetime_stats = {}
+    for col in datetime_cols:
+        try:
+            col_data = dataset.column(col).dropna()
+            if len(col_data) > 0:
+                min_date = col_data.min()
+                max_date = col_data.max()
+                datetime_stats[col] = {
+                    'min_date': min_date.strftime('%d/%m/%Y'),
+                    'max_date': max_date.strftime('%d/%m/%Y'),
+                    'date_range_days': (max_date - min_date).days,
+                    'unique_dates': int(col_data.nunique()),
+                    'null_count': int(dataset.shape[0] - len(col_data)),
+                    'sample_values': col_data.head(3).dt.strftime('%d/%m/%Y').tolist()
+                }
+        except Exception as e:
+            logger.warning(f"Error calculating datetime stats for {col}: {e}")
+            datetime_stats[col] = {'error': str(e)}
+    if datetime_stats:
+        stats['datetime'] = datetime_stats
+
+    return {
+        'shape': dataset.shape,
+        'missing_values': missing_values,
+        'data_types': dtypes,
+        'numeric_columns': numeric_cols,
+        'datetime_columns': datetime_cols,
+        'categorical_columns': categorical_cols,
+        'column_categories': {
+            'numeric': numeric_cols,
+            'datetime': datetime_cols,
+            'categorical': categorical_cols
+        },
+        'statistics': stats,
+        'out_of_core': {
+            'partitions': len(dataset.partitions),
+            'disk_size_mb': round(dataset.size_bytes() / (1024*1024), 2)
+        }
+    }
+
+def check_duplicates_out_of_core(dataset):
+    """Duplicate rows across partitions, found by comparing 64-bit row hashes"""
+    hashes = pd.concat([
+        pd.util.hash_pandas_object(df, index=False) for _, df in dataset.iter_partitions()
+    ]) if dataset.partitions else pd.Series(dtype='uint64')
+
+    total_rows = len(hashes)
+    duplicate_count = int(hashes.duplicated().sum())
+    unique_count = total_rows - duplicate_count
+
+    duplicate_examples = []
+    if duplicate_count > 0:
+        duplicate_hashes = hashes[hashes.duplicated(keep=False)]
+        for row_hash, count in duplicate_hashes.value_counts().head(5).items():
+            duplicate_examples.append({
+                'indices': duplicate_hashes.index[duplicate_hashes == row_hash].tolist(),
+                'count': int(count)
+            })
+
+    return {
+        'total_rows': int(total_rows),
+        'unique_count': int(unique_count),
+        'duplicate_count': int(duplicate_count),
+        'duplicate_percentage': float(duplicate_count / total_rows * 100) if total_rows > 0 else 0.0,
+        'duplicate_examples': duplicate_examples
+    }
+
+def impute_missing_out_of_core(dataset, rules):
+    """
+    Apply imputation rules to a partitioned dataset. Fill values are computed
+    one column at a time, then every partition is rewritten once; forward and
+    backward fills carry the last seen value across partition boundaries.
+    """
+    applied_rules = []
+    constant_fills = {}
+    forward_columns = []
+    backward_columns = []
+
+    for rule in rules:
+        column = rule.get('column')
+        method = rule.get('method')
+        custom_value = rule.get('customValue')
+
+        if column not in dataset.columns:
+            continue
+        is_numeric = pd.api.types.is_numeric_dtype(pd.api.types.pandas_dtype(dataset.dtypes[column]))
+
+        if method in ('mean', 'median') and is_numeric:
+            col_data = dataset.column(column)
+            fill_value = col_data.mean() if method == 'mean' else col_data.median()
+            constant_fills[column] = fill_value
+            applied_rules.append(f'{column}: filled with {method} ({fill_value:.2f})')
+
+        elif method == 'mode':
+            fill_value = dataset.column(column).mode()
+            if not fill_value.empty:
+                constant_fills[column] = fill_value.iloc[0]
+                applied_rules.append(f'{column}: filled with mode ({fill_value.iloc[0]})')
+
+        elif method == 'forward_fill':
+            forward_columns.append(column)
+            applied_rules.append(f'{column}: forward filled')
+
+        elif method == 'backward_fill':
+            backward_columns.append(column)
+            applied_rules.append(f'{column}: backward filled')
+
+        elif method == 'custom' and custom_value is not None:
+            try:
+                constant_fills[column] = float(custom_value) if is_numeric else str(custom_value)
+                applied_rules.append(f'{column}: filled with custom value ({constant_fills[column]})')
+            except ValueError:
+                applied_rules.append(f'{column}: error with custom value')
+
+    if constant_fills or forward_columns:
+        carry = {}
+        for position, df in dataset.iter_partitions():
+            for column, fill_value in constant_fills.items():
+                ensure_fillable(df, column, fill_value)
+                df[column] = df[column].fillna(fill_value)
+            for column in forward_columns:
+                filled = df[column].ffill()
+                if column in carry:
+                    filled = filled.fillna(carry[column])
+                last_valid = filled.last_valid_index()
+                if last_valid is not None:
+                    carry[column] = filled.loc[last_valid]
+                df[column] = filled
+            dataset.write_partition(position, df)
+
+    if backward_columns:
+        carry = {}
+        for position, df in dataset.iter_partitions(reverse=True):
+            for column in backward_columns:
+                filled = df[column].bfill()
+                if column in carry:
+                    filled = filled.fillna(carry[column])
+                first_valid = filled.first_valid_index()
+                if first_valid is not None:
+                    carry[column] = filled.loc[first_valid]
+                df[column] = filled
+            dataset.write_partition(position, df)
+
+    dataset.save_manifest()
+    return applied_rules
+
+@app.before_request
+def reject_unsupported_out_of_core():
+    """Endpoints without a partition-wise implementation refuse out-of-core datasets"""
+    if request.method == 'OPTIONS' or not request.path.startswith('/api/'):
+        return None
+    if request.endpoint in OUT_OF_CORE_ENDPOINTS:
+        return None
+    if get_session().out_of_core is not None:
+        return jsonify({
+            'error': f'{request.path} is not available for datasets processed out of core',
+            'supported_endpoints': sorted(OUT_OF_CORE_ROUTES)
+        }), 400
+    return None
+
+# Read endpoints whose responses depend only on the dataset (and the request's own parameters)
+VERSIONED_ENDPOINTS = {
+    'preview_data', 'test_preview', 'get_all_data', 'get_data_info', 'debug_columns', 'test_datetime',
+    'get_correlation', 'test_correlation', 'final_preview', 'generate_report'
+}
+
+def data_etag(session):
+    """ETag for the session's current data version (provisional frames get their own)"""
+    marker = 'p' if session.provisional is not None else 'v'
+    return f'{session.version_token}-{marker}{session.version}'
+
+@app.before_request
+def answer_unchanged_data():
+    """Conditional GETs on versioned endpoints get a 304 while the data version is unchanged"""
+    if request.method != 'GET' or request.endpoint not in VERSIONED_ENDPOINTS:
+        return None
+    # Taken before the handler runs, so a concurrent mutation can only make the tag stale, never wrong
+    g.data_etag = data_etag(get_session())
+    if request.if_none_match.contains(g.data_etag):
+        response = Response(status=304)
+        response.set_etag(g.data_etag)
+        response.headers['Cache-Control'] = 'no-cache'
+        return response
+    return None
+
+@app.after_request
+def tag_data_version(response):
+    """Label successful versioned reads with the data version they were built from"""
+    if 'data_etag' in g and response.status_code == 200:
+        response.set_etag(g.data_etag)
+        # Browsers keep the response but revalidate it on every poll; the tag is per session
+        response.headers['Cache-Control'] = 'no-cache'
+        response.vary.add('X-Session-Id')
+        response.vary.add('Accept')  # JSON, NDJSON and Arrow bodies share the tag
+    return response
+
+@app.route('/api/result-cache', methods=['GET'])
+def get_result_cache_stats():
+    """Size and hit/miss counters of the shared analysis result cache"""
+    return jsonify(result_cache.stats()), 200
+
+@app.route('/api/snapshots', methods=['GET'])
+def get_snapshots():
+    """List the session's snapshots available for restore"""
+    return jsonify({'snapshots': list_snapshots(get_session().snapshot_folder)}), 200
+
+@app.route('/api/restore-snapshot', methods=['POST'])
+def restore_snapshot_endpoint():
+    """Reload a snapshot (optionally only some columns) as the current dataset"""
+    session = get_session()
+    try:
+        data = request.json or {}
+        name = data.get('name') or CURRENT_SNAPSHOT
+        columns = data.get('columns')
+
+        meta = restore_snapshot(name, columns=columns)
+
+        return jsonify({
+            'message': f"Snapshot '{name}' restored",
+            'filename': session.filename,
+            'shape': list(session.data.shape),
+            'columns': session.data.columns.tolist(),
+            'operations_count': len(session.operations),
+            'saved_at': meta.get('saved_at')
+        }), 200
+
+    except FileNotFoundError as e:
+        return jsonify({'error': str(e)}), 404
+    except Exception as e:
+        logger.error(f"❌ Error restoring snapshot: {str(e)}")
+        return jsonify({'error': f'Error restoring snapshot: {str(e)}'}), 400
+
+@app.route('/api/upload-progress', methods=['GET'])
+def get_upload_progress():
+    """Report rows and bytes parsed so far for the current upload"""
+    session = get_session()
+    return jsonify(session.ingest_progress), 200
+
+def publish_provisional_frame(session, filepath, file_ext, schema=None, usecols=None, sheets=None,
+                              compression=None):
+    """
+    Parse only the first PROVISIONAL_ROWS rows of an upload, type them like
+    the full load would and publish them for /api/preview while the complete
+    parse carries on. Failures here never affect the real load.
+    """
+    nrows = app.config['PROVISIONAL_ROWS']
+    start_time = time.time()
+    try:
+        if file_ext == 'csv':
+            read_options = csv_read_options(schema, usecols)
+            with open_upload_stream(filepath, compression) as handle:
+                head = pd.read_csv(handle, nrows=nrows, dtype=sniffed_dtypes(schema) if schema else None,
+                                   **read_options)
+        else:
+            head, _ = read_excel_file(filepath, file_ext, sheets=sheets, usecols=usecols, nrows=nrows)
+        detect_datetime_columns(head, columns=finish_sniffed_dates(head, schema))
+    except Exception as e:
+        logger.warning(f"Could not build a provisional frame ({e}), preview waits for the full parse")
+        return
+
+    total_rows = None
+    if schema and schema['sniffed_rows'] > 0 and len(head) >= nrows:
+        # Extrapolate from the sniffed sample's bytes per row
+        total_rows = int(uncompressed_size(filepath, compression) * schema['sniffed_rows'] / schema['sniffed_bytes'])
+    session.provisional = head
+    session.provisional_total_rows = total_rows or len(head)
+    update_ingest_progress(provisional_rows=len(head))
+    logger.info(f"✅ Published provisional frame: {len(head)} rows in {time.time() - start_time:.2f}s")
+
+def clear_provisional_frame(session):
+    """Stop serving an upload's provisional rows (the full frame landed or the upload failed)"""
+    session.provisional = None
+    session.provisional_total_rows = None
+
+def load_saved_upload_out_of_core(filepath, filename, file_ext, file_size, content_hash, usecols=None,
+                                  compression=None):
+    """Partition a large CSV upload to disk and make it the session's out-of-core dataset"""
+    session = get_session()
+    saved_size = uncompressed_size(filepath, compression)
+
+    update_ingest_progress(status='parsing', filename=filename, rows_parsed=0,
+                           bytes_parsed=0, total_bytes=saved_size)
+
+    # Build next to the live partitions so the previous dataset survives a failed parse
+    folder = os.path.join(session.snapshot_folder, OUT_OF_CORE_FOLDER)
+    staging_folder = f"{folder}.staging"
+    schema = sniff_csv_schema(filepath, compression=compression) if app.config['SCHEMA_SNIFFING'] else None
+    dataset, ingest_stats = build_partitioned_dataset(filepath, staging_folder, schema=schema, usecols=usecols,
+                                                      compression=compression)
+    ingest_stats['compression'] = compression
+    ingest_stats['cache_hit'] = False
+    ingest_stats['schema'] = summarize_schema(schema)
+    logger.info(f"✅ Partitioned {ingest_stats['rows_parsed']:,} rows into {ingest_stats['partitions']} partitions")
+
+    update_ingest_progress(status='finalizing')
+    clear_out_of_core(session)
+    if os.path.isdir(folder):
+        shutil.rmtree(folder)
+    os.replace(staging_folder, folder)
+    dataset.folder = folder
+
+    session.data = None
+    session.out_of_core = dataset
+    session.filename = filename
+
+    invalidate_preview_cache()
+
+    track_operation(
+        'data_upload',
+        f'Dataset uploaded: {filename}',
+        {
+            'original_shape': dataset.shape,
+            'columns': dataset.columns,
+            'file_size_mb': round(file_size / (1024*1024), 2),
+            'file_type': file_ext,
+            'content_hash': content_hash,
+            'out_of_core': True
+        }
+    )
+
+    logger.info(f"✅ DATA LOADED OUT OF CORE: {dataset.shape}, {dataset.size_bytes() / (1024*1024):.2f} MB on disk")
+    update_ingest_progress(status='completed')
+
+    return {
+        'message': 'File uploaded successfully',
+        'filename': filename,
+        'shape': list(dataset.shape),
+        'columns': dataset.columns,
+        'ingest': ingest_stats,
+        'memory_report': None,
+        'content_hash': content_hash
+    }
+
+def summarize_schema(schema):
+    """Compact description of a sniffed schema for the upload response"""
+    if schema is None:
+        return None
+    return {
+        'encoding': schema['encoding'],
+        'delimiter': schema['delimiter'],
+        'header': schema['header'],
+        'sniffed_bytes': schema['sniffed_bytes'],
+        'dtypes': {str(column): dtype for column, dtype in schema['dtypes'].items()},
+        'date_formats': {str(column): fmt for column, fmt in schema['date_formats'].items()}
+    }
+
+def load_saved_upload(filepath, filename, file_ext, file_size, content_hash,
+                      streaming_requested=False, compact_requested=True, out_of_core_requested=False,
+                      usecols=None, engine=None, sheets=None, compression=None, progressive_requested=True):
+    """
+    Parse (or reuse from the parsed cache) a saved upload and make it the
+    current dataset. Shared by synchronous uploads and background upload
+    jobs; returns the upload response payload.
+    """
+    session = get_session()
+
+    # Thresholds apply to the CSV size, not the compressed upload
+    saved_size = uncompressed_size(filepath, compression)
+
+    # CSVs too large to hold in memory are kept on disk and processed partition by partition
+    out_of_core_threshold = app.config['OUT_OF_CORE_THRESHOLD_MB'] * 1024 * 1024
+    if file_ext == 'csv' and (out_of_core_requested or saved_size >= out_of_core_threshold):
+        return load_saved_upload_out_of_core(filepath, filename, file_ext, file_size, content_hash, usecols=usecols,
+                                             compression=compression)
+
+    compact = app.config['COMPACT_DTYPES'] and compact_requested
+    cache_key = parsed_cache_key(content_hash, file_ext, compact, usecols, sheets)
+    cached = lookup_parsed_cache(cache_key)
+
+    if cached is not None:
+        # Identical content was parsed before - skip parsing and type detection entirely
+        data, cache_meta = cached
+        ingest_stats = dict(cache_meta.get('ingest') or {})
+        ingest_stats['cache_hit'] = True
+        memory_report = cache_meta.get('memory_report')
+        logger.info(f"✅ Reused parsed frame for identical upload ({content_hash[:12]})")
+    else:
+        # Large CSVs (or an explicit request) are parsed in chunks to bound memory
+        streaming = streaming_requested or saved_size >= app.config['STREAMING_THRESHOLD_MB'] * 1024 * 1024
+
+        # Sniff dialect and column types from the head of the file to drive a typed parse
+        schema = None
+        if file_ext == 'csv' and app.config['SCHEMA_SNIFFING']:
+            update_ingest_progress(status='sniffing', filename=filename, total_bytes=saved_size)
+            schema = sniff_csv_schema(filepath, categorize=compact, compression=compression)
+
+        # Large uploads get their first rows previewable right away
+        if (progressive_requested and app.config['PROGRESSIVE_LOAD']
+                and saved_size >= app.config['PROGRESSIVE_MIN_MB'] * 1024 * 1024):
+            update_ingest_progress(status='provisional')
+            publish_provisional_frame(session, filepath, file_ext, schema=schema, usecols=usecols,
+                                      sheets=sheets, compression=compression)
+
+        update_ingest_progress(status='parsing', filename=filename, rows_parsed=0,
+                               bytes_parsed=0, total_bytes=saved_size)
+        data, ingest_stats = read_uploaded_file(filepath, file_ext, streaming=streaming,
+                                                schema=schema, usecols=usecols, engine=engine, sheets=sheets,
+                                                compression=compression)
+        ingest_stats['cache_hit'] = False
+        ingest_stats['compression'] = compression
+        ingest_stats['schema'] = summarize_schema(schema)
+        logger.info(f"✅ Parsed {ingest_stats['rows_parsed']:,} rows in {ingest_stats['mode']} mode")
+
+        # Apply datetime detection (only to columns the sniffer could not settle)
+        logger.info("Starting datetime detection...")
+        update_ingest_progress(status='type_detection')
+        datetime_columns = detect_datetime_columns(data, columns=finish_sniffed_dates(data, schema))
+        if datetime_columns:
+            logger.info(f"✅ Detected and converted {len(datetime_columns)} datetime columns: {datetime_columns}")
+        else:
+            logger.info("No datetime columns detected")
+
+        # Shrink dtypes once so every later endpoint scans less memory
+        memory_report = None
+        if compact:
+            logger.info("Compacting column dtypes...")
+            update_ingest_progress(status='compacting')
+            memory_report = compact_dtypes(data)
+
+    update_ingest_progress(status='finalizing')
+    clear_out_of_core(session)
+    session.data = data
+    session.filename = filename
     
-    if converted_columns:
-        logger.info(f"🎉 Successfully converted {len(converted_columns)} columns to datetime: {converted_columns}")
+    # Invalidate preview cache since new data is loaded
+    invalidate_preview_cache()
+    clear_provisional_frame(session)
+    
+    # Track the initial data upload operation (a cache hit links its snapshot instead of rewriting it)
+    snapshot_saved = track_operation(
+        'data_upload',
+        f'Dataset uploaded: {filename}',
+        {
+            'original_shape': session.data.shape,
+            'columns': session.data.columns.tolist(),
+            'file_size_mb': round(file_size / (1024*1024), 2),
+            'file_type': file_ext,
+            'content_hash': content_hash
+        },
+        snapshot=cached is None
+    )
+
+    if cached is None:
+        # Keep the parsed frame under its content hash so identical re-uploads skip parsing.
+        # Only link when this upload's snapshot was written; otherwise current.feather is an older dataset.
+        if app.config['PARSED_CACHE_ENABLED'] and snapshot_saved:
+            link_snapshot(CURRENT_SNAPSHOT, cache_key, {
+                'kind': 'parsed',
+                'shape': list(data.shape),
+                'columns': [str(col) for col in data.columns],
+                'ingest': ingest_stats,
+                'memory_report': memory_report
+            }, source_folder=session.snapshot_folder)
+            evict_parsed_cache()
     else:
-        logger.info("ℹ️ No datetime columns detected or converted")
+        snapshot_saved = link_snapshot(cache_key, CURRENT_SNAPSHOT, {
+            'filename': filename,
+            'operations': session.operations
+        }, target_folder=session.snapshot_folder)
+        session.dirty = not snapshot_saved
+
+    # Keep the parsed, type-detected frame so this file can be re-opened without re-parsing
+    if snapshot_saved:
+        link_snapshot(CURRENT_SNAPSHOT, filename, {'kind': 'parsed'},
+                      source_folder=session.snapshot_folder, target_folder=session.snapshot_folder)
     
-    return converted_columns
+    logger.info(f"✅ DATA LOADED SUCCESSFULLY:")
+    logger.info(f"   - Dataset shape: {session.data.shape}")
+    logger.info(f"   - Columns: {list(session.data.columns)}")
+    logger.info(f"   - Memory usage: {session.data.memory_usage(deep=True).sum() / (1024*1024):.2f} MB")
+    logger.info("=== UPLOAD PROCESS COMPLETED SUCCESSFULLY ===")
+
+    update_ingest_progress(status='completed')
+
+    return {
+        'message': 'File uploaded successfully',
+        'filename': filename,
+        'shape': list(session.data.shape),
+        'columns': session.data.columns.tolist(),
+        'ingest': ingest_stats,
+        'memory_report': memory_report,
+        'content_hash': content_hash
+    }
+
+def create_upload_job(filename, session_id):
+    """Register a new upload job and return its id"""
+    job_id = uuid.uuid4().hex
+    with upload_jobs_lock:
+        upload_jobs[job_id] = {
+            'job_id': job_id,
+            'session_id': session_id,
+            'filename': filename,
+            'status': 'running',
+            'phase': 'saving',
+            'rows_parsed': 0,
+            'bytes_parsed': 0,
+            'total_bytes': 0,
+            'shape': None,
+            'error': None,
+            'result': None,
+            'created_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+            'finished_at': None
+        }
+
+        # Forget the oldest finished jobs beyond the history limit
+        finished = [jid for jid, job in upload_jobs.items() if job['status'] in ('completed', 'failed')]
+        for jid in finished[:max(0, len(finished) - app.config['UPLOAD_JOB_HISTORY'])]:
+            del upload_jobs[jid]
+    return job_id
+
+def update_upload_job(job_id, **fields):
+    """Update fields of an upload job record"""
+    with upload_jobs_lock:
+        if job_id in upload_jobs:
+            upload_jobs[job_id].update(fields)
+
+def get_upload_job_executor():
+    """Return the thread pool that runs background upload jobs"""
+    global upload_job_executor
+
+    with upload_jobs_lock:
+        if upload_job_executor is None:
+            upload_job_executor = ThreadPoolExecutor(max_workers=app.config['UPLOAD_JOB_WORKERS'],
+                                                     thread_name_prefix='upload-job')
+        return upload_job_executor
+
+def run_upload_job(job_id, session_id, **upload_args):
+    """Worker body for a background upload: parse, detect types and publish the dataset"""
+    session = session_store.get(session_id, acquire=True)
+    upload_job_context.job_id = job_id
+    upload_job_context.session = session
+    try:
+        payload = load_saved_upload(**upload_args)
+        update_upload_job(job_id, status='completed', phase='completed', shape=payload['shape'],
+                          result=payload, finished_at=datetime.now().strftime('%Y-%m-%d %H:%M:%S'))
+    except Exception as e:
+        update_ingest_progress(status='failed')
+        clear_provisional_frame(session)
+        logger.error(f"❌ ERROR DURING BACKGROUND FILE PROCESSING: {str(e)}")
+        update_upload_job(job_id, status='failed', error=f'Error reading file: {str(e)}',
+                          finished_at=datetime.now().strftime('%Y-%m-%d %H:%M:%S'))
+    finally:
+        discard_file(upload_args['filepath'])
+        upload_job_context.job_id = None
+        upload_job_context.session = None
+        session_store.release(session)
+
+def parse_name_list(value):
+    """Column or sheet names from a form field, given as a JSON list or comma-separated names"""
+    if not value:
+        return None
+    try:
+        columns = json.loads(value)
+    except ValueError:
+        columns = value.split(',')
+    if isinstance(columns, str):
+        columns = [columns]
+    columns = [str(column).strip() for column in columns if str(column).strip()]
+    return columns or None
+
+def upload_args_from_form(form, filepath, filename, file_size, content_hash):
+    """load_saved_upload arguments for a saved file and the parse options sent with it"""
+    file_ext, compression = split_upload_extension(filename)
+    logger.info(f"Reading file with extension: {file_ext}" + (f" ({compression} compressed)" if compression else ""))
+    return {
+        'filepath': filepath,
+        'filename': filename,
+        'file_ext': file_ext,
+        'compression': compression,
+        'file_size': file_size,
+        'content_hash': content_hash,
+        'streaming_requested': form.get('streaming', '').lower() == 'true',
+        'compact_requested': form.get('compact', '').lower() != 'false',
+        'out_of_core_requested': form.get('out_of_core', '').lower() == 'true',
+        'progressive_requested': form.get('progressive', '').lower() != 'false',
+        'usecols': parse_name_list(form.get('columns')),
+        'engine': form.get('engine') or None,
+        'sheets': parse_name_list(form.get('sheets'))
+    }
+
+def session_upload_path(session, filename, upload_id=None):
+    """
+    Where an upload is saved while it is parsed: under the session's folder
+    and prefixed with the upload (or job) id, so concurrent uploads of the
+    same filename never overwrite a file another parse is still reading
+    """
+    os.makedirs(session.upload_folder, exist_ok=True)
+    return os.path.join(session.upload_folder, f"{upload_id or uuid.uuid4().hex}-{filename}")
+
+def session_cleaned_folder(session):
+    """Directory for a session's saved and downloaded cleaned files"""
+    folder = os.path.join(session.upload_folder, 'cleaned')
+    os.makedirs(folder, exist_ok=True)
+    return folder
+
+def discard_file(filepath):
+    """Remove a working file (a parsed upload, a sent download) if it is still there"""
+    try:
+        if os.path.exists(filepath):
+            os.remove(filepath)
+    except OSError as e:
+        logger.warning(f"Could not remove {filepath}: {str(e)}")
+
+def dispatch_upload(upload_args, job_id=None):
+    """Parse a saved upload now, or queue it as a background job when job_id is given"""
+    if job_id:
+        update_upload_job(job_id, phase='queued', total_bytes=os.path.getsize(upload_args['filepath']))
+        get_upload_job_executor().submit(run_upload_job, job_id, get_session().session_id, **upload_args)
+        logger.info(f"📨 Upload job {job_id} queued for {upload_args['filename']}")
+        return jsonify({
+            'message': 'File received, processing in background',
+            'job_id': job_id,
+            'filename': upload_args['filename'],
+            'status_url': f'/api/upload-jobs/{job_id}'
+        }), 202
+
+    # A synchronous client is blocked on this request and never sees a provisional preview
+    upload_args['progressive_requested'] = False
+    try:
+        return jsonify(load_saved_upload(**upload_args)), 200
+    finally:
+        discard_file(upload_args['filepath'])
 
 @app.route('/api/upload', methods=['POST'])
 def upload_file():
-    global current_data, current_filename
-    
     logger.info("=== FILE UPLOAD REQUEST RECEIVED ===")
     logger.info(f"Request method: {request.method}")
     logger.info(f"Request content type: {request.content_type}")
@@ -395,20 +2816,25 @@ def upload_file():
     
     if file and allowed_file(file.filename):
         filename = secure_filename(file.filename)
-        filepath = os.path.join(app.config['UPLOAD_FOLDER'], filename)
+
+        # In async mode parsing happens in a worker and the client polls /api/upload-jobs/<job_id>
+        async_requested = request.form.get('async', '').lower() == 'true'
+        job_id = create_upload_job(filename, get_session().session_id) if async_requested else None
+
+        # Each upload gets its own file so sessions (and jobs) sharing a filename never collide
+        filepath = session_upload_path(get_session(), filename, job_id)
         
         logger.info(f"Secure filename: {filename}")
         logger.info(f"Upload path: {filepath}")
         
         try:
-            # Ensure upload directory exists
-            os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
-            logger.info(f"Upload directory ensured: {app.config['UPLOAD_FOLDER']}")
             
-            # Save the file
+            # Save the file, fingerprinting the content on the way to disk
             logger.info("Starting file save...")
-            file.save(filepath)
-            logger.info(f"✅ FILE SAVED SUCCESSFULLY: {filepath}")
+            update_ingest_progress(status='saving', filename=filename, rows_parsed=0,
+                                   bytes_parsed=0, total_bytes=file_size)
+            content_hash = save_upload_with_hash(file, filepath)
+            logger.info(f"✅ FILE SAVED SUCCESSFULLY: {filepath} (sha256 {content_hash[:12]})")
             
             # Verify file was saved
             if os.path.exists(filepath):
@@ -416,58 +2842,20 @@ def upload_file():
                 logger.info(f"✅ File verified on disk. Size: {saved_size} bytes")
             else:
                 logger.error(f"❌ File not found after save: {filepath}")
+                if job_id:
+                    update_upload_job(job_id, status='failed', error='File save verification failed')
                 return jsonify({'error': 'File save verification failed'}), 500
             
             # Read the file based on extension
-            file_ext = filename.rsplit('.', 1)[1].lower()
-            logger.info(f"Reading file with extension: {file_ext}")
-            
-            if file_ext == 'csv':
-                logger.info("Reading as CSV file...")
-                current_data = pd.read_csv(filepath)
-            elif file_ext in ['xlsx', 'xls']:
-                logger.info("Reading as Excel file...")
-                current_data = pd.read_excel(filepath)
-            
-            # Apply datetime detection
-            logger.info("Starting datetime detection...")
-            datetime_columns = detect_datetime_columns(current_data)
-            if datetime_columns:
-                logger.info(f"✅ Detected and converted {len(datetime_columns)} datetime columns: {datetime_columns}")
-            else:
-                logger.info("No datetime columns detected")
-            
-            current_filename = filename
-            
-            # Invalidate preview cache since new data is loaded
-            invalidate_preview_cache()
-            
-            # Track the initial data upload operation
-            track_operation(
-                'data_upload',
-                f'Dataset uploaded: {filename}',
-                {
-                    'original_shape': current_data.shape,
-                    'columns': current_data.columns.tolist(),
-                    'file_size_mb': round(file_size / (1024*1024), 2),
-                    'file_type': file_ext
-                }
-            )
-            
-            logger.info(f"✅ DATA LOADED SUCCESSFULLY:")
-            logger.info(f"   - Dataset shape: {current_data.shape}")
-            logger.info(f"   - Columns: {list(current_data.columns)}")
-            logger.info(f"   - Memory usage: {current_data.memory_usage(deep=True).sum() / (1024*1024):.2f} MB")
-            logger.info("=== UPLOAD PROCESS COMPLETED SUCCESSFULLY ===")
-            
-            return jsonify({
-                'message': 'File uploaded successfully',
-                'filename': filename,
-                'shape': current_data.shape,
-                'columns': current_data.columns.tolist()
-            }), 200
-            
+            upload_args = upload_args_from_form(request.form, filepath, filename, file_size, content_hash)
+            return dispatch_upload(upload_args, job_id)
+
         except Exception as e:
+            update_ingest_progress(status='failed')
+            clear_provisional_frame(get_session())
+            discard_file(filepath)
+            if job_id:
+                update_upload_job(job_id, status='failed', error=f'Error reading file: {str(e)}')
             logger.error(f"❌ ERROR DURING FILE PROCESSING: {str(e)}")
             logger.error(f"Error type: {type(e).__name__}")
             return jsonify({'error': f'Error reading file: {str(e)}'}), 400
@@ -477,122 +2865,415 @@ def upload_file():
         logger.error(f"Allowed extensions: {ALLOWED_EXTENSIONS}")
         return jsonify({'error': 'Invalid file type'}), 400
 
+@app.route('/api/excel-sheets', methods=['POST'])
+def get_excel_sheets():
+    """List the sheets of an Excel file so the client can choose which to upload"""
+    if 'file' not in request.files or request.files['file'].filename == '':
+        return jsonify({'error': 'No file part'}), 400
+
+    file = request.files['file']
+    filename = secure_filename(file.filename)
+    file_ext = filename.rsplit('.', 1)[-1].lower() if '.' in filename else ''
+    if file_ext not in ('xlsx', 'xls'):
+        return jsonify({'error': 'Sheets can only be listed for .xlsx and .xls files'}), 400
+
+    try:
+        # Only the workbook index is read, so listing from a temporary copy is cheap
+        with tempfile.NamedTemporaryFile(suffix=f'.{file_ext}') as handle:
+            file.save(handle)
+            handle.flush()
+            sheets = list_excel_sheets(handle.name, file_ext)
+        return jsonify({'filename': filename, 'sheets': sheets})
+    except Exception as e:
+        return jsonify({'error': f'Error listing sheets: {str(e)}'}), 400
+
+@app.route('/api/upload-jobs/<job_id>', methods=['GET'])
+def get_upload_job(job_id):
+    """Report the phase, parse progress and outcome of a background upload"""
+    with upload_jobs_lock:
+        job = dict(upload_jobs[job_id]) if job_id in upload_jobs else None
+
+    if job is None or job['session_id'] != get_session().session_id:
+        return jsonify({'error': f'Upload job {job_id} not found'}), 404
+
+    job['progress'] = 100.0 if job['status'] == 'completed' else (
+        round(job['bytes_parsed'] / job['total_bytes'] * 100, 1) if job['total_bytes'] else 0.0
+    )
+    return jsonify(job), 200
+
+chunked_uploads_lock = threading.Lock()
+chunked_upload_digests = {}  # upload_id -> running sha256 over the leading run of received chunks
+
+def chunked_upload_paths(upload_id):
+    """Return the (partial data, state) file paths of a resumable upload"""
+    base = os.path.join(app.config['CHUNKED_UPLOAD_FOLDER'], upload_id)
+    return f"{base}.part", f"{base}.json"
+
+def load_chunked_upload(upload_id):
+    """State of a resumable upload, or None when there is no such upload"""
+    if not re.fullmatch(r'[0-9a-f]{32}', upload_id):
+        return None
+    try:
+        with open(chunked_upload_paths(upload_id)[1]) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def chunked_upload_error(state, upload_id):
+    """Error response for a missing upload or one started by another session, else None"""
+    if state is None:
+        return jsonify({'error': f'Upload {upload_id} not found'}), 404
+    if state['session_id'] != get_session().session_id:
+        logger.warning(f"⚠️ Session {get_session().session_id} refused access to upload {upload_id}")
+        return jsonify({'error': f'Upload {upload_id} belongs to another session'}), 403
+    return None
+
+def save_chunked_upload(state):
+    """Persist a resumable upload's state so it survives dropped connections and restarts"""
+    state_path = chunked_upload_paths(state['upload_id'])[1]
+    with open(f"{state_path}.tmp", 'w') as f:
+        json.dump(state, f)
+    os.replace(f"{state_path}.tmp", state_path)
+
+def advance_upload_digest(state):
+    """
+    Extend an upload's running sha256 over the chunks that now continue its
+    hashed prefix, so finalize only hashes whatever arrived out of order.
+    Returns the digest entry ({'lock', 'sha256', 'next_chunk'}).
+    """
+    upload_id = state['upload_id']
+    with chunked_uploads_lock:
+        entry = chunked_upload_digests.setdefault(
+            upload_id, {'lock': threading.Lock(), 'sha256': hashlib.sha256(), 'next_chunk': 0})
+    received = set(state['received_chunks'])
+    with entry['lock']:
+        if entry['next_chunk'] not in received:
+            return entry
+        with open(chunked_upload_paths(upload_id)[0], 'rb') as f:
+            f.seek(entry['next_chunk'] * state['chunk_size'])
+            while entry['next_chunk'] in received:
+                remaining = min(state['chunk_size'], state['size'] - entry['next_chunk'] * state['chunk_size'])
+                while remaining > 0:
+                    block = f.read(min(remaining, 1024 * 1024))
+                    if not block:
+                        raise ValueError(f"Upload {upload_id} is shorter than its declared size")
+                    entry['sha256'].update(block)
+                    remaining -= len(block)
+                entry['next_chunk'] += 1
+    return entry
+
+def expire_chunked_uploads():
+    """Delete resumable uploads that have not been touched within the expiry window"""
+    folder = app.config['CHUNKED_UPLOAD_FOLDER']
+    cutoff = time.time() - app.config['CHUNKED_UPLOAD_EXPIRY_HOURS'] * 3600
+    for name in os.listdir(folder):
+        path = os.path.join(folder, name)
+        try:
+            if os.path.getmtime(path) < cutoff:
+                os.remove(path)
+                chunked_upload_digests.pop(name.split('.', 1)[0], None)
+                logger.info(f"🗑️ Removed expired partial upload {name}")
+        except OSError:
+            continue
+
+def chunked_upload_status(state):
+    """Client-facing view of a resumable upload: which chunks are in and which are still missing"""
+    received = set(state['received_chunks'])
+    missing = [index for index in range(state['total_chunks']) if index not in received]
+    bytes_received = sum(min(state['chunk_size'], state['size'] - index * state['chunk_size']) for index in received)
+    return {
+        'upload_id': state['upload_id'],
+        'filename': state['filename'],
+        'size': state['size'],
+        'chunk_size': state['chunk_size'],
+        'total_chunks': state['total_chunks'],
+        'received_chunks': sorted(received),
+        'missing_chunks': missing,
+        'bytes_received': bytes_received,
+        'complete': not missing
+    }
+
+@app.route('/api/uploads', methods=['POST'])
+def init_chunked_upload():
+    """Start a resumable upload: the file is then sent as numbered chunks and finalized"""
+    try:
+        params = request.get_json(silent=True) or request.form
+        filename = secure_filename(str(params.get('filename') or ''))
+        size = int(params.get('size') or 0)
+        chunk_size = int(params.get('chunk_size') or app.config['UPLOAD_CHUNK_MB'] * 1024 * 1024)
+
+        if not filename or not allowed_file(filename):
+            return jsonify({'error': 'Invalid file type'}), 400
+        if size <= 0 or size > app.config['CHUNKED_UPLOAD_MAX_GB'] * 1024 ** 3:
+            return jsonify({'error': f"File size must be between 1 byte and {app.config['CHUNKED_UPLOAD_MAX_GB']} GB"}), 400
+        if chunk_size <= 0 or chunk_size > app.config['UPLOAD_CHUNK_MAX_MB'] * 1024 * 1024:
+            return jsonify({'error': f"Chunk size must be between 1 byte and {app.config['UPLOAD_CHUNK_MAX_MB']} MB"}), 400
+
+        os.makedirs(app.config['CHUNKED_UPLOAD_FOLDER'], exist_ok=True)
+        expire_chunked_uploads()
+
+        state = {
+            'upload_id': uuid.uuid4().hex,
+            'session_id': get_session().session_id,
+            'filename': filename,
+            'size': size,
+            'chunk_size': chunk_size,
+            'total_chunks': -(-size // chunk_size),
+            'received_chunks': [],
+            'created_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        }
+        # Chunks are written in place at their offsets, so the file starts at its final (sparse) size
+        with open(chunked_upload_paths(state['upload_id'])[0], 'wb') as f:
+            f.truncate(size)
+        save_chunked_upload(state)
+
+        logger.info(f"📨 Resumable upload {state['upload_id']} started for {filename} "
+                    f"({size / (1024*1024):.2f} MB in {state['total_chunks']} chunks)")
+        return jsonify(chunked_upload_status(state)), 201
+    except Exception as e:
+        return jsonify({'error': f'Error starting upload: {str(e)}'}), 400
+
+@app.route('/api/uploads/<upload_id>', methods=['GET'])
+def get_chunked_upload(upload_id):
+    """Report which chunks of a resumable upload have arrived, so a client can resume"""
+    with chunked_uploads_lock:
+        state = load_chunked_upload(upload_id)
+    error = chunked_upload_error(state, upload_id)
+    if error:
+        return error
+    return jsonify(chunked_upload_status(state)), 200
+
+@app.route('/api/uploads/<upload_id>/chunks/<int:index>', methods=['PUT'])
+def upload_chunk(upload_id, index):
+    """Write one chunk (the raw request body) straight into the partial upload file"""
+    with chunked_uploads_lock:
+        state = load_chunked_upload(upload_id)
+    error = chunked_upload_error(state, upload_id)
+    if error:
+        return error
+    if index >= state['total_chunks']:
+        return jsonify({'error': f"Chunk {index} is out of range (0-{state['total_chunks'] - 1})"}), 400
+
+    offset = index * state['chunk_size']
+    expected = min(state['chunk_size'], state['size'] - offset)
+    expected_digest = request.headers.get('X-Chunk-Sha256')
+
+    if request.content_length is not None and request.content_length != expected:
+        return jsonify({'error': f'Chunk {index} should be {expected} bytes, received {request.content_length}'}), 400
+
+    try:
+        digest = hashlib.sha256()
+        written = 0
+        with open(chunked_upload_paths(upload_id)[0], 'r+b') as f:
+            f.seek(offset)
+            while True:
+                block = request.stream.read(1024 * 1024)
+                if not block:
+                    break
+                if written + len(block) > expected:
+                    # Never spill into the next chunk's bytes
+                    written += len(block)
+                    break
+                digest.update(block)
+                f.write(block)
+                written += len(block)
+
+        if written != expected:
+            return jsonify({'error': f'Chunk {index} should be {expected} bytes, received {written}'}), 400
+        if expected_digest and expected_digest.lower() != digest.hexdigest():
+            return jsonify({'error': f'Chunk {index} failed its checksum, please resend it'}), 400
+
+        with chunked_uploads_lock:
+            state = load_chunked_upload(upload_id)
+            if state is None:
+                return jsonify({'error': f'Upload {upload_id} not found'}), 404
+            if index not in state['received_chunks']:
+                state['received_chunks'].append(index)
+                save_chunked_upload(state)
+            else:
+                # A resent chunk may have rewritten bytes already hashed, so the digest starts over
+                chunked_upload_digests.pop(upload_id, None)
+
+        advance_upload_digest(state)
+        status = chunked_upload_status(state)
+        return jsonify({
+            'index': index,
+            'bytes_received': status['bytes_received'],
+            'chunks_remaining': len(status['missing_chunks'])
+        }), 200
+    except Exception as e:
+        return jsonify({'error': f'Error writing chunk: {str(e)}'}), 400
+
+@app.route('/api/uploads/<upload_id>/finalize', methods=['POST'])
+def finalize_chunked_upload(upload_id):
+    """Move a completed resumable upload into place and parse it (in the background with async=true)"""
+    with chunked_uploads_lock:
+        state = load_chunked_upload(upload_id)
+    error = chunked_upload_error(state, upload_id)
+    if error:
+        return error
+    status = chunked_upload_status(state)
+    if not status['complete']:
+        return jsonify({'error': f"{len(status['missing_chunks'])} chunks are still missing",
+                        'missing_chunks': status['missing_chunks']}), 409
+
+    # The digest was kept up to date as chunks arrived; only chunks that came out of order are read here
+    try:
+        digest = advance_upload_digest(state)['sha256'].hexdigest()
+    except (OSError, ValueError) as e:
+        return jsonify({'error': f'Error reading upload: {str(e)}'}), 400
+
+    with chunked_uploads_lock:
+        if load_chunked_upload(upload_id) is None:
+            return jsonify({'error': f'Upload {upload_id} not found'}), 404
+        part_path, state_path = chunked_upload_paths(upload_id)
+        filename = state['filename']
+        filepath = session_upload_path(get_session(), filename, upload_id)
+        os.replace(part_path, filepath)
+        os.remove(state_path)
+        chunked_upload_digests.pop(upload_id, None)
+
+    async_requested = request.values.get('async', '').lower() == 'true'
+    job_id = create_upload_job(filename, get_session().session_id) if async_requested else None
+
+    try:
+        logger.info(f"✅ Resumable upload {upload_id} assembled: {filepath} (sha256 {digest[:12]})")
+
+        upload_args = upload_args_from_form(request.values, filepath, filename, state['size'], digest)
+        return dispatch_upload(upload_args, job_id)
+    except Exception as e:
+        update_ingest_progress(status='failed')
+        clear_provisional_frame(get_session())
+        discard_file(filepath)
+        if job_id:
+            update_upload_job(job_id, status='failed', error=f'Error reading file: {str(e)}')
+        logger.error(f"❌ ERROR DURING FILE PROCESSING: {str(e)}")
+        return jsonify({'error': f'Error reading file: {str(e)}'}), 400
+
+def format_preview_rows(rows):
+    """Make preview rows JSON-friendly: DD/MM/YYYY dates, blank text for NaN, 0 for missing numbers"""
+    preview = rows.copy()
+    
+    # Handle different data types for JSON serialization
+    for col in preview.columns:
+        if pd.api.types.is_datetime64_any_dtype(preview[col]):
+            # Convert datetime to DD/MM/YYYY format (remove time)
+            preview[col] = format_display_dates(preview[col]).fillna('')
+        elif preview[col].dtype == 'object':
+            # Convert objects to string and handle NaN
+            preview[col] = preview[col].fillna('').astype(str)
+        elif pd.api.types.is_numeric_dtype(preview[col]):
+            # Handle NaN values in numeric columns
+            preview[col] = preview[col].fillna(0)
+        else:
+            # Convert everything else to string and handle NaN
+            preview[col] = preview[col].astype(object).fillna('').astype(str)
+    return preview
+
 @app.route('/api/preview', methods=['GET'])
 def preview_data():
-    global current_data, preview_cache, preview_cache_hash
+    session = get_session()
     
     logger.info("Data preview requested")
-    logger.info(f"Current data is: {current_data}")
+    logger.info(f"Current data is: {session.data}")
     
-    if current_data is None:
+    provisional = session.provisional
+    if session.data is None and session.out_of_core is None and provisional is None:
         logger.warning("Preview requested but no data uploaded")
         return jsonify({'error': 'No data uploaded'}), 400
     
     try:
-        # Generate hash for current data
-        current_hash = generate_data_hash(current_data)
-        
+        orient = requested_orient()
+
+        # Arrow clients get the preview rows with their real types, before any display formatting
+        if wants_arrow():
+            if provisional is not None:
+                return stream_arrow_rows(provisional.head(5), {
+                    'total_rows': session.provisional_total_rows, 'provisional': True
+                })
+            if session.out_of_core is not None:
+                return stream_arrow_rows(session.out_of_core.head(5), {'total_rows': session.out_of_core.shape[0]})
+            return stream_arrow_rows(session.data.head(5), {'total_rows': len(session.data)})
+
+        # While an upload is still parsing, its first rows are previewed (and not cached)
+        if provisional is not None:
+            preview = format_preview_rows(provisional.head(5))
+            return frame_json_response({
+                'columns': provisional.columns.tolist(),
+                'total_rows': session.provisional_total_rows,
+                'preview_rows': len(preview),
+                'provisional': True,
+                'ingest': dict(session.ingest_progress)
+            }, preview, orient)
+
+        # Out-of-core datasets are previewed from the head of their first partition
+        if session.out_of_core is not None:
+            source = session.out_of_core.head(5)
+            total_rows = session.out_of_core.shape[0]
+        else:
+            source = session.data
+            total_rows = len(session.data)
+
         # Check if we have cached preview and data hasn't changed
-        if preview_cache is not None and preview_cache_hash == current_hash:
+        current_version = session.version
+        if session.preview_cache is not None and session.preview_cache_version == current_version:
             logger.info("✅ Returning cached preview data")
-            return jsonify(preview_cache), 200
+            meta, preview = session.preview_cache
+            return frame_json_response(meta, preview, orient)
         
         # Generate new preview data
         try:
-            # Convert to records and handle any serialization issues
-            preview = current_data.head(5).copy()
-            
-            # Handle different data types for JSON serialization
-            for col in preview.columns:
-                if pd.api.types.is_datetime64_any_dtype(preview[col]):
-                    # Convert datetime to DD/MM/YYYY format (remove time)
-                    preview[col] = preview[col].dt.strftime('%d/%m/%Y').fillna('')
-                elif preview[col].dtype == 'object':
-                    # Check if it contains date objects
-                    sample = preview[col].dropna().head(3)
-                    if len(sample) > 0:
-                        first_val = sample.iloc[0]
-                        if hasattr(first_val, 'strftime'):
-                            # Format date objects as DD/MM/YYYY
-                            preview[col] = preview[col].apply(
-                                lambda x: x.strftime('%d/%m/%Y') if hasattr(x, 'strftime') else str(x)
-                            )
-                        else:
-                            # Convert other objects to string and handle NaN
-                            preview[col] = preview[col].fillna('').astype(str)
-                    else:
-                        preview[col] = preview[col].fillna('').astype(str)
-                elif pd.api.types.is_numeric_dtype(preview[col]):
-                    # Handle NaN values in numeric columns
-                    preview[col] = preview[col].fillna(0)
-                else:
-                    # Convert everything else to string and handle NaN
-                    preview[col] = preview[col].fillna('').astype(str)
-            
-            preview_data = preview.to_dict('records')
-            columns = current_data.columns.tolist()
+            # Format the rows once; the cache keeps the formatted frame so any orient can be served from it
+            preview = format_preview_rows(source.head(5))
+            columns = source.columns.tolist()
             
             # Ensure we have valid data
-            if not preview_data or not columns:
+            if preview.empty or not columns:
                 raise ValueError("Empty preview data or columns")
             
             # Cache the preview data with correct structure for frontend
-            preview_cache = {
-                'data': preview_data,
+            session.preview_cache = ({
                 'columns': columns,
-                'total_rows': len(current_data),
-                'preview_rows': len(preview_data)
-            }
-            preview_cache_hash = current_hash
+                'total_rows': total_rows,
+                'preview_rows': len(preview)
+            }, preview)
+            session.preview_cache_version = current_version
             
-            logger.info(f"✅ Preview generated and cached: {len(preview_data)} rows, {len(columns)} columns")
-            logger.info(f"Preview response structure: data={len(preview_data) if preview_data else 'None'}, columns={len(columns) if columns else 'None'}")
+            logger.info(f"✅ Preview generated and cached: {len(preview)} rows, {len(columns)} columns")
             
-            return jsonify(preview_cache), 200
+            return frame_json_response(*session.preview_cache, orient)
             
         except Exception as preview_error:
             logger.error(f"Error in preview generation: {str(preview_error)}")
             # Fallback: simple conversion with date formatting
             try:
-                fallback_data = current_data.head().copy()
+                fallback_data = source.head().copy()
                 # Format dates in fallback too
                 for col in fallback_data.columns:
                     if pd.api.types.is_datetime64_any_dtype(fallback_data[col]):
                         fallback_data[col] = fallback_data[col].dt.strftime('%d/%m/%Y').fillna('')
                     elif fallback_data[col].dtype == 'object':
-                        sample = fallback_data[col].dropna().head(3)
-                        if len(sample) > 0:
-                            first_val = sample.iloc[0]
-                            if hasattr(first_val, 'strftime'):
-                                fallback_data[col] = fallback_data[col].apply(
-                                    lambda x: x.strftime('%d/%m/%Y') if hasattr(x, 'strftime') else str(x)
-                                )
-                            else:
-                                fallback_data[col] = fallback_data[col].fillna('').astype(str)
-                        else:
-                            fallback_data[col] = fallback_data[col].fillna('').astype(str)
-                    else:
                         fallback_data[col] = fallback_data[col].fillna('').astype(str)
+                    else:
+                        fallback_data[col] = fallback_data[col].astype(object).fillna('').astype(str)
                 
-                preview_data = fallback_data.to_dict('records')
+                preview = fallback_data
             except:
                 # Ultimate fallback
-                preview_data = current_data.head().fillna('').astype(str).to_dict('records')
+                preview = source.head().astype(object).fillna('').astype(str)
             
-            columns = current_data.columns.tolist()
+            columns = source.columns.tolist()
             
-            preview_cache = {
-                'data': preview_data,
+            session.preview_cache = ({
                 'columns': columns,
-                'total_rows': len(current_data),
-                'preview_rows': len(preview_data)
-            }
-            preview_cache_hash = current_hash
+                'total_rows': total_rows,
+                'preview_rows': len(preview)
+            }, preview)
+            session.preview_cache_version = current_version
             
-            logger.info(f"✅ Fallback preview generated: {len(preview_data)} rows, {len(columns)} columns")
-            logger.info(f"Fallback response structure: data={len(preview_data) if preview_data else 'None'}, columns={len(columns) if columns else 'None'}")
+            logger.info(f"✅ Fallback preview generated: {len(preview)} rows, {len(columns)} columns")
             
-            return jsonify(preview_cache), 200
+            return frame_json_response(*session.preview_cache, orient)
         
     except Exception as e:
         logger.error(f"❌ Error generating preview: {str(e)}")
@@ -601,61 +3282,375 @@ def preview_data():
 @app.route('/api/test-preview', methods=['GET'])
 def test_preview():
     """Test endpoint to debug preview issues"""
-    global current_data
+    session = get_session()
     
-    if current_data is None:
+    # An upload still parsing answers from its provisional rows
+    data = session.provisional if session.provisional is not None else session.data
+    if data is None:
         return jsonify({'error': 'No data uploaded', 'has_data': False}), 400
     
     try:
         response = {
             'has_data': True,
-            'shape': current_data.shape,
-            'columns': current_data.columns.tolist(),
-            'dtypes': current_data.dtypes.astype(str).to_dict(),
-            'first_row': current_data.iloc[0].fillna('NULL').astype(str).to_dict() if len(current_data) > 0 else {}
+            'provisional': data is session.provisional,
+            'shape': data.shape,
+            'columns': data.columns.tolist(),
+            'dtypes': data.dtypes.astype(str).to_dict(),
+            'first_row': data.iloc[0].fillna('NULL').astype(str).to_dict() if len(data) > 0 else {}
         }
         return jsonify(response), 200
     except Exception as e:
         return jsonify({'error': f'Test failed: {str(e)}', 'has_data': True}), 400
 
+DATA_FILTER_OPERATORS = {'eq', 'ne', 'gt', 'ge', 'lt', 'le', 'contains', 'isnull', 'notnull'}
+
+def coerce_filter_value(series, value):
+    """Convert a filter value from the query string to something comparable with the column"""
+    if pd.api.types.is_datetime64_any_dtype(series):
+        # Dates are displayed as DD/MM/YYYY, so that is how users type them
+        return pd.to_datetime(value, dayfirst=True)
+    if pd.api.types.is_bool_dtype(series):
+        return str(value).lower() in ('true', '1', 'yes')
+    if pd.api.types.is_numeric_dtype(series):
+        return float(value)
+    return str(value)
+
+def column_filter_mask(df, spec):
+    """Boolean row mask for one {'column', 'op', 'value'} filter"""
+    column, op = spec.get('column'), spec.get('op', 'eq')
+    if column not in df.columns:
+        raise ValueError(f'Column {column} not found')
+    if op not in DATA_FILTER_OPERATORS:
+        raise ValueError(f"Unknown filter operator '{op}' (use one of {', '.join(sorted(DATA_FILTER_OPERATORS))})")
+    series = df[column]
+
+    if op == 'isnull':
+        mask = series.isna()
+    elif op == 'notnull':
+        mask = series.notna()
+    elif op == 'contains':
+        needle = str(spec.get('value', ''))
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            # Match the (few) categories once instead of every row
+            categories = series.cat.categories
+            matched = categories[categories.astype(str).str.contains(needle, case=False, regex=False)]
+            mask = series.isin(matched)
+        else:
+            mask = series.astype(str).str.contains(needle, case=False, regex=False) & series.notna()
+    else:
+        value = coerce_filter_value(series, spec.get('value'))
+        compare = {'eq': operator.eq, 'ne': operator.ne, 'gt': operator.gt,
+                   'ge': operator.ge, 'lt': operator.lt, 'le': operator.le}[op]
+        mask = compare(series, value)
+    return np.asarray(mask.to_numpy(dtype=bool, na_value=False))
+
+def select_data_rows(df, offset, limit, sort_column=None, ascending=True, filters=None):
+    """
+    Pick the positions of one page of rows after filtering and sorting. Only
+    the sort column is ordered (rows are addressed by position), so no copy
+    of the frame is made. Returns the positions and the number of rows
+    passing the filters.
+    """
+    positions = None
+    if filters:
+        mask = np.ones(len(df), dtype=bool)
+        for spec in filters:
+            mask &= column_filter_mask(df, spec)
+        positions = np.flatnonzero(mask)
+    matched_rows = len(df) if positions is None else len(positions)
+
+    if sort_column is not None:
+        if sort_column not in df.columns:
+            raise ValueError(f'Column {sort_column} not found')
+        values = df[sort_column] if positions is None else df[sort_column].iloc[positions]
+        if isinstance(values.dtype, pd.CategoricalDtype) and not values.cat.ordered:
+            # Unordered categories sort by label, not by code
+            values = values.cat.reorder_categories(values.cat.categories.sort_values())
+        order = values.reset_index(drop=True).sort_values(ascending=ascending, kind='mergesort',
+                                                          na_position='last').index.to_numpy()
+        page = order[offset:offset + limit]
+        if positions is not None:
+            page = positions[page]
+    elif positions is not None:
+        page = positions[offset:offset + limit]
+    else:
+        page = np.arange(min(offset, len(df)), min(offset + limit, len(df)))
+    return page, matched_rows
+
+NDJSON_MIMETYPE = 'application/x-ndjson'
+
+def wants_ndjson():
+    """The client asked for a streamed NDJSON body (format=ndjson or an Accept header preferring it)"""
+    if request.args.get('format', '').lower() == 'ndjson':
+        return True
+    return request.accept_mimetypes.best_match(['application/json', NDJSON_MIMETYPE]) == NDJSON_MIMETYPE
+
+ARROW_STREAM_MIMETYPE = 'application/vnd.apache.arrow.stream'
+
+def wants_arrow():
+    """The client asked for an Arrow IPC stream (format=arrow or an Accept header preferring it)"""
+    if request.args.get('format', '').lower() == 'arrow':
+        return True
+    return request.accept_mimetypes.best_match(['application/json', ARROW_STREAM_MIMETYPE]) == ARROW_STREAM_MIMETYPE
+
+def arrow_schema_for(df):
+    """
+    Arrow schema for a frame's typed columns, taken from the dtypes alone.
+    Object columns are sent as strings; returns the schema and their positions.
+    """
+    import pyarrow as pa
+
+    fields, object_positions = [], []
+    for position, column in enumerate(df.columns):
+        series = df.iloc[:0, position]
+        if series.dtype == object:
+            object_positions.append(position)
+            arrow_type = pa.string()
+        else:
+            arrow_type = pa.Array.from_pandas(series).type
+        fields.append(pa.field(str(column), arrow_type))
+    return pa.schema(fields), object_positions
+
+def stream_arrow_rows(df, meta, positions=None):
+    """
+    Stream rows as an Arrow IPC stream: raw typed column buffers (no display
+    formatting) in record batches of ARROW_BATCH_ROWS rows, with the meta
+    fields as JSON in the schema's 'datawash' metadata. Memory stays bounded
+    by one batch, as for NDJSON.
+    """
+    import pyarrow as pa
+
+    batch_rows = app.config['ARROW_BATCH_ROWS']
+    total = len(df) if positions is None else len(positions)
+    schema, object_positions = arrow_schema_for(df)
+    schema = schema.with_metadata({'datawash': json.dumps(dict(meta, rows=total), default=str)})
+
+    def generate():
+        sink = io.BytesIO()
+        with pa.ipc.new_stream(sink, schema) as writer:
+            for start in range(0, total, batch_rows):
+                if positions is None:
+                    batch = df.iloc[start:start + batch_rows]
+                else:
+                    batch = df.iloc[positions[start:start + batch_rows]]
+                # Columns are converted by position, so non-string or repeated names are fine
+                arrays = []
+                for position, field in enumerate(schema):
+                    values = batch.iloc[:, position]
+                    if position in object_positions:
+                        values = values.where(values.isna(), values.astype(str))
+                    arrays.append(pa.Array.from_pandas(values, type=field.type))
+                writer.write_batch(pa.RecordBatch.from_arrays(arrays, schema=schema))
+                # Hand each encoded batch to the client as soon as it is written
+                yield sink.getvalue()
+                sink.seek(0)
+                sink.truncate()
+        yield sink.getvalue()
+
+    return Response(stream_with_context(generate()), mimetype=ARROW_STREAM_MIMETYPE)
+
+def stream_ndjson_rows(df, meta, positions=None, orient='records'):
+    """
+    Stream rows as NDJSON: a {"meta": ...} line, one {"rows": [...]} line per
+    NDJSON_BATCH_ROWS rows (each batch formatted for display and serialized
+    on its own, missing values as null) and a final {"end": ...} line.
+    Memory stays bounded by one batch however large the frame is.
+    """
+    meta = dict(meta, orient=orient)
+    batch_rows = app.config['NDJSON_BATCH_ROWS']
+    total = len(df) if positions is None else len(positions)
+
+    def generate():
+        yield json.dumps({'meta': meta}, default=str) + '\n'
+        for start in range(0, total, batch_rows):
+            rows = slice(start, start + batch_rows) if positions is None else positions[start:start + batch_rows]
+            batch = format_date_columns_for_display(df, rows)
+            yield '{"rows": ' + encode_frame_json(batch, orient) + '}\n'
+        yield json.dumps({'end': {'rows_sent': total}}) + '\n'
+
+    # No Content-Length, so the body goes out with chunked transfer encoding as it is produced
+    return Response(stream_with_context(generate()), mimetype=NDJSON_MIMETYPE)
+
 @app.route('/api/data', methods=['GET'])
 def get_all_data():
-    global current_data
+    """
+    One page of the dataset: offset/limit pagination, sort=<column> with
+    order=asc|desc, and filters as a JSON list of {column, op, value}.
+    Only the returned rows are formatted for display. With format=ndjson
+    every matching row (or limit rows, when given) is streamed in batches.
+    orient=records|rows|columns picks the shape of the rows. Clients that
+    accept application/vnd.apache.arrow.stream (or pass format=arrow) get the
+    selected rows as an Arrow IPC stream of typed, unformatted columns.
+    """
+    session = get_session()
     
-    if current_data is None:
+    if session.data is None:
         return jsonify({'error': 'No data uploaded'}), 400
     
     try:
-        # Format data for display (convert dates to DD/MM/YYYY format)
-        display_data = format_date_columns_for_display(current_data)
-        
-        # Convert to records for JSON serialization
-        data = display_data.to_dict('records')
-        columns = current_data.columns.tolist()
+        arrow = wants_arrow()
+        stream = arrow or wants_ndjson()
+        orient = requested_orient()
+        offset = max(request.args.get('offset', 0, type=int), 0)
+        if stream:
+            # Streamed reads are not bounded by the page size, only by what the client asks for
+            limit = max(request.args.get('limit', len(session.data), type=int), 0)
+        else:
+            limit = request.args.get('limit', app.config['DATA_PAGE_ROWS'], type=int)
+            limit = min(max(limit, 1), app.config['DATA_PAGE_MAX_ROWS'])
+        sort_column = request.args.get('sort') or None
+        order = request.args.get('order', 'asc').lower()
+        filters = json.loads(request.args['filters']) if request.args.get('filters') else []
+        if not isinstance(filters, list):
+            filters = [filters]
+        
+        positions, matched_rows = select_data_rows(session.data, offset, limit, sort_column=sort_column,
+                                                   ascending=order != 'desc', filters=filters)
+        
+        if arrow:
+            return stream_arrow_rows(session.data, {
+                'total_rows': len(session.data),
+                'filtered_rows': matched_rows,
+                'offset': offset,
+                'sort': sort_column,
+                'order': 'desc' if order == 'desc' else 'asc'
+            }, positions=positions)
+        
+        if stream:
+            return stream_ndjson_rows(session.data, {
+                'columns': session.data.columns.tolist(),
+                'total_rows': len(session.data),
+                'filtered_rows': matched_rows,
+                'offset': offset,
+                'sort': sort_column,
+                'order': 'desc' if order == 'desc' else 'asc'
+            }, positions=positions, orient=orient)
         
-        return jsonify({
-            'data': data,
-            'columns': columns,
-            'total_rows': len(current_data)
-        }), 200
+        # Format data for display (convert dates to DD/MM/YYYY format)
+        display_data = format_date_columns_for_display(session.data, positions)
+        
+        return frame_json_response({
+            'columns': session.data.columns.tolist(),
+            'total_rows': len(session.data),
+            'filtered_rows': matched_rows,
+            'offset': offset,
+            'limit': limit,
+            'sort': sort_column,
+            'order': 'desc' if order == 'desc' else 'asc'
+        }, display_data, orient)
         
     except Exception as e:
         return jsonify({'error': f'Error getting data: {str(e)}'}), 400
 
+def observed_value_counts(series):
+    """value_counts() without the zero counts a categorical reports for its unused categories"""
+    counts = series.value_counts()
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        counts = counts[counts > 0]
+    return counts
+
+def profile_column(series):
+    """
+    Every per-column statistic reported by /api/info, /api/final-preview,
+    /api/generate-report and /api/column-analysis, gathered in one visit
+    to the column.
+    """
+    non_null = series.dropna()
+    counts = observed_value_counts(non_null)
+    is_datetime = pd.api.types.is_datetime64_any_dtype(series)
+
+    top_values = counts.head(10)
+    if is_datetime:
+        top_values.index = top_values.index.strftime('%d/%m/%Y')
+    profile = {
+        'dtype': str(series.dtype),
+        'rows': len(series),
+        'null_count': len(series) - len(non_null),
+        'unique_count': int(non_null.nunique()),
+        'top_values': [(str(value), int(count)) for value, count in top_values.items()],
+        'datetime': None,
+        'describe': None,
+        'numeric': None
+    }
+
+    if is_datetime:
+        if len(non_null) > 0:
+            profile['datetime'] = {
+                'min': non_null.min(),
+                'max': non_null.max(),
+                'head': non_null.head(3).dt.strftime('%d/%m/%Y').tolist()
+            }
+    elif pd.api.types.is_numeric_dtype(series):
+        if pd.api.types.is_bool_dtype(series):
+            # describe() treats booleans as categorical, so their moments are taken directly
+            median = series.median()
+        else:
+            describe = series.describe()
+            profile['describe'] = describe.to_dict()
+            median = describe['50%']
+        profile['numeric'] = {
+            'mean': float(series.mean()),
+            'median': float(median),
+            'std': float(series.std()),
+            'variance': float(series.var()),
+            'min': float(series.min()),
+            'max': float(series.max())
+        }
+    return profile
+
+def cached_column_stat(session, kind, column, compute):
+    """
+    A per-column statistic, computed on first use and kept until a mutation
+    marks the column (or all rows) dirty. A value computed while the column
+    was being changed is returned but not kept.
+    """
+    key = (kind, column)
+    value = session.column_stats.get(key)
+    if value is not None:
+        return value
+    stamp = session.column_stamp(column)
+    value = compute()
+    if session.column_stamp(column) == stamp:
+        session.column_stats[key] = value
+    return value
+
+def get_column_profiles(session, columns=None):
+    """
+    Profiles of the requested columns (all by default). Each column is
+    profiled on first use and reused by every endpoint until it changes, so
+    an edit to one column only re-profiles that column.
+    """
+    columns = session.data.columns if columns is None else columns
+    return {
+        column: cached_column_stat(session, 'profile', column, lambda column=column: profile_column(session.data[column]))
+        for column in columns
+    }
+
+def missing_value_counts(profiles):
+    """Null counts of the profiled columns that have any"""
+    return {column: profile['null_count'] for column, profile in profiles.items() if profile['null_count'] > 0}
+
 @app.route('/api/info', methods=['GET'])
+@cached_result
 def get_data_info():
-    global current_data
+    session = get_session()
+    
+    if session.out_of_core is not None:
+        try:
+            return jsonify(get_data_info_out_of_core(session.out_of_core)), 200
+        except Exception as e:
+            return jsonify({'error': f'Error getting data info: {str(e)}'}), 400
     
-    if current_data is None:
+    if session.data is None:
         return jsonify({'error': 'No data uploaded'}), 400
     
     try:
         # Basic info
-        shape = current_data.shape
+        shape = session.data.shape
+        profiles = get_column_profiles(session)
         
         # Missing values (only show columns with missing values)
-        missing_values = current_data.isnull().sum()
-        missing_values = missing_values[missing_values > 0].to_dict()
+        missing_values = missing_value_counts(profiles)
         
         # Data types categorization
         dtypes = {}
@@ -663,30 +3658,15 @@ def get_data_info():
         datetime_cols = []
         categorical_cols = []
         
-        for column in current_data.columns:
-            if pd.api.types.is_datetime64_any_dtype(current_data[column]):
+        for column in session.data.columns:
+            if pd.api.types.is_datetime64_any_dtype(session.data[column]):
                 dtypes[column] = 'datetime64[ns]'
                 datetime_cols.append(column)
-            elif current_data[column].dtype == 'object':
-                # Check if it contains date objects
-                sample = current_data[column].dropna().head(10)
-                if len(sample) > 0:
-                    first_val = sample.iloc[0]
-                    if hasattr(first_val, 'year') and hasattr(first_val, 'month') and hasattr(first_val, 'day'):
-                        # This is a date object column
-                        dtypes[column] = 'date'
-                        datetime_cols.append(column)
-                    else:
-                        dtypes[column] = str(current_data[column].dtype)
-                        categorical_cols.append(column)
-                else:
-                    dtypes[column] = str(current_data[column].dtype)
-                    categorical_cols.append(column)
-            elif pd.api.types.is_numeric_dtype(current_data[column]):
-                dtypes[column] = str(current_data[column].dtype)
+            elif pd.api.types.is_numeric_dtype(session.data[column]):
+                dtypes[column] = str(session.data[column].dtype)
                 numeric_cols.append(column)
             else:
-                dtypes[column] = str(current_data[column].dtype)
+                dtypes[column] = str(session.data[column].dtype)
                 categorical_cols.append(column)
         
         logger.info(f"Info endpoint - Numeric columns found: {numeric_cols}")
@@ -696,54 +3676,28 @@ def get_data_info():
         # Statistics
         stats = {}
         
-        # Numeric statistics
+        # Numeric statistics (describe() leaves out booleans unless nothing else is numeric)
         if numeric_cols:
-            stats['numeric'] = current_data[numeric_cols].describe().to_dict()
+            described = {col: profiles[col]['describe'] for col in numeric_cols if profiles[col]['describe']}
+            stats['numeric'] = described or session.data[numeric_cols].describe().to_dict()
         
         # Datetime statistics
         datetime_stats = {}
         if datetime_cols:
             for col in datetime_cols:
                 try:
-                    col_data = current_data[col].dropna()
-                    if len(col_data) > 0:
-                        # Handle both datetime64 and date objects
-                        if pd.api.types.is_datetime64_any_dtype(current_data[col]):
-                            # Standard datetime column
-                            datetime_stats[col] = {
-                                'min_date': col_data.min().strftime('%d/%m/%Y'),
-                                'max_date': col_data.max().strftime('%d/%m/%Y'),
-                                'date_range_days': (col_data.max() - col_data.min()).days,
-                                'unique_dates': int(col_data.nunique()),
-                                'null_count': int(current_data[col].isnull().sum()),
-                                'sample_values': [d.strftime('%d/%m/%Y') for d in col_data.head(3)]
-                            }
-                        else:
-                            # Date object column
-                            first_val = col_data.iloc[0]
-                            if hasattr(first_val, 'strftime'):
-                                # Convert date objects to strings for calculations
-                                min_date = min(col_data)
-                                max_date = max(col_data)
-                                date_range = (max_date - min_date).days
-                                
-                                datetime_stats[col] = {
-                                    'min_date': min_date.strftime('%d/%m/%Y'),
-                                    'max_date': max_date.strftime('%d/%m/%Y'),
-                                    'date_range_days': date_range,
-                                    'unique_dates': int(col_data.nunique()),
-                                    'null_count': int(current_data[col].isnull().sum()),
-                                    'sample_values': [d.strftime('%d/%m/%Y') for d in col_data.head(3)]
-                                }
-                            else:
-                                # Fallback for other object types
-                                datetime_stats[col] = {
-                                    'min_date': str(min(col_data)),
-                                    'max_date': str(max(col_data)),
-                                    'unique_dates': int(col_data.nunique()),
-                                    'null_count': int(current_data[col].isnull().sum()),
-                                    'sample_values': [str(d) for d in col_data.head(3)]
-                                }
+                    profile = profiles[col]
+                    if profile['datetime'] is not None:
+                        min_date = profile['datetime']['min']
+                        max_date = profile['datetime']['max']
+                        datetime_stats[col] = {
+                            'min_date': min_date.strftime('%d/%m/%Y'),
+                            'max_date': max_date.strftime('%d/%m/%Y'),
+                            'date_range_days': (max_date - min_date).days,
+                            'unique_dates': profile['unique_count'],
+                            'null_count': profile['null_count'],
+                            'sample_values': profile['datetime']['head']
+                        }
                 except Exception as e:
                     logger.warning(f"Error calculating datetime stats for {col}: {e}")
                     datetime_stats[col] = {'error': str(e)}
@@ -772,23 +3726,23 @@ def get_data_info():
 @app.route('/api/debug-columns', methods=['GET'])
 def debug_columns():
     """Debug endpoint to check column types"""
-    global current_data
+    session = get_session()
     
-    if current_data is None:
+    if session.data is None:
         return jsonify({'error': 'No data uploaded'}), 400
     
     try:
         debug_info = {}
-        for column in current_data.columns:
+        for column in session.data.columns:
             debug_info[column] = {
-                'dtype': str(current_data[column].dtype),
-                'is_numeric': bool(pd.api.types.is_numeric_dtype(current_data[column])),
-                'is_datetime': bool(pd.api.types.is_datetime64_any_dtype(current_data[column])),
-                'sample_values': current_data[column].head(3).astype(str).tolist()
+                'dtype': str(session.data[column].dtype),
+                'is_numeric': bool(pd.api.types.is_numeric_dtype(session.data[column])),
+                'is_datetime': bool(pd.api.types.is_datetime64_any_dtype(session.data[column])),
+                'sample_values': session.data[column].head(3).astype(str).tolist()
             }
         
         return jsonify({
-            'total_columns': len(current_data.columns),
+            'total_columns': len(session.data.columns),
             'column_details': debug_info
         }), 200
         
@@ -798,28 +3752,28 @@ def debug_columns():
 @app.route('/api/test-datetime', methods=['GET'])
 def test_datetime_detection():
     """Test endpoint to check datetime detection"""
-    global current_data
+    session = get_session()
     
-    if current_data is None:
+    if session.data is None:
         return jsonify({'error': 'No data uploaded'}), 400
     
     try:
         result = {
-            'total_columns': len(current_data.columns),
+            'total_columns': len(session.data.columns),
             'column_analysis': {}
         }
         
-        for column in current_data.columns:
+        for column in session.data.columns:
             col_info = {
-                'dtype': str(current_data[column].dtype),
-                'is_datetime': bool(pd.api.types.is_datetime64_any_dtype(current_data[column])),
-                'sample_values': current_data[column].head(3).astype(str).tolist(),
-                'null_count': int(current_data[column].isnull().sum())
+                'dtype': str(session.data[column].dtype),
+                'is_datetime': bool(pd.api.types.is_datetime64_any_dtype(session.data[column])),
+                'sample_values': session.data[column].head(3).astype(str).tolist(),
+                'null_count': int(session.data[column].isnull().sum())
             }
             
-            if pd.api.types.is_datetime64_any_dtype(current_data[column]):
+            if pd.api.types.is_datetime64_any_dtype(session.data[column]):
                 try:
-                    non_null_data = current_data[column].dropna()
+                    non_null_data = session.data[column].dropna()
                     if len(non_null_data) > 0:
                         col_info['datetime_info'] = {
                             'min': non_null_data.min().strftime('%Y-%m-%d %H:%M:%S'),
@@ -838,9 +3792,9 @@ def test_datetime_detection():
 
 @app.route('/api/plot', methods=['POST'])
 def generate_plot():
-    global current_data
+    session = get_session()
     
-    if current_data is None:
+    if session.data is None:
         return jsonify({'error': 'No data uploaded'}), 400
     
     try:
@@ -862,19 +3816,16 @@ def generate_plot():
         fig, ax = plt.subplots(figsize=(20, 12))
         
         # Sample data for better performance with large datasets
-        plot_data = sample_data_for_plotting(current_data)
-        
-        # Prepare data for plotting (convert date objects to datetime)
-        plot_data = prepare_data_for_plotting(plot_data)
+        plot_data = sample_data_for_plotting(session.data)
         
-        logger.info(f"Plotting with {len(plot_data)} data points (sampled from {len(current_data)})")
+        logger.info(f"Plotting with {len(plot_data)} data points (sampled from {len(session.data)})")
         
         sampling_time = time.time()
         logger.info(f"Data sampling took {sampling_time - start_time:.2f} seconds")
         
         # Get column types for enhanced plotting
-        x_type = get_column_type(current_data[x_col]) if x_col else None
-        y_type = get_column_type(current_data[y_col]) if y_col else None
+        x_type = get_column_type(session.data[x_col]) if x_col else None
+        y_type = get_column_type(session.data[y_col]) if y_col else None
         
         logger.info(f"Column types: X='{x_col}' ({x_type}), Y='{y_col}' ({y_type})")
         
@@ -936,9 +3887,9 @@ def generate_plot():
                     return jsonify({'error': 'Line plot with single axis requires datetime column'}), 400
             
         elif plot_type == 'bar':
-            if plot_data[x_col].dtype == 'object':
+            if is_text_column(plot_data[x_col]):
                 # Limit to top 20 categories for performance
-                value_counts = plot_data[x_col].value_counts().head(20)
+                value_counts = observed_value_counts(plot_data[x_col]).head(20)
                 if len(value_counts) > 0:
                     ax.bar(range(len(value_counts)), value_counts.values, color='steelblue')
                     ax.set_xticks(range(len(value_counts)))
@@ -977,7 +3928,7 @@ def generate_plot():
                 clean_data = plot_data[[x_col, y_col]].dropna()
                 if len(clean_data) > 0:
                     # Limit categories for performance
-                    top_categories = clean_data[x_col].value_counts().head(10).index
+                    top_categories = observed_value_counts(clean_data[x_col]).head(10).index
                     filtered_data = clean_data[clean_data[x_col].isin(top_categories)]
                     
                     if len(filtered_data) > 0:
@@ -1004,8 +3955,8 @@ def generate_plot():
         logger.info(f"Plot rendering took {render_time - sampling_time:.2f} seconds")
         
         # Add data info to plot
-        if len(plot_data) < len(current_data):
-            ax.text(0.02, 0.98, f'📊 Showing {len(plot_data):,} of {len(current_data):,} points', 
+        if len(plot_data) < len(session.data):
+            ax.text(0.02, 0.98, f'📊 Showing {len(plot_data):,} of {len(session.data):,} points', 
                    transform=ax.transAxes, fontsize=8, verticalalignment='top',
                    bbox=dict(boxstyle='round,pad=0.3', facecolor='lightblue', alpha=0.7))
         
@@ -1021,27 +3972,53 @@ def generate_plot():
         logger.error(f"Error generating plot: {str(e)}")
         return jsonify({'error': f'Error generating plot: {str(e)}'}), 400
 
+def incremental_correlation(session, sampled_data):
+    """
+    Pearson correlation matrix of sampled_data's columns. Entries cached on
+    the session are reused; only the rows and columns of the matrix that
+    belong to columns changed since (or never seen) are recomputed.
+    """
+    columns = sampled_data.columns.tolist()
+    stamps = [session.column_stamp(column) for column in columns]
+    cached = session.correlation_matrix
+    known = [] if cached is None else [column for column in columns if column in cached.columns]
+
+    if len(known) < len(columns) / 2:
+        # Mostly new columns: one full pass is cheaper than column by column
+        matrix = sampled_data.corr()
+    else:
+        matrix = cached.loc[known, known].reindex(index=columns, columns=columns)
+        known = set(known)
+        for column in columns:
+            if column not in known:
+                values = sampled_data.corrwith(sampled_data[column])
+                matrix[column] = values
+                matrix.loc[column] = values
+        logger.info(f"Reused cached correlations for {len(known)} of {len(columns)} columns")
+
+    if [session.column_stamp(column) for column in columns] == stamps:
+        session.correlation_matrix = matrix
+    return matrix
+
 @app.route('/api/correlation', methods=['GET'])
+@cached_result
 def get_correlation():
-    global current_data
+    session = get_session()
     
-    if current_data is None:
+    if session.data is None:
         return jsonify({'error': 'No data uploaded'}), 400
     
     try:
         # Get numeric columns only
-        numeric_data = current_data.select_dtypes(include=[np.number])
+        numeric_columns = session.data.select_dtypes(include=[np.number]).columns.tolist()
         
-        if numeric_data.empty:
+        if not numeric_columns or session.data.empty:
             return jsonify({'error': 'No numeric columns found for correlation analysis'}), 400
         
-        # Remove columns that are all NaN or have no variance
-        numeric_data = numeric_data.dropna(axis=1, how='all')  # Remove all-NaN columns
-        
-        # Remove columns with zero variance (constant values)
-        variance_check = numeric_data.var()
-        valid_columns = variance_check[variance_check > 0].index
-        numeric_data = numeric_data[valid_columns]
+        # Remove columns that are all NaN or have no variance (constant values), using the cached profiles
+        profiles = get_column_profiles(session, numeric_columns)
+        valid_columns = [col for col in numeric_columns if profiles[col]['numeric']['variance'] > 0]
+        numeric_data = session.data[valid_columns]
         
         if numeric_data.empty:
             return jsonify({'error': 'No valid numeric columns found for correlation analysis'}), 400
@@ -1055,8 +4032,8 @@ def get_correlation():
         else:
             sampled_data = numeric_data
             
-        # Calculate correlation matrix
-        corr_matrix = sampled_data.corr()
+        # Calculate correlation matrix (only pairs involving changed columns are recomputed)
+        corr_matrix = incremental_correlation(session, sampled_data)
         
         # Handle any NaN values in correlation matrix
         corr_matrix = corr_matrix.fillna(0)  # Replace NaN with 0 for invalid correlations
@@ -1121,17 +4098,17 @@ def get_correlation():
 @app.route('/api/test-correlation', methods=['GET'])
 def test_correlation():
     """Debug endpoint to test correlation calculation"""
-    global current_data
+    session = get_session()
     
-    if current_data is None:
+    if session.data is None:
         return jsonify({'error': 'No data uploaded'}), 400
     
     try:
         # Get numeric columns only
-        numeric_data = current_data.select_dtypes(include=[np.number])
+        numeric_data = session.data.select_dtypes(include=[np.number])
         
         debug_info = {
-            'total_columns': len(current_data.columns),
+            'total_columns': len(session.data.columns),
             'numeric_columns': list(numeric_data.columns),
             'numeric_column_count': len(numeric_data.columns),
             'data_shape': numeric_data.shape,
@@ -1171,9 +4148,9 @@ def test_correlation():
 
 @app.route('/api/plot-options', methods=['POST'])
 def get_plot_options():
-    global current_data
+    session = get_session()
     
-    if current_data is None:
+    if session.data is None:
         return jsonify({'error': 'No data uploaded'}), 400
     
     try:
@@ -1185,8 +4162,8 @@ def get_plot_options():
         
         if x_col and y_col:
             # Both axes selected
-            x_type = get_column_type(current_data[x_col])
-            y_type = get_column_type(current_data[y_col])
+            x_type = get_column_type(session.data[x_col])
+            y_type = get_column_type(session.data[y_col])
             
             logger.info(f"Plot options: X-axis '{x_col}' is {x_type}, Y-axis '{y_col}' is {y_type}")
             
@@ -1209,7 +4186,7 @@ def get_plot_options():
                 
         elif x_col:
             # Only x-axis selected
-            x_type = get_column_type(current_data[x_col])
+            x_type = get_column_type(session.data[x_col])
             
             logger.info(f"Single axis plot options: X-axis '{x_col}' is {x_type}")
             
@@ -1232,14 +4209,6 @@ def get_column_type(column):
     if pd.api.types.is_datetime64_any_dtype(column):
         return 'datetime'
     elif column.dtype == 'object':
-        # Check if it contains date objects
-        sample = column.dropna().head(10)
-        if len(sample) > 0:
-            # Check if sample values are date objects
-            first_val = sample.iloc[0]
-            if hasattr(first_val, 'year') and hasattr(first_val, 'month') and hasattr(first_val, 'day'):
-                # This is likely a date object
-                return 'datetime'
         return 'categorical'
     elif pd.api.types.is_numeric_dtype(column):
         return 'numeric'
@@ -1248,30 +4217,30 @@ def get_column_type(column):
 
 @app.route('/api/valid-y-columns', methods=['POST'])
 def get_valid_y_columns():
-    global current_data
+    session = get_session()
     
-    if current_data is None:
+    if session.data is None:
         return jsonify({'error': 'No data uploaded'}), 400
     
     try:
         data = request.json
         x_col = data.get('x_axis')
         
-        if not x_col or x_col not in current_data.columns:
+        if not x_col or x_col not in session.data.columns:
             # Return all columns if no valid X-axis selected
-            return jsonify({'valid_columns': current_data.columns.tolist()}), 200
+            return jsonify({'valid_columns': session.data.columns.tolist()}), 200
         
         # Determine X-axis type using enhanced type detection
-        x_type = get_column_type(current_data[x_col])
+        x_type = get_column_type(session.data[x_col])
         
         valid_columns = []
         
-        for col in current_data.columns:
+        for col in session.data.columns:
             if col == x_col:  # Skip the same column
                 continue
                 
             # Determine column type using enhanced type detection
-            col_type = get_column_type(current_data[col])
+            col_type = get_column_type(session.data[col])
             
             # Define valid combinations based on enhanced plotting logic
             if x_type == 'datetime':
@@ -1295,37 +4264,40 @@ def get_valid_y_columns():
 
 @app.route('/api/column-analysis', methods=['POST'])
 def analyze_column():
-    global current_data
+    session = get_session()
     
-    if current_data is None:
+    if session.data is None:
         return jsonify({'error': 'No data uploaded'}), 400
     
     try:
         data = request.json
         column = data.get('column')
         
-        if column not in current_data.columns:
+        if column not in session.data.columns:
             return jsonify({'error': f'Column {column} not found'}), 400
         
-        col_data = current_data[column]
+        col_data = session.data[column]
+        profile = get_column_profiles(session, [column])[column]
         
         # Basic info
         analysis = {
             'column': column,
-            'data_type': str(col_data.dtype),
-            'non_null_count': int(col_data.count()),
-            'null_count': int(col_data.isnull().sum()),
+            'data_type': profile['dtype'],
+            'non_null_count': profile['rows'] - profile['null_count'],
+            'null_count': profile['null_count'],
             'is_numeric': pd.api.types.is_numeric_dtype(col_data)
         }
         
+        # Dates stay datetime64 in the frame and are only formatted for the response
+        is_datetime = pd.api.types.is_datetime64_any_dtype(col_data)
+        
         # Value counts (top 10 most frequent values - highest to lowest)
-        value_counts = col_data.value_counts().head(10)
         top_frequent_values = []
-        for value, count in value_counts.items():
+        for value, count in profile['top_values']:
             percentage = (count / len(col_data)) * 100
             top_frequent_values.append({
-                'value': str(value),
-                'count': int(count),
+                'value': value,
+                'count': count,
                 'percentage': round(percentage, 2)
             })
         analysis['top_frequent_values'] = top_frequent_values
@@ -1333,21 +4305,14 @@ def analyze_column():
         # Sample values (10 random non-null values for variety)
         available_values = col_data.dropna()
         if len(available_values) > 10:
-            sample_values = available_values.sample(10).tolist()
-        else:
-            sample_values = available_values.tolist()
-        analysis['sample_values'] = sample_values
+            available_values = available_values.sample(10)
+        if is_datetime:
+            available_values = available_values.dt.strftime('%d/%m/%Y')
+        analysis['sample_values'] = available_values.tolist()
         
         # Numeric statistics if applicable
         if analysis['is_numeric']:
-            analysis.update({
-                'mean': float(col_data.mean()),
-                'median': float(col_data.median()),
-                'std': float(col_data.std()),
-                'variance': float(col_data.var()),
-                'min': float(col_data.min()),
-                'max': float(col_data.max())
-            })
+            analysis.update(profile['numeric'])
         
         return jsonify(analysis), 200
         
@@ -1356,9 +4321,9 @@ def analyze_column():
 
 @app.route('/api/drop-columns', methods=['POST'])
 def drop_columns():
-    global current_data
+    session = get_session()
     
-    if current_data is None:
+    if session.data is None:
         return jsonify({'error': 'No data uploaded'}), 400
     
     try:
@@ -1369,15 +4334,15 @@ def drop_columns():
             return jsonify({'error': 'No columns specified for dropping'}), 400
         
         # Validate columns exist
-        invalid_columns = [col for col in columns_to_drop if col not in current_data.columns]
+        invalid_columns = [col for col in columns_to_drop if col not in session.data.columns]
         if invalid_columns:
             return jsonify({'error': f'Columns not found: {invalid_columns}'}), 400
         
         # Drop columns
-        current_data = current_data.drop(columns=columns_to_drop)
+        session.data = session.data.drop(columns=columns_to_drop)
         
         # Invalidate preview cache since data structure changed
-        invalidate_preview_cache()
+        invalidate_preview_cache(columns_to_drop)
         
         # Track the column dropping operation
         track_operation(
@@ -1385,8 +4350,8 @@ def drop_columns():
             f'Dropped {len(columns_to_drop)} columns',
             {
                 'dropped_columns': columns_to_drop,
-                'original_shape': [current_data.shape[0], current_data.shape[1] + len(columns_to_drop)],
-                'new_shape': current_data.shape,
+                'original_shape': [session.data.shape[0], session.data.shape[1] + len(columns_to_drop)],
+                'new_shape': session.data.shape,
                 'columns_removed': len(columns_to_drop)
             }
         )
@@ -1394,9 +4359,9 @@ def drop_columns():
         return jsonify({
             'message': f'Successfully dropped {len(columns_to_drop)} columns',
             'dropped_columns': columns_to_drop,
-            'shape': current_data.shape,
-            'columns': current_data.columns.tolist(),
-            'filename': current_filename
+            'shape': session.data.shape,
+            'columns': session.data.columns.tolist(),
+            'filename': session.filename
         }), 200
         
     except Exception as e:
@@ -1404,9 +4369,9 @@ def drop_columns():
 
 @app.route('/api/impute-missing', methods=['POST'])
 def impute_missing_values():
-    global current_data
+    session = get_session()
     
-    if current_data is None:
+    if session.data is None and session.out_of_core is None:
         return jsonify({'error': 'No data uploaded'}), 400
     
     try:
@@ -1416,6 +4381,27 @@ def impute_missing_values():
         if not rules:
             return jsonify({'error': 'No imputation rules provided'}), 400
         
+        if session.out_of_core is not None:
+            applied_rules = impute_missing_out_of_core(session.out_of_core, rules)
+            invalidate_preview_cache([rule.get('column') for rule in rules])
+            track_operation(
+                'missing_value_imputation',
+                f'Imputed missing values using {len(applied_rules)} rules',
+                {
+                    'rules_applied': applied_rules,
+                    'affected_columns': len(set(rule.split(':')[0] for rule in applied_rules)),
+                    'total_rules': len(applied_rules),
+                    'dataset_shape_after': session.out_of_core.shape
+                }
+            )
+            return jsonify({
+                'message': f'Applied {len(applied_rules)} imputation rules',
+                'applied_rules': applied_rules,
+                'shape': session.out_of_core.shape,
+                'columns': session.out_of_core.columns,
+                'filename': session.filename
+            }), 200
+        
         applied_rules = []
         
         for rule in rules:
@@ -1423,47 +4409,50 @@ def impute_missing_values():
             method = rule.get('method')
             custom_value = rule.get('customValue')
             
-            if column not in current_data.columns:
+            if column not in session.data.columns:
                 continue
                 
-            if method == 'mean' and pd.api.types.is_numeric_dtype(current_data[column]):
-                fill_value = current_data[column].mean()
-                current_data[column].fillna(fill_value, inplace=True)
+            if method == 'mean' and pd.api.types.is_numeric_dtype(session.data[column]):
+                fill_value = session.data[column].mean()
+                ensure_fillable(session.data, column, fill_value)
+                session.data[column].fillna(fill_value, inplace=True)
                 applied_rules.append(f'{column}: filled with mean ({fill_value:.2f})')
                 
-            elif method == 'median' and pd.api.types.is_numeric_dtype(current_data[column]):
-                fill_value = current_data[column].median()
-                current_data[column].fillna(fill_value, inplace=True)
+            elif method == 'median' and pd.api.types.is_numeric_dtype(session.data[column]):
+                fill_value = session.data[column].median()
+                ensure_fillable(session.data, column, fill_value)
+                session.data[column].fillna(fill_value, inplace=True)
                 applied_rules.append(f'{column}: filled with median ({fill_value:.2f})')
                 
             elif method == 'mode':
-                fill_value = current_data[column].mode()
+                fill_value = session.data[column].mode()
                 if not fill_value.empty:
-                    current_data[column].fillna(fill_value.iloc[0], inplace=True)
+                    session.data[column].fillna(fill_value.iloc[0], inplace=True)
                     applied_rules.append(f'{column}: filled with mode ({fill_value.iloc[0]})')
                     
             elif method == 'forward_fill':
-                current_data[column].fillna(method='ffill', inplace=True)
+                session.data[column].fillna(method='ffill', inplace=True)
                 applied_rules.append(f'{column}: forward filled')
                 
             elif method == 'backward_fill':
-                current_data[column].fillna(method='bfill', inplace=True)
+                session.data[column].fillna(method='bfill', inplace=True)
                 applied_rules.append(f'{column}: backward filled')
                 
             elif method == 'custom' and custom_value is not None:
                 # Try to convert custom value to appropriate type
                 try:
-                    if pd.api.types.is_numeric_dtype(current_data[column]):
+                    if pd.api.types.is_numeric_dtype(session.data[column]):
                         fill_value = float(custom_value)
                     else:
                         fill_value = str(custom_value)
-                    current_data[column].fillna(fill_value, inplace=True)
+                    ensure_fillable(session.data, column, fill_value)
+                    session.data[column].fillna(fill_value, inplace=True)
                     applied_rules.append(f'{column}: filled with custom value ({fill_value})')
                 except ValueError:
                     applied_rules.append(f'{column}: error with custom value')
         
-        # Invalidate preview cache since data values changed
-        invalidate_preview_cache()
+        # Invalidate preview cache since data values changed (only the imputed columns)
+        invalidate_preview_cache([rule.get('column') for rule in rules])
         
         # Track the imputation operation
         track_operation(
@@ -1473,63 +4462,87 @@ def impute_missing_values():
                 'rules_applied': applied_rules,
                 'affected_columns': len(set(rule.split(':')[0] for rule in applied_rules)),
                 'total_rules': len(applied_rules),
-                'dataset_shape_after': current_data.shape
+                'dataset_shape_after': session.data.shape
             }
         )
         
         return jsonify({
             'message': f'Applied {len(applied_rules)} imputation rules',
             'applied_rules': applied_rules,
-            'shape': current_data.shape,
-            'columns': current_data.columns.tolist(),
-            'filename': current_filename
+            'shape': session.data.shape,
+            'columns': session.data.columns.tolist(),
+            'filename': session.filename
         }), 200
         
     except Exception as e:
         return jsonify({'error': f'Error applying imputation: {str(e)}'}), 400
 
+def count_outliers(col_data):
+    """Z-score and IQR outlier counts for one numeric column (NaNs already dropped)"""
+    col_data = col_data.astype('float64')
+    
+    # Z-score method
+    z_scores = np.abs((col_data - col_data.mean()) / col_data.std())
+    zscore_outliers = len(z_scores[z_scores > 3])
+    
+    # IQR method
+    Q1 = col_data.quantile(0.25)
+    Q3 = col_data.quantile(0.75)
+    IQR = Q3 - Q1
+    lower_bound = Q1 - 1.5 * IQR
+    upper_bound = Q3 + 1.5 * IQR
+    iqr_outliers = len(col_data[(col_data < lower_bound) | (col_data > upper_bound)])
+    
+    return {
+        'total_values': int(len(col_data)),
+        'zscore_outliers': int(zscore_outliers),
+        'iqr_outliers': int(iqr_outliers)
+    }
+
+def outlier_summary(session, column):
+    """count_outliers for one column of the session's dataset (an empty dict when it has no values)"""
+    if session.out_of_core is not None:
+        col_data = session.out_of_core.column(column).dropna()
+    else:
+        col_data = session.data[column].dropna()
+    if len(col_data) == 0:
+        return {}
+    return count_outliers(col_data)
+
 @app.route('/api/detect-outliers', methods=['POST'])
+@cached_result
 def detect_outliers():
-    global current_data
+    session = get_session()
     
-    if current_data is None:
+    if session.data is None and session.out_of_core is None:
         return jsonify({'error': 'No data uploaded'}), 400
     
     try:
         data = request.json
         columns = data.get('columns', [])
         
+        # Out-of-core datasets are analysed one column at a time
+        if session.out_of_core is not None:
+            dataset = session.out_of_core
+            numeric_columns = [col for col in dataset.columns
+                               if pd.api.types.is_numeric_dtype(pd.api.types.pandas_dtype(dataset.dtypes[col]))]
+        else:
+            numeric_columns = session.data.select_dtypes(include=[np.number]).columns.tolist()
+        
         if not columns:
             # Use all numeric columns if none specified
-            columns = current_data.select_dtypes(include=[np.number]).columns.tolist()
+            columns = numeric_columns
         
         outlier_info = {}
         
         for col in columns:
-            if col not in current_data.columns or not pd.api.types.is_numeric_dtype(current_data[col]):
+            if col not in numeric_columns:
                 continue
                 
-            col_data = current_data[col].dropna()
-            if len(col_data) == 0:
-                continue
-            
-            # Z-score method
-            z_scores = np.abs((col_data - col_data.mean()) / col_data.std())
-            zscore_outliers = len(z_scores[z_scores > 3])
-            
-            # IQR method
-            Q1 = col_data.quantile(0.25)
-            Q3 = col_data.quantile(0.75)
-            IQR = Q3 - Q1
-            lower_bound = Q1 - 1.5 * IQR
-            upper_bound = Q3 + 1.5 * IQR
-            iqr_outliers = len(col_data[(col_data < lower_bound) | (col_data > upper_bound)])
-            
-            outlier_info[col] = {
-                'total_values': int(len(col_data)),
-                'zscore_outliers': int(zscore_outliers),
-                'iqr_outliers': int(iqr_outliers)
-            }
+            # Summaries are kept per column until that column changes
+            summary = cached_column_stat(session, 'outliers', col, lambda col=col: outlier_summary(session, col))
+            if summary:
+                outlier_info[col] = summary
         
         return jsonify(outlier_info), 200
         
@@ -1538,9 +4551,9 @@ def detect_outliers():
 
 @app.route('/api/remove-outliers', methods=['POST'])
 def remove_outliers():
-    global current_data
+    session = get_session()
     
-    if current_data is None:
+    if session.data is None:
         return jsonify({'error': 'No data uploaded'}), 400
     
     try:
@@ -1551,7 +4564,7 @@ def remove_outliers():
             return jsonify({'error': 'No outlier removal rules provided'}), 400
         
         applied_rules = []
-        original_shape = current_data.shape
+        original_shape = session.data.shape
         
         for rule in rules:
             column = rule.get('column')
@@ -1559,11 +4572,12 @@ def remove_outliers():
             action = rule.get('action')
             threshold = rule.get('threshold')
             
-            if column not in current_data.columns or not pd.api.types.is_numeric_dtype(current_data[column]):
+            if column not in session.data.columns or not pd.api.types.is_numeric_dtype(session.data[column]):
                 continue
             
-            col_data = current_data[column]
-            outlier_mask = pd.Series([False] * len(current_data))
+            # Work in float64 so masks and caps behave the same for downcast and nullable integers
+            col_data = session.data[column].astype('float64')
+            outlier_mask = pd.Series([False] * len(session.data))
             
             if method == 'zscore':
                 threshold_val = float(threshold) if threshold else 3.0
@@ -1599,7 +4613,7 @@ def remove_outliers():
                 try:
                     from sklearn.ensemble import IsolationForest
                     iso_forest = IsolationForest(contamination=0.1, random_state=42)
-                    outlier_pred = iso_forest.fit_predict(col_data.values.reshape(-1, 1))
+                    outlier_pred = iso_forest.fit_predict(col_data.to_numpy().reshape(-1, 1))
                     outlier_mask = outlier_pred == -1
                 except ImportError:
                     applied_rules.append(f'{column}: Isolation Forest not available (sklearn required)')
@@ -1608,7 +4622,7 @@ def remove_outliers():
             outlier_count = int(outlier_mask.sum())
             
             if action == 'remove':
-                current_data = current_data[~outlier_mask]
+                session.data = session.data[~outlier_mask]
                 applied_rules.append(f'{column}: Removed {outlier_count} outliers using {method}')
                 
             elif action == 'cap':
@@ -1628,21 +4642,25 @@ def remove_outliers():
                 else:
                     continue
                     
-                current_data.loc[col_data < lower_cap, column] = lower_cap
-                current_data.loc[col_data > upper_cap, column] = upper_cap
+                session.data[column] = col_data
+                session.data.loc[col_data < lower_cap, column] = lower_cap
+                session.data.loc[col_data > upper_cap, column] = upper_cap
                 applied_rules.append(f'{column}: Capped {outlier_count} outliers using {method}')
                 
             elif action == 'transform':
                 # Log transformation (add 1 to handle zeros)
                 min_val = col_data.min()
                 if min_val <= 0:
-                    current_data[column] = np.log1p(col_data - min_val + 1)
+                    session.data[column] = np.log1p(col_data - min_val + 1)
                 else:
-                    current_data[column] = np.log1p(col_data)
+                    session.data[column] = np.log1p(col_data)
                 applied_rules.append(f'{column}: Applied log transformation')
         
-        # Invalidate preview cache since data changed
-        invalidate_preview_cache()
+        # Invalidate preview cache since data changed; removing rows touches every column
+        if any(rule.get('action') == 'remove' for rule in rules):
+            invalidate_preview_cache()
+        else:
+            invalidate_preview_cache([rule.get('column') for rule in rules])
         
         # Track the operation
         track_operation('outlier_removal', 
@@ -1651,8 +4669,8 @@ def remove_outliers():
             'applied_rules': applied_rules,
             'rules_count': len(applied_rules),
             'original_shape': list(original_shape),
-            'new_shape': list(current_data.shape),
-            'rows_removed': int(original_shape[0] - current_data.shape[0]),
+            'new_shape': list(session.data.shape),
+            'rows_removed': int(original_shape[0] - session.data.shape[0]),
             'methods_used': [rule.get('method') for rule in rules],
             'columns_processed': [rule.get('column') for rule in rules]
         })
@@ -1661,11 +4679,11 @@ def remove_outliers():
             'message': f'Applied {len(applied_rules)} outlier removal rules',
             'applied_rules': applied_rules,
             'original_shape': list(original_shape),
-            'new_shape': list(current_data.shape),
-            'rows_removed': int(original_shape[0] - current_data.shape[0]),
-            'shape': list(current_data.shape),
-            'columns': current_data.columns.tolist(),
-            'filename': current_filename
+            'new_shape': list(session.data.shape),
+            'rows_removed': int(original_shape[0] - session.data.shape[0]),
+            'shape': list(session.data.shape),
+            'columns': session.data.columns.tolist(),
+            'filename': session.filename
         }), 200
         
     except Exception as e:
@@ -1673,9 +4691,9 @@ def remove_outliers():
 
 @app.route('/api/standardize-columns', methods=['POST'])
 def standardize_columns():
-    global current_data
+    session = get_session()
     
-    if current_data is None:
+    if session.data is None:
         return jsonify({'error': 'No data uploaded'}), 400
     
     try:
@@ -1691,7 +4709,7 @@ def standardize_columns():
         # Handle column name standardization
         if column_mapping:
             # Validate that all original columns exist
-            invalid_columns = [col for col in column_mapping.keys() if col not in current_data.columns]
+            invalid_columns = [col for col in column_mapping.keys() if col not in session.data.columns]
             if invalid_columns:
                 return jsonify({'error': f'Columns not found: {invalid_columns}'}), 400
             
@@ -1702,67 +4720,67 @@ def standardize_columns():
                 return jsonify({'error': f'Duplicate new column names: {list(set(duplicates))}'}), 400
             
             # Rename columns
-            current_data = current_data.rename(columns=column_mapping)
+            session.data = session.data.rename(columns=column_mapping)
             operations_performed.append(f'Renamed {len(column_mapping)} columns')
         
         # Handle data standardization
         if data_standardization:
             for column, standardization_type in data_standardization.items():
-                if column not in current_data.columns:
+                if column not in session.data.columns:
                     continue
                 
                 if standardization_type == 'lowercase':
-                    if current_data[column].dtype == 'object':
-                        current_data[column] = current_data[column].astype(str).str.lower()
+                    if is_text_column(session.data[column]):
+                        session.data[column] = session.data[column].astype(str).str.lower()
                         operations_performed.append(f'{column}: Converted to lowercase')
                 
                 elif standardization_type == 'uppercase':
-                    if current_data[column].dtype == 'object':
-                        current_data[column] = current_data[column].astype(str).str.upper()
+                    if is_text_column(session.data[column]):
+                        session.data[column] = session.data[column].astype(str).str.upper()
                         operations_performed.append(f'{column}: Converted to uppercase')
                 
                 elif standardization_type == 'title_case':
-                    if current_data[column].dtype == 'object':
-                        current_data[column] = current_data[column].astype(str).str.title()
+                    if is_text_column(session.data[column]):
+                        session.data[column] = session.data[column].astype(str).str.title()
                         operations_performed.append(f'{column}: Converted to title case')
                 
                 elif standardization_type == 'trim_whitespace':
-                    if current_data[column].dtype == 'object':
-                        current_data[column] = current_data[column].astype(str).str.strip()
+                    if is_text_column(session.data[column]):
+                        session.data[column] = session.data[column].astype(str).str.strip()
                         operations_performed.append(f'{column}: Trimmed whitespace')
                 
                 elif standardization_type == 'remove_special_chars':
-                    if current_data[column].dtype == 'object':
+                    if is_text_column(session.data[column]):
                         import re
-                        current_data[column] = current_data[column].astype(str).apply(
+                        session.data[column] = session.data[column].astype(str).apply(
                             lambda x: re.sub(r'[^\w\s]', '', x) if pd.notna(x) else x
                         )
                         operations_performed.append(f'{column}: Removed special characters')
                 
                 elif standardization_type == 'normalize_spaces':
-                    if current_data[column].dtype == 'object':
+                    if is_text_column(session.data[column]):
                         import re
-                        current_data[column] = current_data[column].astype(str).apply(
+                        session.data[column] = session.data[column].astype(str).apply(
                             lambda x: re.sub(r'\s+', ' ', x).strip() if pd.notna(x) else x
                         )
                         operations_performed.append(f'{column}: Normalized spaces')
                 
                 elif standardization_type == 'z_score':
-                    if pd.api.types.is_numeric_dtype(current_data[column]):
+                    if pd.api.types.is_numeric_dtype(session.data[column]):
                         from scipy import stats
-                        current_data[column] = stats.zscore(current_data[column], nan_policy='omit')
+                        session.data[column] = stats.zscore(session.data[column].astype('float64'), nan_policy='omit')
                         operations_performed.append(f'{column}: Applied Z-score standardization')
                 
                 elif standardization_type == 'min_max':
-                    if pd.api.types.is_numeric_dtype(current_data[column]):
-                        min_val = current_data[column].min()
-                        max_val = current_data[column].max()
+                    if pd.api.types.is_numeric_dtype(session.data[column]):
+                        min_val = session.data[column].min()
+                        max_val = session.data[column].max()
                         if max_val != min_val:
-                            current_data[column] = (current_data[column] - min_val) / (max_val - min_val)
+                            session.data[column] = (session.data[column] - min_val) / (max_val - min_val)
                             operations_performed.append(f'{column}: Applied Min-Max scaling')
         
-        # Invalidate preview cache since data may have changed
-        invalidate_preview_cache()
+        # Invalidate preview cache since data may have changed (renamed columns under both names)
+        invalidate_preview_cache(list(column_mapping.keys()) + list(column_mapping.values()) + list(data_standardization.keys()))
         
         # Track the operation
         track_operation('column_standardization',
@@ -1772,7 +4790,7 @@ def standardize_columns():
             'data_standardization': data_standardization if data_standardization else {},
             'operations_performed': operations_performed,
             'total_operations': len(operations_performed),
-            'total_columns': len(current_data.columns)
+            'total_columns': len(session.data.columns)
         })
         
         return jsonify({
@@ -1780,27 +4798,34 @@ def standardize_columns():
             'operations_performed': operations_performed,
             'renamed_columns': column_mapping if column_mapping else {},
             'data_standardization': data_standardization if data_standardization else {},
-            'shape': list(current_data.shape),
-            'columns': current_data.columns.tolist(),
-            'filename': current_filename
+            'shape': list(session.data.shape),
+            'columns': session.data.columns.tolist(),
+            'filename': session.filename
         }), 200
         
     except Exception as e:
         return jsonify({'error': f'Error standardizing columns: {str(e)}'}), 400
 
 @app.route('/api/check-duplicates', methods=['POST'])
+@cached_result
 def check_duplicates():
-    global current_data
+    session = get_session()
     
-    if current_data is None:
+    if session.out_of_core is not None:
+        try:
+            return jsonify(check_duplicates_out_of_core(session.out_of_core)), 200
+        except Exception as e:
+            return jsonify({'error': f'Error checking duplicates: {str(e)}'}), 400
+    
+    if session.data is None:
         return jsonify({'error': 'No data uploaded'}), 400
     
     try:
         # Count total rows
-        total_rows = len(current_data)
+        total_rows = len(session.data)
         
         # Count unique rows
-        unique_count = len(current_data.drop_duplicates())
+        unique_count = len(session.data.drop_duplicates())
         
         # Count duplicate rows
         duplicate_count = total_rows - unique_count
@@ -1812,8 +4837,8 @@ def check_duplicates():
         duplicate_examples = []
         if duplicate_count > 0:
             # Get duplicate rows with their indices
-            duplicated_mask = current_data.duplicated(keep=False)
-            duplicate_rows = current_data[duplicated_mask]
+            duplicated_mask = session.data.duplicated(keep=False)
+            duplicate_rows = session.data[duplicated_mask]
             
             # Group by actual values to find duplicate groups
             if len(duplicate_rows) > 0:
@@ -1843,9 +4868,9 @@ def check_duplicates():
 
 @app.route('/api/remove-duplicates', methods=['POST'])
 def remove_duplicates():
-    global current_data
+    session = get_session()
     
-    if current_data is None:
+    if session.data is None:
         return jsonify({'error': 'No data uploaded'}), 400
     
     try:
@@ -1853,23 +4878,23 @@ def remove_duplicates():
         keep = data.get('keep', 'first')  # 'first' or 'last'
         
         # Store original shape
-        original_shape = current_data.shape
+        original_shape = session.data.shape
         
         # Remove duplicates
-        current_data = current_data.drop_duplicates(keep=keep)
+        session.data = session.data.drop_duplicates(keep=keep)
         
         # Invalidate preview cache since rows were removed
         invalidate_preview_cache()
         
         # Calculate removed count
-        removed_count = int(original_shape[0] - current_data.shape[0])
+        removed_count = int(original_shape[0] - session.data.shape[0])
         
         # Track the operation
         track_operation('duplicate_removal',
                        f'Successfully removed {removed_count} duplicate rows',
                        {
             'original_shape': list(original_shape),
-            'new_shape': list(current_data.shape),
+            'new_shape': list(session.data.shape),
             'rows_removed': removed_count,
             'keep_strategy': keep,
             'removal_percentage': (removed_count / original_shape[0] * 100) if original_shape[0] > 0 else 0
@@ -1878,29 +4903,30 @@ def remove_duplicates():
         return jsonify({
             'message': f'Successfully removed {removed_count} duplicate rows',
             'original_shape': list(original_shape),
-            'new_shape': list(current_data.shape),
+            'new_shape': list(session.data.shape),
             'rows_removed': removed_count,
             'keep_strategy': keep,
-            'shape': list(current_data.shape),
-            'columns': current_data.columns.tolist(),
-            'filename': current_filename
+            'shape': list(session.data.shape),
+            'columns': session.data.columns.tolist(),
+            'filename': session.filename
         }), 200
         
     except Exception as e:
         return jsonify({'error': f'Error removing duplicates: {str(e)}'}), 400
 
 @app.route('/api/analyze-skewness', methods=['POST'])
+@cached_result
 def analyze_skewness():
-    global current_data
+    session = get_session()
     
-    if current_data is None:
+    if session.data is None:
         return jsonify({'error': 'No data uploaded'}), 400
     
     try:
         from scipy import stats
         
         # Get numeric columns only
-        numeric_columns = current_data.select_dtypes(include=[np.number]).columns.tolist()
+        numeric_columns = session.data.select_dtypes(include=[np.number]).columns.tolist()
         
         if len(numeric_columns) == 0:
             return jsonify({
@@ -1916,7 +4942,7 @@ def analyze_skewness():
         
         for col in numeric_columns:
             # Remove NaN values for analysis
-            col_data = current_data[col].dropna()
+            col_data = session.data[col].dropna().astype('float64')
             
             if len(col_data) < 3:  # Need at least 3 values for skewness
                 continue
@@ -2006,9 +5032,9 @@ def analyze_skewness():
 
 @app.route('/api/apply-transformations', methods=['POST'])
 def apply_transformations():
-    global current_data
+    session = get_session()
     
-    if current_data is None:
+    if session.data is None:
         return jsonify({'error': 'No data uploaded'}), 400
     
     try:
@@ -2024,13 +5050,13 @@ def apply_transformations():
         applied_transformations = []
         
         for column, transformation in transformations.items():
-            if column not in current_data.columns:
+            if column not in session.data.columns:
                 continue
                 
-            if not pd.api.types.is_numeric_dtype(current_data[column]):
+            if not pd.api.types.is_numeric_dtype(session.data[column]):
                 continue
             
-            col_data = current_data[column].copy()
+            col_data = session.data[column].astype('float64')
             original_skewness = stats.skew(col_data.dropna())
             
             try:
@@ -2039,28 +5065,29 @@ def apply_transformations():
                     min_val = col_data.min()
                     if min_val <= 0:
                         # Shift data to make all values positive
-                        current_data[column] = np.log1p(col_data - min_val + 1)
+                        session.data[column] = np.log1p(col_data - min_val + 1)
                     else:
-                        current_data[column] = np.log(col_data)
+                        session.data[column] = np.log(col_data)
                     
                 elif transformation == 'sqrt':
                     # Handle negative values
                     min_val = col_data.min()
                     if min_val < 0:
                         # Shift data to make all values non-negative
-                        current_data[column] = np.sqrt(col_data - min_val)
+                        session.data[column] = np.sqrt(col_data - min_val)
                     else:
-                        current_data[column] = np.sqrt(col_data)
+                        session.data[column] = np.sqrt(col_data)
                     
                 elif transformation == 'reciprocal':
                     # Handle zero values
                     col_data_safe = col_data.replace(0, np.nan)
-                    current_data[column] = 1 / col_data_safe
+                    session.data[column] = 1 / col_data_safe
                     
                 elif transformation == 'square':
-                    current_data[column] = col_data ** 2
+                    session.data[column] = col_data ** 2
                     
                 elif transformation == 'boxcox':
+                    session.data[column] = col_data
                     # Box-Cox requires positive data
                     if col_data.min() <= 0:
                         # Shift data to make it positive
@@ -2069,20 +5096,21 @@ def apply_transformations():
                         transformed, lambda_param = boxcox(col_data_shifted.dropna())
                         # Apply transformation to all data (including NaN)
                         mask = ~col_data.isna()
-                        current_data.loc[mask, column] = boxcox(col_data_shifted[mask], lmbda=lambda_param)
+                        session.data.loc[mask, column] = boxcox(col_data_shifted[mask], lmbda=lambda_param)
                     else:
                         transformed, lambda_param = boxcox(col_data.dropna())
                         mask = ~col_data.isna()
-                        current_data.loc[mask, column] = boxcox(col_data[mask], lmbda=lambda_param)
+                        session.data.loc[mask, column] = boxcox(col_data[mask], lmbda=lambda_param)
                         
                 elif transformation == 'yeojohnson':
+                    session.data[column] = col_data
                     # Yeo-Johnson can handle negative values and zeros
                     transformed, lambda_param = yeojohnson(col_data.dropna())
                     mask = ~col_data.isna()
-                    current_data.loc[mask, column] = yeojohnson(col_data[mask], lmbda=lambda_param)
+                    session.data.loc[mask, column] = yeojohnson(col_data[mask], lmbda=lambda_param)
                 
                 # Calculate new skewness
-                new_skewness = stats.skew(current_data[column].dropna())
+                new_skewness = stats.skew(session.data[column].dropna())
                 
                 applied_transformations.append({
                     'column': column,
@@ -2100,7 +5128,7 @@ def apply_transformations():
                 })
         
         # Invalidate preview cache since data values changed
-        invalidate_preview_cache()
+        invalidate_preview_cache(list(transformations.keys()))
         
         # Track the operation
         successful_transformations = [t for t in applied_transformations if "error" not in t]
@@ -2117,19 +5145,20 @@ def apply_transformations():
         return jsonify({
             'message': f'Applied {len([t for t in applied_transformations if "error" not in t])} transformations',
             'applied_transformations': applied_transformations,
-            'shape': list(current_data.shape),
-            'columns': current_data.columns.tolist(),
-            'filename': current_filename
+            'shape': list(session.data.shape),
+            'columns': session.data.columns.tolist(),
+            'filename': session.filename
         }), 200
         
     except Exception as e:
         return jsonify({'error': f'Error applying transformations: {str(e)}'}), 400
 
 @app.route('/api/analyze-encoding', methods=['POST'])
+@cached_result
 def analyze_encoding():
-    global current_data
+    session = get_session()
     
-    if current_data is None:
+    if session.data is None:
         return jsonify({'error': 'No data uploaded'}), 400
     
     try:
@@ -2140,23 +5169,23 @@ def analyze_encoding():
             'numeric_columns': []
         }
         
-        for column in current_data.columns:
-            col_data = current_data[column].dropna()
+        for column in session.data.columns:
+            col_data = session.data[column].dropna()
             if len(col_data) == 0:
                 continue
             
             # Check if datetime
-            if pd.api.types.is_datetime64_any_dtype(current_data[column]):
+            if pd.api.types.is_datetime64_any_dtype(session.data[column]):
                 result['datetime_columns'].append({
                     'column': column,
                     'format': 'datetime',
-                    'date_range': f"{col_data.min()} to {col_data.max()}"
+                    'date_range': f"{col_data.min().strftime('%d/%m/%Y')} to {col_data.max().strftime('%d/%m/%Y')}"
                 })
             # Check if numeric
-            elif pd.api.types.is_numeric_dtype(current_data[column]):
+            elif pd.api.types.is_numeric_dtype(session.data[column]):
                 result['numeric_columns'].append(column)
             # Check if text (long strings)
-            elif col_data.dtype == 'object':
+            elif is_text_column(col_data):
                 # Calculate average string length
                 str_lengths = col_data.astype(str).str.len()
                 avg_length = str_lengths.mean()
@@ -2171,7 +5200,7 @@ def analyze_encoding():
                     })
                 else:  # Likely categorical
                     unique_values = col_data.unique()
-                    value_counts = col_data.value_counts()
+                    value_counts = observed_value_counts(col_data)
                     
                     result['categorical_columns'].append({
                         'column': column,
@@ -2188,9 +5217,9 @@ def analyze_encoding():
 
 @app.route('/api/apply-encoding', methods=['POST'])
 def apply_encoding():
-    global current_data
+    session = get_session()
     
-    if current_data is None:
+    if session.data is None:
         return jsonify({'error': 'No data uploaded'}), 400
     
     try:
@@ -2205,15 +5234,18 @@ def apply_encoding():
             return jsonify({'error': 'No encoding operations specified'}), 400
         
         applied_operations = []
+        original_columns = set(session.data.columns)
         
         for operation in operations:
             column = operation.get('column')
             method = operation.get('method')
             
-            if column not in current_data.columns:
+            if column not in session.data.columns:
                 continue
             
-            col_data = current_data[column].copy()
+            # Encoders write new values into the column, which a categorical dtype would reject
+            expand_categorical(session.data, column)
+            col_data = session.data[column].copy()
             
             try:
                 if method == 'label':
@@ -2221,22 +5253,22 @@ def apply_encoding():
                     le = LabelEncoder()
                     # Handle NaN values
                     mask = col_data.notna()
-                    current_data.loc[mask, column] = le.fit_transform(col_data[mask])
+                    session.data.loc[mask, column] = le.fit_transform(col_data[mask])
                     applied_operations.append(f'{column}: Label encoded with {len(le.classes_)} classes')
                     
                 elif method == 'onehot':
                     # One-hot encoding
                     encoded_df = pd.get_dummies(col_data, prefix=column, dummy_na=True)
                     # Remove original column and add encoded columns
-                    current_data = current_data.drop(columns=[column])
-                    current_data = pd.concat([current_data, encoded_df], axis=1)
+                    session.data = session.data.drop(columns=[column])
+                    session.data = pd.concat([session.data, encoded_df], axis=1)
                     applied_operations.append(f'{column}: One-hot encoded into {len(encoded_df.columns)} columns')
                     
                 elif method == 'ordinal':
                     # Ordinal encoding (assumes natural order)
                     unique_vals = sorted(col_data.dropna().unique())
                     ordinal_map = {val: idx for idx, val in enumerate(unique_vals)}
-                    current_data[column] = col_data.map(ordinal_map)
+                    session.data[column] = col_data.map(ordinal_map)
                     applied_operations.append(f'{column}: Ordinal encoded with {len(unique_vals)} levels')
                     
                 elif method == 'binary':
@@ -2251,12 +5283,12 @@ def apply_encoding():
                     # Create binary columns
                     for bit in range(n_bits):
                         col_name = f'{column}_bit_{bit}'
-                        current_data[col_name] = col_data.map(val_to_int).apply(
+                        session.data[col_name] = col_data.map(val_to_int).apply(
                             lambda x: (x >> bit) & 1 if pd.notna(x) else np.nan
                         )
                     
                     # Remove original column
-                    current_data = current_data.drop(columns=[column])
+                    session.data = session.data.drop(columns=[column])
                     applied_operations.append(f'{column}: Binary encoded into {n_bits} bit columns')
                     
                 elif method == 'tfidf':
@@ -2269,11 +5301,11 @@ def apply_encoding():
                     
                     tfidf_df = pd.DataFrame(tfidf_matrix.toarray(), 
                                           columns=feature_names, 
-                                          index=current_data.index)
+                                          index=session.data.index)
                     
                     # Remove original column and add TF-IDF features
-                    current_data = current_data.drop(columns=[column])
-                    current_data = pd.concat([current_data, tfidf_df], axis=1)
+                    session.data = session.data.drop(columns=[column])
+                    session.data = pd.concat([session.data, tfidf_df], axis=1)
                     applied_operations.append(f'{column}: TF-IDF vectorized into {len(feature_names)} features')
                     
                 elif method == 'countvec':
@@ -2286,11 +5318,11 @@ def apply_encoding():
                     
                     count_df = pd.DataFrame(count_matrix.toarray(), 
                                           columns=feature_names, 
-                                          index=current_data.index)
+                                          index=session.data.index)
                     
                     # Remove original column and add count features
-                    current_data = current_data.drop(columns=[column])
-                    current_data = pd.concat([current_data, count_df], axis=1)
+                    session.data = session.data.drop(columns=[column])
+                    session.data = pd.concat([session.data, count_df], axis=1)
                     applied_operations.append(f'{column}: Count vectorized into {len(feature_names)} features')
                     
                 elif method == 'hash':
@@ -2299,34 +5331,35 @@ def apply_encoding():
                         lambda x: int(hashlib.md5(str(x).encode()).hexdigest(), 16) % 1000000 
                         if pd.notna(x) else np.nan
                     )
-                    current_data[column] = hash_values
+                    session.data[column] = hash_values
                     applied_operations.append(f'{column}: Hash encoded')
                     
                 elif method == 'datetime_features':
                     # Extract datetime features
                     dt_col = pd.to_datetime(col_data, errors='coerce')
                     
-                    current_data[f'{column}_year'] = dt_col.dt.year
-                    current_data[f'{column}_month'] = dt_col.dt.month
-                    current_data[f'{column}_day'] = dt_col.dt.day
-                    current_data[f'{column}_weekday'] = dt_col.dt.weekday
-                    current_data[f'{column}_hour'] = dt_col.dt.hour
+                    session.data[f'{column}_year'] = dt_col.dt.year
+                    session.data[f'{column}_month'] = dt_col.dt.month
+                    session.data[f'{column}_day'] = dt_col.dt.day
+                    session.data[f'{column}_weekday'] = dt_col.dt.weekday
+                    session.data[f'{column}_hour'] = dt_col.dt.hour
                     
                     # Remove original column
-                    current_data = current_data.drop(columns=[column])
+                    session.data = session.data.drop(columns=[column])
                     applied_operations.append(f'{column}: Extracted 5 datetime features')
                     
                 elif method == 'timestamp':
                     # Convert to timestamp
                     dt_col = pd.to_datetime(col_data, errors='coerce')
-                    current_data[column] = dt_col.astype('int64') // 10**9  # Unix timestamp
+                    session.data[column] = dt_col.astype('int64') // 10**9  # Unix timestamp
                     applied_operations.append(f'{column}: Converted to Unix timestamp')
                     
             except Exception as op_error:
                 applied_operations.append(f'{column} ({method}): Error - {str(op_error)}')
         
-        # Invalidate preview cache since data structure changed
-        invalidate_preview_cache()
+        # Invalidate preview cache since data structure changed (encoded, dropped and added columns)
+        changed_columns = original_columns.symmetric_difference(session.data.columns)
+        invalidate_preview_cache(list(changed_columns) + [operation.get('column') for operation in operations])
         
         # Track the operation
         successful_operations = [op for op in applied_operations if "Error" not in op]
@@ -2338,37 +5371,38 @@ def apply_encoding():
             'encoding_details': applied_operations,
             'columns_encoded': [op.get('column') for op in operations],
             'methods_used': list(set([op.get('method') for op in operations])),
-            'shape_after_encoding': list(current_data.shape)
+            'shape_after_encoding': list(session.data.shape)
         })
         
         return jsonify({
             'message': f'Applied {len([op for op in applied_operations if "Error" not in op])} encoding operations',
             'applied_operations': applied_operations,
-            'shape': list(current_data.shape),
-            'columns': current_data.columns.tolist(),
-            'filename': current_filename
+            'shape': list(session.data.shape),
+            'columns': session.data.columns.tolist(),
+            'filename': session.filename
         }), 200
         
     except Exception as e:
         return jsonify({'error': f'Error applying encoding: {str(e)}'}), 400
 
 @app.route('/api/analyze-data-integrity', methods=['POST'])
+@cached_result
 def analyze_data_integrity():
-    global current_data
+    session = get_session()
     
-    if current_data is None:
+    if session.data is None:
         return jsonify({'error': 'No data uploaded'}), 400
     
     try:
         import re
         
         issues = []
-        total_columns = len(current_data.columns)
+        total_columns = len(session.data.columns)
         columns_with_issues = 0
         total_issues = 0
         
-        for column in current_data.columns:
-            col_data = current_data[column].dropna()
+        for column in session.data.columns:
+            col_data = session.data[column].dropna()
             if len(col_data) == 0:
                 continue
             
@@ -2379,7 +5413,7 @@ def analyze_data_integrity():
             
             # Check for binary pattern violations
             if len(col_data.unique()) <= 10:  # Likely categorical
-                value_counts = col_data.value_counts()
+                value_counts = observed_value_counts(col_data)
                 
                 # Check for binary-like patterns
                 top_values = value_counts.head(2)
@@ -2419,7 +5453,7 @@ def analyze_data_integrity():
                             })
             
             # Check for case inconsistency in text data
-            if col_data.dtype == 'object':
+            if is_text_column(col_data):
                 unique_lower = set(str_data.str.lower().unique())
                 unique_original = set(str_data.unique())
                 
@@ -2453,7 +5487,7 @@ def analyze_data_integrity():
                         })
             
             # Check for whitespace issues
-            if col_data.dtype == 'object':
+            if is_text_column(col_data):
                 whitespace_issues = []
                 for val in str_data.unique():
                     if str(val) != str(val).strip():
@@ -2474,7 +5508,7 @@ def analyze_data_integrity():
                     })
             
             # Check for numeric values in text columns
-            if col_data.dtype == 'object':
+            if is_text_column(col_data):
                 numeric_in_text = []
                 for val in str_data.unique():
                     try:
@@ -2528,9 +5562,9 @@ def analyze_data_integrity():
 
 @app.route('/api/fix-data-integrity', methods=['POST'])
 def fix_data_integrity():
-    global current_data
+    session = get_session()
     
-    if current_data is None:
+    if session.data is None:
         return jsonify({'error': 'No data uploaded'}), 400
     
     try:
@@ -2539,62 +5573,73 @@ def fix_data_integrity():
         action = data.get('action')
         replacement_value = data.get('replacement_value')
         
-        if column not in current_data.columns:
+        if column not in session.data.columns:
             return jsonify({'error': f'Column {column} not found'}), 400
         
-        original_shape = current_data.shape
+        original_shape = session.data.shape
         
         if action == 'replace':
             if replacement_value is None:
                 return jsonify({'error': 'Replacement value is required'}), 400
             
             # Re-analyze the column to find problematic values
-            col_data = current_data[column].dropna()
+            col_data = session.data[column].dropna()
             str_data = col_data.astype(str)
             
             # Find problematic values (simplified logic for replacement)
-            problematic_mask = pd.Series([False] * len(current_data))
+            problematic_mask = pd.Series([False] * len(session.data))
             
             # For binary patterns, find non-binary values
             if len(col_data.unique()) > 2:
-                value_counts = col_data.value_counts()
+                value_counts = observed_value_counts(col_data)
                 top_2_values = value_counts.head(2).index.tolist()
                 
                 # Mark values not in top 2 as problematic
-                problematic_mask = ~current_data[column].isin(top_2_values + [np.nan])
+                problematic_mask = ~session.data[column].isin(top_2_values + [np.nan])
             
             # Replace problematic values
-            current_data.loc[problematic_mask, column] = replacement_value
+            ensure_fillable(session.data, column, replacement_value)
+            session.data.loc[problematic_mask, column] = replacement_value
             affected_rows = int(problematic_mask.sum())
             
             message = f'Replaced {affected_rows} problematic values in column "{column}" with "{replacement_value}"'
             
         elif action == 'remove':
             # Remove rows with problematic values
-            col_data = current_data[column].dropna()
+            col_data = session.data[column].dropna()
             
             if len(col_data.unique()) > 2:
-                value_counts = col_data.value_counts()
+                value_counts = observed_value_counts(col_data)
                 top_2_values = value_counts.head(2).index.tolist()
                 
                 # Keep only rows with top 2 values or NaN
-                keep_mask = current_data[column].isin(top_2_values) | current_data[column].isna()
-                current_data = current_data[keep_mask]
+                keep_mask = session.data[column].isin(top_2_values) | session.data[column].isna()
+                session.data = session.data[keep_mask]
             
-            affected_rows = original_shape[0] - current_data.shape[0]
+            affected_rows = original_shape[0] - session.data.shape[0]
             message = f'Removed {affected_rows} rows with problematic values in column "{column}"'
             
         else:
             return jsonify({'error': 'Invalid action. Use "replace" or "remove"'}), 400
         
+        invalidate_preview_cache([column] if action == 'replace' else None)
+        
+        track_operation('integrity_fix',
+                       message,
+                       {
+                           'column': column,
+                           'action': action,
+                           'affected_rows': int(affected_rows)
+                       })
+        
         return jsonify({
             'message': message,
             'original_shape': list(original_shape),
-            'new_shape': list(current_data.shape),
+            'new_shape': list(session.data.shape),
             'affected_rows': int(affected_rows),
-            'shape': list(current_data.shape),
-            'columns': current_data.columns.tolist(),
-            'filename': current_filename
+            'shape': list(session.data.shape),
+            'columns': session.data.columns.tolist(),
+            'filename': session.filename
         }), 200
         
     except Exception as e:
@@ -2603,11 +5648,11 @@ def fix_data_integrity():
 
 @app.route('/api/save-changes', methods=['POST'])
 def save_changes():
-    global current_data, current_filename
+    session = get_session()
     
     logger.info("=== SAVE CHANGES REQUEST RECEIVED ===")
     
-    if current_data is None:
+    if session.data is None:
         logger.error("Save changes requested but no data available")
         return jsonify({'error': 'No data to save'}), 400
     
@@ -2618,28 +5663,30 @@ def save_changes():
         
         # Use original filename if no new filename provided
         if not save_filename:
-            save_filename = current_filename or 'cleaned_data.csv'
+            save_filename = session.filename or 'cleaned_data.csv'
         
         # Ensure filename has proper extension
+        save_filename = secure_filename(save_filename) or 'cleaned_data.csv'
         if not save_filename.endswith(('.csv', '.xlsx')):
             save_filename += '.csv'
         
-        # Create cleaned data directory if it doesn't exist
-        cleaned_dir = os.path.join(UPLOAD_FOLDER, 'cleaned')
-        os.makedirs(cleaned_dir, exist_ok=True)
+        # Each session saves into its own cleaned data directory
+        cleaned_dir = session_cleaned_folder(session)
         
         # Save path
         save_path = os.path.join(cleaned_dir, save_filename)
         
         logger.info(f"Saving cleaned data to: {save_path}")
-        logger.info(f"Data shape: {current_data.shape}")
-        logger.info(f"Columns: {list(current_data.columns)}")
+        logger.info(f"Data shape: {session.data.shape}")
+        logger.info(f"Columns: {list(session.data.columns)}")
         
-        # Save the data
+        # Save the data (to a temporary name first, so a concurrent save never leaves a mixed file)
+        temp_path = os.path.join(cleaned_dir, f"{uuid.uuid4().hex}-{save_filename}")
         if save_filename.endswith('.csv'):
-            current_data.to_csv(save_path, index=False)
+            session.data.to_csv(temp_path, index=False)
         elif save_filename.endswith('.xlsx'):
-            current_data.to_excel(save_path, index=False)
+            session.data.to_excel(temp_path, index=False)
+        os.replace(temp_path, save_path)
         
         # Verify file was saved
         if os.path.exists(save_path):
@@ -2652,11 +5699,11 @@ def save_changes():
         
         # Generate summary of changes
         summary = {
-            'original_filename': current_filename,
+            'original_filename': session.filename,
             'saved_filename': save_filename,
             'saved_path': save_path,
-            'final_shape': current_data.shape,
-            'final_columns': current_data.columns.tolist(),
+            'final_shape': session.data.shape,
+            'final_columns': session.data.columns.tolist(),
             'file_size_mb': round(file_size / (1024*1024), 2),
             'timestamp': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
         }
@@ -2666,9 +5713,9 @@ def save_changes():
         return jsonify({
             'message': 'Changes saved successfully',
             'summary': summary,
-            'filename': current_filename,
-            'shape': current_data.shape,
-            'columns': current_data.columns.tolist()
+            'filename': session.filename,
+            'shape': session.data.shape,
+            'columns': session.data.columns.tolist()
         }), 200
         
     except Exception as e:
@@ -2677,56 +5724,54 @@ def save_changes():
 
 @app.route('/api/final-preview', methods=['GET'])
 def final_preview():
-    global current_data, current_filename
+    session = get_session()
     
     logger.info("Final preview requested")
     
-    if current_data is None:
+    if session.data is None:
         logger.warning("Final preview requested but no data available")
         return jsonify({'error': 'No data to preview'}), 400
     
     try:
-        # Format data for display (convert dates to DD/MM/YYYY format)
-        display_data = format_date_columns_for_display(current_data)
+        # Format data for display (convert dates to DD/MM/YYYY format) - only the ten rows shown
+        display_data = format_date_columns_for_display(session.data, slice(0, 10))
         
         # Get comprehensive dataset information
         # Handle NaN values for JSON serialization
-        preview_data = display_data.head(10).fillna('').to_dict('records')
+        orient = requested_orient()
+        preview_data = display_data.astype(object).fillna('')
         
         # Calculate statistics
-        numeric_columns = current_data.select_dtypes(include=[np.number]).columns.tolist()
-        categorical_columns = current_data.select_dtypes(include=['object']).columns.tolist()
+        numeric_columns = session.data.select_dtypes(include=[np.number]).columns.tolist()
+        categorical_columns = session.data.select_dtypes(include=['object', 'category']).columns.tolist()
         
         # Check for date columns
         date_columns = []
-        for col in current_data.columns:
-            if get_column_type(current_data[col]) == 'datetime':
+        for col in session.data.columns:
+            if get_column_type(session.data[col]) == 'datetime':
                 date_columns.append(col)
         
         # Missing values analysis
-        missing_values = {}
-        for col in current_data.columns:
-            missing_count = current_data[col].isnull().sum()
-            if missing_count > 0:
-                missing_values[col] = int(missing_count)
+        profiles = get_column_profiles(session)
+        missing_values = missing_value_counts(profiles)
         
         # Data quality metrics
-        total_cells = current_data.shape[0] * current_data.shape[1]
-        missing_cells = current_data.isnull().sum().sum()
+        total_cells = session.data.shape[0] * session.data.shape[1]
+        missing_cells = sum(profile['null_count'] for profile in profiles.values())
         completeness = ((total_cells - missing_cells) / total_cells * 100) if total_cells > 0 else 0
         
         # Memory usage
-        memory_usage = current_data.memory_usage(deep=True).sum() / (1024*1024)  # MB
+        memory_usage = session.memory_bytes() / (1024*1024)  # MB
         
         summary = {
-            'filename': current_filename,
-            'shape': current_data.shape,
-            'columns': current_data.columns.tolist(),
+            'filename': session.filename,
+            'shape': session.data.shape,
+            'columns': session.data.columns.tolist(),
             'data_types': {
                 'numeric': len(numeric_columns),
                 'categorical': len(categorical_columns),
                 'date': len(date_columns),
-                'total': len(current_data.columns)
+                'total': len(session.data.columns)
             },
             'missing_values': missing_values,
             'quality_metrics': {
@@ -2743,14 +5788,15 @@ def final_preview():
         }
         
         logger.info(f"✅ Final preview generated:")
-        logger.info(f"   - Shape: {current_data.shape}")
+        logger.info(f"   - Shape: {session.data.shape}")
         logger.info(f"   - Completeness: {completeness:.2f}%")
         logger.info(f"   - Memory usage: {memory_usage:.2f} MB")
         
-        return jsonify({
-            'preview_data': preview_data,
-            'summary': summary
-        }), 200
+        # Streamed requests get the summary followed by every row of the dataset
+        if wants_ndjson():
+            return stream_ndjson_rows(session.data, {'summary': summary}, orient=orient)
+        
+        return frame_json_response({'summary': summary}, preview_data, orient, key='preview_data')
         
     except Exception as e:
         logger.error(f"❌ Error generating final preview: {str(e)}")
@@ -2758,33 +5804,30 @@ def final_preview():
 
 @app.route('/api/generate-report', methods=['GET'])
 def generate_report():
-    global current_data, current_filename, cleaning_operations
+    session = get_session()
     
     logger.info("Cleaning report generation requested")
     
-    if current_data is None:
+    if session.data is None:
         logger.warning("Report requested but no data available")
         return jsonify({'error': 'No data to generate report for'}), 400
     
     try:
         # Calculate comprehensive statistics
-        numeric_columns = current_data.select_dtypes(include=[np.number]).columns.tolist()
-        categorical_columns = current_data.select_dtypes(include=['object']).columns.tolist()
+        numeric_columns = session.data.select_dtypes(include=[np.number]).columns.tolist()
+        categorical_columns = session.data.select_dtypes(include=['object', 'category']).columns.tolist()
         
         # Missing values analysis
-        missing_values = {}
-        for col in current_data.columns:
-            missing_count = current_data[col].isnull().sum()
-            if missing_count > 0:
-                missing_values[col] = int(missing_count)
+        profiles = get_column_profiles(session)
+        missing_values = missing_value_counts(profiles)
         
         # Data quality metrics
-        total_cells = current_data.shape[0] * current_data.shape[1]
-        missing_cells = current_data.isnull().sum().sum()
+        total_cells = session.data.shape[0] * session.data.shape[1]
+        missing_cells = sum(profile['null_count'] for profile in profiles.values())
         completeness = ((total_cells - missing_cells) / total_cells * 100) if total_cells > 0 else 0
         
         # Memory usage
-        memory_usage = current_data.memory_usage(deep=True).sum() / (1024*1024)  # MB
+        memory_usage = session.memory_bytes() / (1024*1024)  # MB
         
         # Generate insights based on data characteristics
         insights = []
@@ -2836,7 +5879,7 @@ def generate_report():
             })
         
         # Size insight
-        total_rows = current_data.shape[0]
+        total_rows = session.data.shape[0]
         if total_rows > 100000:
             insights.append({
                 'type': 'info',
@@ -2854,25 +5897,25 @@ def generate_report():
         
         # Generate summary of cleaning operations performed
         operation_summary = {
-            'total_operations': len(cleaning_operations),
+            'total_operations': len(session.operations),
             'operations_by_type': {},
-            'detailed_operations': cleaning_operations.copy()
+            'detailed_operations': session.operations.copy()
         }
         
         # Count operations by type
-        for op in cleaning_operations:
+        for op in session.operations:
             op_type = op.get('type', 'unknown')
             operation_summary['operations_by_type'][op_type] = operation_summary['operations_by_type'].get(op_type, 0) + 1
         
         report = {
             'dataset_info': {
-                'filename': current_filename,
-                'shape': current_data.shape,
-                'columns': current_data.columns.tolist(),
+                'filename': session.filename,
+                'shape': session.data.shape,
+                'columns': session.data.columns.tolist(),
                 'data_types': {
                     'numeric': len(numeric_columns),
                     'categorical': len(categorical_columns),
-                    'total': len(current_data.columns)
+                    'total': len(session.data.columns)
                 },
                 'memory_usage_mb': round(memory_usage, 2)
             },
@@ -2888,7 +5931,7 @@ def generate_report():
         }
         
         logger.info(f"✅ Cleaning report generated:")
-        logger.info(f"   - Total operations: {len(cleaning_operations)}")
+        logger.info(f"   - Total operations: {len(session.operations)}")
         logger.info(f"   - Data completeness: {completeness:.2f}%")
         logger.info(f"   - Insights generated: {len(insights)}")
         
@@ -2900,36 +5943,44 @@ def generate_report():
 
 @app.route('/api/download-csv', methods=['GET'])
 def download_csv():
-    global current_data, current_filename
+    session = get_session()
     
     logger.info("CSV download requested")
     
-    if current_data is None:
+    if session.data is None and session.out_of_core is None:
         logger.warning("Download requested but no data available")
         return jsonify({'error': 'No data to download'}), 400
     
     try:
-        # Create cleaned data directory if it doesn't exist
-        cleaned_dir = os.path.join(UPLOAD_FOLDER, 'cleaned')
-        os.makedirs(cleaned_dir, exist_ok=True)
+        # Each download is written to its own file in the session's cleaned data directory
+        cleaned_dir = session_cleaned_folder(session)
         
         # Generate filename
-        base_name = current_filename.rsplit('.', 1)[0] if current_filename else 'cleaned_data'
-        download_filename = f"{base_name}_cleaned.csv"
-        file_path = os.path.join(cleaned_dir, download_filename)
+        base_name = session.filename.rsplit('.', 1)[0] if session.filename else 'cleaned_data'
+        download_filename = secure_filename(f"{base_name}_cleaned.csv") or 'cleaned_data.csv'
+        file_path = os.path.join(cleaned_dir, f"{uuid.uuid4().hex}-{download_filename}")
         
-        # Save CSV file
-        current_data.to_csv(file_path, index=False)
+        # Save CSV file (out-of-core datasets are written one partition at a time)
+        if session.out_of_core is not None:
+            session.out_of_core.to_csv(file_path)
+        else:
+            session.data.to_csv(file_path, index=False)
         
         logger.info(f"✅ CSV file prepared for download: {file_path}")
         logger.info(f"File size: {os.path.getsize(file_path)} bytes")
         
-        # Return file for download
-        return send_from_directory(
-            cleaned_dir,
-            download_filename,
-            as_attachment=True,
-            download_name=download_filename
+        # Stream the file, removing it once the response is closed
+        file_size = os.path.getsize(file_path)
+        csv_file = open(file_path, 'rb')
+        body = ClosingIterator(FileWrapper(csv_file), [csv_file.close, lambda: discard_file(file_path)])
+        return Response(
+            body,
+            mimetype='text/csv',
+            headers={
+                'Content-Disposition': f'attachment; filename="{download_filename}"',
+                'Content-Length': str(file_size)
+            },
+            direct_passthrough=True
         )
         
     except Exception as e:
@@ -2937,8 +5988,9 @@ def download_csv():
         return jsonify({'error': f'Error preparing CSV download: {str(e)}'}), 400
 
 # Helper function to track cleaning operations
-def track_operation(operation_type, description, details=None):
-    global cleaning_operations
+def track_operation(operation_type, description, details=None, snapshot=True):
+    """Log an operation on the session's dataset; returns True when the new state was snapshotted"""
+    session = get_session()
     
     operation = {
         'type': operation_type,
@@ -2947,14 +5999,19 @@ def track_operation(operation_type, description, details=None):
         'details': details or {}
     }
     
-    cleaning_operations.append(operation)
+    session.operations.append(operation)
     logger.info(f"📝 Tracked operation: {operation_type} - {description}")
 
+    # Every tracked operation leaves a new dataset state; persist it for restarts
+    if snapshot:
+        return save_current_snapshot()
+    return False
+
 if __name__ == '__main__':
     # Setup logging for server startup
     logger.info("=== STARTING DATA CLEANING APPLICATION SERVER ===")
     logger.info(f"Upload folder: {UPLOAD_FOLDER}")
-    logger.info(f"Max file size: {app.config['MAX_CONTENT_LENGTH'] / (1024*1024)} MB")
+    logger.info(f"Max file size: {app.config['UPLOAD_MAX_CONTENT_LENGTH'] / (1024*1024)} MB")
     logger.info(f"Allowed file extensions: {ALLOWED_EXTENSIONS}")
     
     # Ensure upload directory exists
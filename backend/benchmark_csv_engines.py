@@ -0,0 +1,96 @@
+"""
+Benchmark the pyarrow CSV parse engine against the pandas C parser.
+
+Scales the sample CSV files in uploads/ up to millions of rows by repeating
+their rows, then parses each scaled file with both engines the way an upload
+does (schema sniffing, then the full parse) and checks that the frames match
+once datetime detection has run on both.
+
+Usage:
+    python benchmark_csv_engines.py --rows 1000000 3000000
+    python benchmark_csv_engines.py --files ../uploads/diabetes.csv --rows 5000000
+"""
+import argparse
+import glob
+import logging
+import os
+import tempfile
+import time
+import warnings
+
+import pandas as pd
+
+from app import (detect_datetime_columns, finish_sniffed_dates, read_uploaded_file, resolve_csv_engine,
+                 sniff_csv_schema)
+
+warnings.filterwarnings('ignore')
+logging.getLogger('app').setLevel(logging.WARNING)
+
+DEFAULT_SAMPLE_GLOB = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'uploads', '*.csv')
+
+def scale_csv(source, rows, target):
+    """Write target as source's header followed by its rows repeated up to the requested count"""
+    with open(source, 'rb') as f:
+        header = f.readline()
+        body = f.read()
+    if body and not body.endswith(b'\n'):
+        body += b'\n'
+    lines = body.count(b'\n') or 1
+    repeats, remainder = divmod(rows, lines)
+
+    with open(target, 'wb') as f:
+        f.write(header)
+        for _ in range(repeats):
+            f.write(body)
+        if remainder:
+            f.write(b''.join(body.splitlines(keepends=True)[:remainder]))
+
+def time_engine(filepath, engine):
+    """Parse a file like an upload does and return (parse seconds, type-detected frame, ingest stats)"""
+    start = time.perf_counter()
+    schema = sniff_csv_schema(filepath)
+    df, ingest_stats = read_uploaded_file(filepath, 'csv', schema=schema, engine=engine)
+    seconds = time.perf_counter() - start
+
+    # Engines may differ in which stray date values they leave for detection, not in the result
+    detect_datetime_columns(df, columns=finish_sniffed_dates(df, schema))
+    return seconds, df, ingest_stats
+
+def frames_match(left, right):
+    """Same columns, dtypes and values (floats compared with a tolerance)"""
+    try:
+        pd.testing.assert_frame_equal(left, right, check_exact=False)
+        return True
+    except AssertionError:
+        return False
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--files', nargs='+', default=None, help='sample CSV files (default: uploads/*.csv)')
+    parser.add_argument('--rows', type=int, nargs='+', default=[1000000], help='row counts to scale each file to')
+    args = parser.parse_args()
+
+    if resolve_csv_engine('pyarrow') != 'pyarrow':
+        parser.error('pyarrow is not installed')
+
+    files = args.files or sorted(glob.glob(DEFAULT_SAMPLE_GLOB))
+    print(f"{'file':<24} {'rows':>9} {'MB':>7} {'pandas (s)':>11} {'pyarrow (s)':>12} {'speedup':>8}  same frame")
+    with tempfile.TemporaryDirectory() as workdir:
+        for source in files:
+            for rows in args.rows:
+                target = os.path.join(workdir, os.path.basename(source))
+                scale_csv(source, rows, target)
+                size_mb = os.path.getsize(target) / (1024 * 1024)
+
+                pandas_seconds, pandas_frame, _ = time_engine(target, 'pandas')
+                arrow_seconds, arrow_frame, arrow_stats = time_engine(target, 'pyarrow')
+                same = frames_match(pandas_frame, arrow_frame)
+                print(f"{os.path.basename(source):<24} {rows:>9} {size_mb:>7.1f} {pandas_seconds:>11.2f} "
+                      f"{arrow_seconds:>12.2f} {pandas_seconds / arrow_seconds:>7.1f}x  {same}")
+                if 'engine_fallback' in arrow_stats:
+                    print(f"{'':<24} pyarrow fell back to pandas: {arrow_stats['engine_fallback']}")
+                del pandas_frame, arrow_frame
+                os.remove(target)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,317 @@
+"""
+Benchmark the single-pass datetime classifier against the previous detector.
+
+Builds wide synthetic DataFrames mixing date strings in several formats, Unix
+timestamps, numbers and free text, then times both detectors on identical
+copies and checks that they convert the same columns.
+
+Usage:
+    python benchmark_datetime_detection.py --rows 20000 --columns 50 200
+"""
+import argparse
+import logging
+import time
+import warnings
+
+import numpy as np
+import pandas as pd
+
+from app import detect_datetime_columns
+
+warnings.filterwarnings('ignore')
+logging.getLogger('app').setLevel(logging.WARNING)
+logger = logging.getLogger('benchmark')
+logger.setLevel(logging.WARNING)
+
+def legacy_detect_datetime_columns(df):
+    """
+    Previous datetime detection (sequential regexes and format trials), kept as the baseline
+    """
+    import re
+    
+    # Enhanced datetime patterns to match more formats
+    datetime_patterns = [
+        # ISO formats
+        r'^\d{4}-\d{1,2}-\d{1,2}$',  # YYYY-MM-DD
+        r'^\d{4}-\d{1,2}-\d{1,2}\s+\d{1,2}:\d{1,2}:\d{1,2}$',  # YYYY-MM-DD HH:MM:SS
+        r'^\d{4}-\d{1,2}-\d{1,2}T\d{1,2}:\d{1,2}:\d{1,2}$',  # YYYY-MM-DDTHH:MM:SS
+        r'^\d{4}-\d{1,2}-\d{1,2}T\d{1,2}:\d{1,2}:\d{1,2}Z$',  # ISO with Z
+        r'^\d{4}-\d{1,2}-\d{1,2}T\d{1,2}:\d{1,2}:\d{1,2}\.\d+$',  # ISO with microseconds
+        
+        # US formats
+        r'^\d{1,2}/\d{1,2}/\d{4}$',  # MM/DD/YYYY
+        r'^\d{1,2}/\d{1,2}/\d{2}$',  # MM/DD/YY
+        r'^\d{1,2}/\d{1,2}/\d{4}\s+\d{1,2}:\d{1,2}:\d{1,2}$',  # MM/DD/YYYY HH:MM:SS
+        r'^\d{1,2}/\d{1,2}/\d{4}\s+\d{1,2}:\d{1,2}$',  # MM/DD/YYYY HH:MM
+        
+        # European formats
+        r'^\d{1,2}\.\d{1,2}\.\d{4}$',  # DD.MM.YYYY
+        r'^\d{1,2}-\d{1,2}-\d{4}$',  # DD-MM-YYYY
+        r'^\d{1,2}\.\d{1,2}\.\d{4}\s+\d{1,2}:\d{1,2}:\d{1,2}$',  # DD.MM.YYYY HH:MM:SS
+        r'^\d{1,2}-\d{1,2}-\d{4}\s+\d{1,2}:\d{1,2}:\d{1,2}$',  # DD-MM-YYYY HH:MM:SS
+        
+        # Other formats
+        r'^\d{8}$',  # YYYYMMDD
+        r'^\d{4}/\d{1,2}/\d{1,2}$',  # YYYY/MM/DD
+        r'^\d{4}/\d{1,2}/\d{1,2}\s+\d{1,2}:\d{1,2}:\d{1,2}$',  # YYYY/MM/DD HH:MM:SS
+        
+        # Month names (English)
+        r'^[A-Za-z]{3,9}\s+\d{1,2},?\s+\d{4}$',  # Month DD, YYYY
+        r'^\d{1,2}\s+[A-Za-z]{3,9}\s+\d{4}$',  # DD Month YYYY
+        r'^[A-Za-z]{3,9}\s+\d{4}$',  # Month YYYY
+        
+        # Timestamps (Unix)
+        r'^\d{10}$',  # Unix timestamp (10 digits)
+        r'^\d{13}$',  # Unix timestamp milliseconds (13 digits)
+        r'^\d{10}\.\d+$',  # Unix timestamp with decimal
+        
+        # Compact formats
+        r'^\d{6}$',  # YYMMDD or DDMMYY
+        
+        # Excel serial numbers (potential dates)
+        r'^[1-9]\d{4,5}$',  # 5-6 digit numbers (Excel date serials)
+        
+        # Time only formats (for potential time series)
+        r'^\d{1,2}:\d{1,2}:\d{1,2}$',  # HH:MM:SS
+        r'^\d{1,2}:\d{1,2}$',  # HH:MM
+        
+        # 12-hour format with AM/PM
+        r'^\d{1,2}/\d{1,2}/\d{4}\s+\d{1,2}:\d{1,2}:\d{1,2}\s+[AaPp][Mm]$',
+        r'^\d{1,2}-\d{1,2}-\d{4}\s+\d{1,2}:\d{1,2}:\d{1,2}\s+[AaPp][Mm]$',
+        r'^\d{1,2}/\d{1,2}/\d{4}\s+\d{1,2}:\d{1,2}\s+[AaPp][Mm]$',
+        r'^\d{1,2}-\d{1,2}-\d{4}\s+\d{1,2}:\d{1,2}\s+[AaPp][Mm]$',
+    ]
+    
+    # Expanded datetime format strings
+    datetime_formats = [
+        # Basic date formats
+        '%Y-%m-%d', '%m/%d/%Y', '%d/%m/%Y', '%Y/%m/%d', 
+        '%m-%d-%Y', '%d-%m-%Y', '%d.%m.%Y', '%Y.%m.%d', '%m.%d.%Y',
+        
+        # Short year formats
+        '%y-%m-%d', '%m/%d/%y', '%d/%m/%y', '%y/%m/%d',
+        '%m-%d-%y', '%d-%m-%y', '%d.%m.%y', '%y.%m.%d', '%m.%d.%y',
+        
+        # With full time
+        '%Y-%m-%d %H:%M:%S', '%m/%d/%Y %H:%M:%S', '%d/%m/%Y %H:%M:%S',
+        '%Y/%m/%d %H:%M:%S', '%m-%d-%Y %H:%M:%S', '%d-%m-%Y %H:%M:%S',
+        '%d.%m.%Y %H:%M:%S', '%Y.%m.%d %H:%M:%S', '%m.%d.%Y %H:%M:%S',
+        
+        # With hours and minutes only
+        '%Y-%m-%d %H:%M', '%m/%d/%Y %H:%M', '%d/%m/%Y %H:%M',
+        '%Y/%m/%d %H:%M', '%m-%d-%Y %H:%M', '%d-%m-%Y %H:%M',
+        '%d.%m.%Y %H:%M', '%Y.%m.%d %H:%M', '%m.%d.%Y %H:%M',
+        
+        # Month names (full and abbreviated)
+        '%B %d, %Y', '%b %d, %Y', '%d %B %Y', '%d %b %Y',
+        '%B %d %Y', '%b %d %Y', '%B %Y', '%b %Y',
+        '%B %d, %Y %H:%M:%S', '%b %d, %Y %H:%M:%S',
+        '%d %B %Y %H:%M:%S', '%d %b %Y %H:%M:%S',
+        
+        # Compact formats
+        '%Y%m%d', '%d%m%Y', '%m%d%Y', '%y%m%d', '%d%m%y', '%m%d%y',
+        '%Y%m%d%H%M%S', '%y%m%d%H%M%S',
+        
+        # ISO formats
+        '%Y-%m-%dT%H:%M:%S', '%Y-%m-%dT%H:%M:%SZ',
+        '%Y-%m-%dT%H:%M:%S.%f', '%Y-%m-%dT%H:%M:%S.%fZ',
+        
+        # 12-hour formats with AM/PM
+        '%m/%d/%Y %I:%M:%S %p', '%d/%m/%Y %I:%M:%S %p',
+        '%Y-%m-%d %I:%M:%S %p', '%m-%d-%Y %I:%M:%S %p',
+        '%d-%m-%Y %I:%M:%S %p', '%Y/%m/%d %I:%M:%S %p',
+        '%m/%d/%Y %I:%M %p', '%d/%m/%Y %I:%M %p',
+        '%Y-%m-%d %I:%M %p', '%m-%d-%Y %I:%M %p',
+        '%d-%m-%Y %I:%M %p', '%Y/%m/%d %I:%M %p',
+        
+        # Time only
+        '%H:%M:%S', '%H:%M', '%I:%M:%S %p', '%I:%M %p',
+    ]
+    
+    converted_columns = []
+    
+    for column in df.columns:
+        # Skip if already datetime
+        if pd.api.types.is_datetime64_any_dtype(df[column]):
+            logger.info(f"Column '{column}' is already datetime")
+            continue
+            
+        # Only check object/string columns and numeric columns (for timestamps)
+        if df[column].dtype not in ['object', 'int64', 'float64']:
+            continue
+            
+        # Get a sample of non-null values
+        sample = df[column].dropna()
+        if len(sample) == 0:
+            continue
+            
+        # Convert to string for pattern matching
+        sample_str = sample.astype(str).head(100)
+        
+        # Special handling for potential Unix timestamps (numeric columns)
+        if df[column].dtype in ['int64', 'float64']:
+            try:
+                # Check if values are in Unix timestamp range
+                sample_numeric = sample.head(50)
+                timestamp_candidates = 0
+                
+                for val in sample_numeric:
+                    # Unix timestamp range check (1970-2050)
+                    if 946684800 <= val <= 2524608000:  # seconds range
+                        timestamp_candidates += 1
+                    elif 946684800000 <= val <= 2524608000000:  # milliseconds range
+                        timestamp_candidates += 1
+                
+                if timestamp_candidates / len(sample_numeric) >= 0.75:
+                    # Try to convert as Unix timestamp
+                    test_val = float(sample_numeric.iloc[0])
+                    if test_val > 1e10:  # Likely milliseconds
+                        converted = pd.to_datetime(df[column], unit='ms', errors='coerce')
+                    else:  # Likely seconds
+                        converted = pd.to_datetime(df[column], unit='s', errors='coerce')
+                    
+                    success_rate = converted.notna().sum() / df[column].notna().sum()
+                    if success_rate >= 0.75:
+                        # Convert to date-only format (remove time component)
+                        df[column] = converted.dt.date
+                        converted_columns.append(column)
+                        logger.info(f"✅ Converted '{column}' from Unix timestamp to date-only format ({success_rate:.2%} success)")
+                        continue
+            except Exception as e:
+                logger.debug(f"Unix timestamp check failed for '{column}': {e}")
+        
+        # Check if string values match datetime patterns
+        datetime_likelihood = 0
+        matching_pattern = None
+        
+        for pattern in datetime_patterns:
+            matches = sample_str.str.match(pattern, na=False).sum()
+            if matches > 0:
+                likelihood = matches / len(sample_str)
+                if likelihood > datetime_likelihood:
+                    datetime_likelihood = likelihood
+                    matching_pattern = pattern
+        
+        # If at least 75% of values look like dates, try to convert
+        if datetime_likelihood >= 0.75:
+            logger.info(f"Column '{column}' has {datetime_likelihood:.2%} datetime-like values (pattern: {matching_pattern})")
+            
+            # Try pandas automatic parsing first
+            try:
+                converted = pd.to_datetime(df[column], errors='coerce', infer_datetime_format=True)
+                success_rate = converted.notna().sum() / df[column].notna().sum()
+                if success_rate >= 0.75:
+                    # Convert to date-only format (remove time component)
+                    df[column] = converted.dt.date
+                    converted_columns.append(column)
+                    logger.info(f"✅ Converted '{column}' to date-only format using automatic parsing ({success_rate:.2%} success)")
+                    continue
+            except Exception as e:
+                logger.debug(f"Auto parsing failed for '{column}': {e}")
+            
+            # Try specific formats
+            best_format = None
+            best_success_rate = 0
+            
+            for fmt in datetime_formats:
+                try:
+                    # Test on a subset first for efficiency
+                    test_sample = sample.head(20)
+                    test_converted = pd.to_datetime(test_sample, format=fmt, errors='coerce')
+                    test_success_rate = test_converted.notna().sum() / len(test_sample)
+                    
+                    if test_success_rate >= 0.75:  # If test is promising, try full column
+                        converted = pd.to_datetime(df[column], format=fmt, errors='coerce')
+                        success_rate = converted.notna().sum() / df[column].notna().sum()
+                        if success_rate > best_success_rate:
+                            best_success_rate = success_rate
+                            best_format = fmt
+                except Exception as e:
+                    continue
+            
+            # Apply the best format if success rate is good enough
+            if best_format and best_success_rate >= 0.75:
+                try:
+                    converted = pd.to_datetime(df[column], format=best_format, errors='coerce')
+                    # Convert to date-only format (remove time component)
+                    df[column] = converted.dt.date
+                    converted_columns.append(column)
+                    logger.info(f"✅ Converted '{column}' to date-only format using format {best_format} ({best_success_rate:.2%} success)")
+                except Exception as e:
+                    logger.warning(f"Failed to convert '{column}' despite good format match: {e}")
+            else:
+                logger.info(f"❌ Could not convert '{column}' - best success rate was {best_success_rate:.2%}")
+    
+    if converted_columns:
+        logger.info(f"🎉 Successfully converted {len(converted_columns)} columns to datetime: {converted_columns}")
+    else:
+        logger.info("ℹ️ No datetime columns detected or converted")
+    
+    return converted_columns
+
+
+def make_column(kind, rows, rng):
+    """Generate one synthetic column of the given kind"""
+    dates = pd.Timestamp('2015-01-01') + pd.to_timedelta(rng.integers(0, 3000, rows), unit='D')
+    if kind == 'iso_date':
+        return pd.Series(dates.strftime('%Y-%m-%d'))
+    if kind == 'us_date':
+        return pd.Series(dates.strftime('%m/%d/%Y'))
+    if kind == 'eu_slash_date':
+        return pd.Series(dates.strftime('%d/%m/%Y'))
+    if kind == 'eu_date':
+        return pd.Series(dates.strftime('%d.%m.%Y'))
+    if kind == 'month_name':
+        return pd.Series(dates.strftime('%b %d, %Y'))
+    if kind == 'iso_datetime':
+        times = dates + pd.to_timedelta(rng.integers(0, 86400, rows), unit='s')
+        return pd.Series(times.strftime('%Y-%m-%d %H:%M:%S'))
+    if kind == 'unix_seconds':
+        return pd.Series(rng.integers(1_000_000_000, 1_700_000_000, rows))
+    if kind == 'integer':
+        return pd.Series(rng.integers(0, 1000, rows))
+    if kind == 'float':
+        return pd.Series(rng.normal(100, 15, rows))
+    if kind == 'category':
+        return pd.Series(rng.choice(['north', 'south', 'east', 'west'], rows))
+    return pd.Series([f'item-{value}' for value in rng.integers(0, 100000, rows)])
+
+COLUMN_KINDS = ['iso_date', 'us_date', 'eu_slash_date', 'eu_date', 'month_name', 'iso_datetime',
+                'unix_seconds', 'integer', 'float', 'category', 'text']
+
+def make_frame(rows, columns, seed=42):
+    """Build a wide frame cycling through all column kinds"""
+    rng = np.random.default_rng(seed)
+    data = {}
+    for index in range(columns):
+        kind = COLUMN_KINDS[index % len(COLUMN_KINDS)]
+        data[f'{kind}_{index}'] = make_column(kind, rows, rng)
+    return pd.DataFrame(data)
+
+def time_detector(detector, frame):
+    """Run a detector on a copy of the frame and return (seconds, converted columns)"""
+    working = frame.copy()
+    start = time.perf_counter()
+    converted = detector(working)
+    return time.perf_counter() - start, converted
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=20000, help='rows per synthetic frame')
+    parser.add_argument('--columns', type=int, nargs='+', default=[50, 200], help='frame widths to benchmark')
+    args = parser.parse_args()
+
+    print(f"{'columns':>8} {'rows':>8} {'legacy (s)':>11} {'classifier (s)':>15} {'speedup':>8}  same columns")
+    for width in args.columns:
+        frame = make_frame(args.rows, width)
+        legacy_seconds, legacy_columns = time_detector(legacy_detect_datetime_columns, frame)
+        new_seconds, new_columns = time_detector(detect_datetime_columns, frame)
+        same = sorted(legacy_columns) == sorted(new_columns)
+        print(f"{width:>8} {args.rows:>8} {legacy_seconds:>11.2f} {new_seconds:>15.2f} "
+              f"{legacy_seconds / new_seconds:>7.1f}x  {same}")
+        if not same:
+            print(f"         legacy only: {sorted(set(legacy_columns) - set(new_columns))}")
+            print(f"         classifier only: {sorted(set(new_columns) - set(legacy_columns))}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,64 @@
+import io
+import os
+import sys
+import uuid
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture(scope='session')
+def app_module(tmp_path_factory):
+    """The backend module, imported from a scratch directory so app.log lands there"""
+    cwd = os.getcwd()
+    os.chdir(tmp_path_factory.mktemp('datawash'))
+    try:
+        import app
+    finally:
+        os.chdir(cwd)
+    return app
+
+
+@pytest.fixture
+def backend(app_module, tmp_path, monkeypatch):
+    """The backend module with uploads/ and snapshots under a fresh working directory"""
+    monkeypatch.chdir(tmp_path)
+    return app_module
+
+
+@pytest.fixture
+def client(backend):
+    return backend.app.test_client()
+
+
+@pytest.fixture
+def new_headers():
+    """Request headers for a session no other test uses"""
+    return lambda: {'X-Session-Id': f'test-{uuid.uuid4().hex[:12]}'}
+
+
+@pytest.fixture
+def headers(new_headers):
+    return new_headers()
+
+
+@pytest.fixture
+def upload(client):
+    """Upload bytes as a file for a session and return the response"""
+    def upload(headers, content, filename='data.csv', **form):
+        form['file'] = (io.BytesIO(content), filename)
+        return client.post('/api/upload', data=form, headers=headers, content_type='multipart/form-data')
+    return upload
+
+
+@pytest.fixture
+def loaded_session(upload, new_headers):
+    """Upload a DataFrame (or raw bytes) for a fresh session and return its headers"""
+    def load(data, filename='data.csv', **form):
+        content = data if isinstance(data, bytes) else data.to_csv(index=False).encode()
+        headers = new_headers()
+        response = upload(headers, content, filename=filename, **form)
+        assert response.status_code == 200, response.get_data(as_text=True)
+        return headers
+    return load
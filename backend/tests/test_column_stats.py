@@ -0,0 +1,114 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+
+@pytest.fixture(params=['true', 'false'], ids=['compact', 'plain'])
+def loaded(request, loaded_session):
+    rng = np.random.default_rng(7)
+    frame = pd.DataFrame({name: rng.normal(size=300).round(4) for name in ('a', 'b', 'c', 'd')})
+    frame.loc[::10, 'a'] = np.nan
+    frame.loc[5, 'b'] = 50.0
+    frame['label'] = rng.choice(['x', 'y'], size=300)
+    return loaded_session(frame, compact=request.param)
+
+
+def session_for(backend, headers):
+    return backend.session_store.get(headers['X-Session-Id'])
+
+
+def analyse(client, headers):
+    """Responses of the endpoints built from per-column statistics"""
+    return {
+        'info': client.get('/api/info', headers=headers).json,
+        'correlation': client.get('/api/correlation', headers=headers).status_code,
+        'outliers': client.post('/api/detect-outliers', json={}, headers=headers).json,
+    }
+
+
+def recomputed(backend, client, headers):
+    """The same responses with every cached statistic thrown away"""
+    session = session_for(backend, headers)
+    session.column_stats = {}
+    session.correlation_matrix = None
+    backend.result_cache.invalidate(session.session_id)
+    return analyse(client, headers)
+
+
+def assert_correlation_is_current(backend, headers):
+    """The session's cached correlation matrix equals a fresh one over the same columns"""
+    session = session_for(backend, headers)
+    matrix = session.correlation_matrix
+    expected = session.data[list(matrix.columns)].corr()
+    pd.testing.assert_frame_equal(matrix, expected)
+
+
+def cached_columns(session, kind):
+    return {column for stat_kind, column in session.column_stats if stat_kind == kind}
+
+
+def test_column_edit_keeps_other_columns_statistics(backend, client, loaded):
+    analyse(client, loaded)
+    session = session_for(backend, loaded)
+    assert cached_columns(session, 'profile') == {'a', 'b', 'c', 'd', 'label'}
+    assert cached_columns(session, 'outliers') == {'a', 'b', 'c', 'd'}
+
+    response = client.post('/api/impute-missing', json={'rules': [{'column': 'a', 'method': 'median'}]}, headers=loaded)
+    assert response.status_code == 200
+
+    assert cached_columns(session, 'profile') == {'b', 'c', 'd', 'label'}
+    assert cached_columns(session, 'outliers') == {'b', 'c', 'd'}
+    assert list(session.correlation_matrix.columns) == ['b', 'c', 'd']
+
+
+def test_statistics_after_column_edit_match_a_full_recompute(backend, client, loaded):
+    analyse(client, loaded)
+    client.post('/api/remove-outliers', json={'rules': [{'column': 'b', 'method': 'iqr', 'action': 'cap'}]},
+                headers=loaded)
+
+    incremental = analyse(client, loaded)
+    assert list(session_for(backend, loaded).correlation_matrix.columns) == ['a', 'b', 'c', 'd']
+    assert_correlation_is_current(backend, loaded)
+    assert incremental == recomputed(backend, client, loaded)
+
+
+def test_row_removal_drops_every_statistic(backend, client, loaded):
+    analyse(client, loaded)
+    session = session_for(backend, loaded)
+
+    response = client.post('/api/remove-outliers', json={'rules': [{'column': 'b', 'method': 'iqr', 'action': 'remove'}]},
+                           headers=loaded)
+    assert response.status_code == 200
+    assert session.column_stats == {}
+    assert session.correlation_matrix is None
+
+    after = analyse(client, loaded)
+    assert after['info']['shape'][0] < 300
+    assert_correlation_is_current(backend, loaded)
+    assert after == recomputed(backend, client, loaded)
+
+
+def test_renamed_columns_are_not_served_stale_statistics(backend, client, loaded):
+    analyse(client, loaded)
+    response = client.post('/api/standardize-columns', json={'column_mapping': {'a': 'c', 'c': 'a'}}, headers=loaded)
+    assert response.status_code == 200
+
+    renamed = analyse(client, loaded)
+    assert_correlation_is_current(backend, loaded)
+    assert renamed == recomputed(backend, client, loaded)
+
+
+def test_removed_categories_are_not_reported(backend, client, loaded_session):
+    rng = np.random.default_rng(3)
+    frame = pd.DataFrame({'value': rng.normal(size=200).round(3), 'label': rng.choice(['x', 'y'], size=200)})
+    frame.loc[17, ['value', 'label']] = [1000.0, 'Z']
+    headers = loaded_session(frame)
+    assert isinstance(session_for(backend, headers).data['label'].dtype, pd.CategoricalDtype)
+
+    rules = [{'column': 'value', 'method': 'iqr', 'action': 'remove'}]
+    assert client.post('/api/remove-outliers', json={'rules': rules}, headers=headers).status_code == 200
+
+    analysis = client.post('/api/column-analysis', json={'column': 'label'}, headers=headers).json
+    assert {entry['value'] for entry in analysis['top_frequent_values']} == {'x', 'y'}
+    assert all(entry['count'] > 0 for entry in analysis['top_frequent_values'])
+    assert backend.profile_column(session_for(backend, headers).data['label'])['unique_count'] == 2
@@ -0,0 +1,111 @@
+import json
+
+import pandas as pd
+
+import pytest
+
+ROWS = 25
+
+
+@pytest.fixture(params=['true', 'false'], ids=['compact', 'plain'])
+def loaded(request, loaded_session):
+    """A session holding ids 1..25 with scores (every fifth missing) and three names"""
+    lines = ['id,score,name']
+    for i in range(1, ROWS + 1):
+        score = '' if i % 5 == 0 else str(i * 10 % 7)
+        lines.append(f"{i},{score},{['alpha', 'beta', 'gamma'][i % 3]}")
+    return loaded_session(('\n'.join(lines) + '\n').encode(), compact=request.param)
+
+
+def get_data(client, headers, **params):
+    if 'filters' in params:
+        params['filters'] = json.dumps(params['filters'])
+    return client.get('/api/data', query_string=params, headers=headers)
+
+
+def ids(response):
+    return [row['id'] for row in response.json['data']]
+
+
+def test_pages_with_offset_and_limit(client, loaded):
+    response = get_data(client, loaded, offset=10, limit=5)
+
+    assert response.status_code == 200
+    assert ids(response) == [11, 12, 13, 14, 15]
+    assert response.json['total_rows'] == ROWS
+    assert response.json['filtered_rows'] == ROWS
+    assert response.json['columns'] == ['id', 'score', 'name']
+
+
+def test_offset_past_the_end_returns_no_rows(client, loaded):
+    response = get_data(client, loaded, offset=ROWS + 5, limit=5)
+
+    assert response.status_code == 200
+    assert ids(response) == []
+
+
+def test_limit_is_capped(backend, client, loaded, monkeypatch):
+    monkeypatch.setitem(backend.app.config, 'DATA_PAGE_MAX_ROWS', 4)
+
+    assert len(ids(get_data(client, loaded, limit=1000))) == 4
+
+
+def test_sort_descending(client, loaded):
+    response = get_data(client, loaded, sort='id', order='desc', limit=3)
+
+    assert ids(response) == [25, 24, 23]
+
+
+def test_sort_by_text_column(client, loaded):
+    names = [row['name'] for row in get_data(client, loaded, sort='name', limit=ROWS).json['data']]
+
+    assert names == sorted(names)
+
+
+def test_filters_combine_with_sort_and_paging(client, loaded):
+    filters = [{'column': 'name', 'op': 'eq', 'value': 'beta'}, {'column': 'id', 'op': 'gt', 'value': 5}]
+    response = get_data(client, loaded, filters=filters, sort='id', order='desc', limit=2, offset=1)
+
+    beta_ids = [i for i in range(6, ROWS + 1) if i % 3 == 1]
+    assert response.json['filtered_rows'] == len(beta_ids)
+    assert ids(response) == sorted(beta_ids, reverse=True)[1:3]
+
+
+def test_contains_and_null_filters(client, loaded):
+    contains = get_data(client, loaded, filters=[{'column': 'name', 'op': 'contains', 'value': 'mm'}], limit=ROWS)
+    missing = get_data(client, loaded, filters=[{'column': 'score', 'op': 'isnull'}], limit=ROWS)
+
+    assert ids(contains) == [i for i in range(1, ROWS + 1) if i % 3 == 2]
+    assert ids(missing) == [5, 10, 15, 20, 25]
+    assert all(row['score'] is None for row in missing.json['data'])
+
+
+def test_unknown_column_is_rejected(client, loaded):
+    assert get_data(client, loaded, sort='nope').status_code == 400
+    assert get_data(client, loaded, filters=[{'column': 'nope', 'op': 'eq', 'value': 1}]).status_code == 400
+
+
+def test_ndjson_stream_matches_the_page(client, loaded):
+    response = client.get('/api/data', query_string={'format': 'ndjson', 'sort': 'id', 'order': 'desc', 'limit': 7},
+                          headers=loaded)
+    lines = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+
+    rows = [row for line in lines if 'rows' in line for row in line['rows']]
+    assert [row['id'] for row in rows] == list(range(25, 18, -1))
+
+
+def test_rows_removed_from_a_compacted_categorical(backend, client, loaded_session):
+    lines = ['id,score,name'] + [f"{i},{i % 4},{['alpha', 'beta'][i % 2]}" for i in range(1, ROWS + 1)]
+    lines.append(f"{ROWS + 1},500,omega")
+    headers = loaded_session(('\n'.join(lines) + '\n').encode())
+    session = backend.session_store.get(headers['X-Session-Id'])
+    assert isinstance(session.data['name'].dtype, pd.CategoricalDtype)
+
+    rules = [{'column': 'score', 'method': 'iqr', 'action': 'remove'}]
+    assert client.post('/api/remove-outliers', json={'rules': rules}, headers=headers).status_code == 200
+
+    assert get_data(client, headers, filters=[{'column': 'name', 'op': 'eq', 'value': 'omega'}]).json['filtered_rows'] == 0
+    names = [row['name'] for row in get_data(client, headers, sort='name', limit=ROWS).json['data']]
+    assert names == sorted(names) and set(names) == {'alpha', 'beta'}
+    analysis = client.post('/api/column-analysis', json={'column': 'name'}, headers=headers).json
+    assert sorted(entry['value'] for entry in analysis['top_frequent_values']) == ['alpha', 'beta']
@@ -0,0 +1,43 @@
+import os
+
+import pandas as pd
+import pytest
+
+SALES_REPORT = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'uploads',
+                            'Sales_Report__Format_20231.xlsx')
+
+
+@pytest.mark.parametrize('chunk_rows', [7, 50000])
+def test_chunked_sheets_match_read_excel(backend, monkeypatch, chunk_rows):
+    monkeypatch.setitem(backend.app.config, 'STREAMING_CHUNK_ROWS', chunk_rows)
+    sheets = backend.list_excel_sheets(SALES_REPORT, 'xlsx')
+    assert sheets == pd.ExcelFile(SALES_REPORT).sheet_names
+
+    for sheet in sheets:
+        expected = pd.read_excel(SALES_REPORT, sheet_name=sheet)
+        pd.testing.assert_frame_equal(backend.read_xlsx_sheet(SALES_REPORT, sheet), expected)
+
+
+def test_sheet_head_matches_read_excel(backend):
+    expected = pd.read_excel(SALES_REPORT, sheet_name='DSR', nrows=5)
+
+    pd.testing.assert_frame_equal(backend.read_xlsx_sheet(SALES_REPORT, 'DSR', nrows=5), expected)
+
+
+def test_later_chunk_of_another_type_falls_back_to_read_excel(backend, tmp_path, monkeypatch):
+    monkeypatch.setitem(backend.app.config, 'STREAMING_CHUNK_ROWS', 2)
+    path = str(tmp_path / 'mixed.xlsx')
+    pd.DataFrame({'code': [1, 2, 3, 'x4', 5], 'when': pd.date_range('2024-01-01', periods=5)}).to_excel(path, index=False)
+
+    with pytest.raises(ValueError):
+        backend.read_xlsx_sheet(path, 'Sheet1')
+    pd.testing.assert_frame_equal(backend.read_excel_sheet(path, 'xlsx', 'Sheet1'), pd.read_excel(path))
+
+
+def test_upload_of_all_sheets(client, upload, headers):
+    with open(SALES_REPORT, 'rb') as f:
+        response = upload(headers, f.read(), filename='sales.xlsx', sheets='*', compact='false')
+
+    assert response.status_code == 200
+    total_rows = sum(len(pd.read_excel(SALES_REPORT, sheet_name=name)) for name in pd.ExcelFile(SALES_REPORT).sheet_names)
+    assert response.json['shape'][0] == total_rows
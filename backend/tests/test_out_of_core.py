@@ -0,0 +1,91 @@
+import pandas as pd
+import pytest
+
+
+@pytest.fixture
+def partitioned(backend, monkeypatch):
+    """Out-of-core uploads split into partitions of two rows"""
+    monkeypatch.setitem(backend.app.config, 'OUT_OF_CORE_PARTITION_ROWS', 2)
+    return backend
+
+
+def out_of_core_dataset(backend, headers):
+    return backend.session_store.get(headers['X-Session-Id']).out_of_core
+
+
+@pytest.mark.parametrize('sniffing', [True, False])
+def test_ambiguous_dates_keep_the_first_partitions_format(partitioned, monkeypatch, upload, headers, sniffing):
+    monkeypatch.setitem(partitioned.app.config, 'SCHEMA_SNIFFING', sniffing)
+    # Only the first partition shows the day comes first; later ones are ambiguous on their own
+    csv = b'day,n\n13/01/2024,1\n05/03/2024,2\n05/03/2024,3\n04/02/2024,4\n01/12/2024,5\n'
+    response = upload(headers, csv, out_of_core='true')
+    assert response.status_code == 200, response.json
+
+    dataset = out_of_core_dataset(partitioned, headers)
+    assert len(dataset.partitions) == 3
+    days = dataset.column('day')
+    assert pd.api.types.is_datetime64_any_dtype(days)
+    assert days.tolist() == list(pd.to_datetime(['2024-01-13', '2024-03-05', '2024-03-05', '2024-02-04', '2024-12-01']))
+
+
+def test_unparseable_dates_in_later_partitions_become_missing(partitioned, monkeypatch, upload, headers):
+    monkeypatch.setitem(partitioned.app.config, 'SCHEMA_SNIFFING', False)
+    csv = b'day,n\n13/01/2024,1\n14/01/2024,2\n2024-03-05,3\n15/01/2024,4\n'
+    assert upload(headers, csv, out_of_core='true').status_code == 200
+
+    days = out_of_core_dataset(partitioned, headers).column('day')
+    assert days.isna().tolist() == [False, False, True, False]
+
+
+# Duplicates and gaps straddle partition boundaries: rows 1/2, 3/4, 5/6 and 7/8 are split across partitions
+GAPPY_CSV = b'id,score,team\n1,10,red\n2,,blue\n2,,blue\n3,,\n4,40,red\n1,10,red\n5,,green\n6,60,\n'
+
+
+def loaded_both_ways(loaded_session, content):
+    """Headers of an in-memory session and an out-of-core session holding the same CSV"""
+    return loaded_session(content, compact='false'), loaded_session(content, out_of_core='true')
+
+
+def test_duplicates_across_partitions_match_in_memory(partitioned, client, loaded_session):
+    in_memory, out_of_core = loaded_both_ways(loaded_session, GAPPY_CSV)
+    assert len(out_of_core_dataset(partitioned, out_of_core).partitions) == 4
+
+    expected = client.post('/api/check-duplicates', json={}, headers=in_memory).json
+    result = client.post('/api/check-duplicates', json={}, headers=out_of_core).json
+
+    for key in ('total_rows', 'unique_count', 'duplicate_count', 'duplicate_percentage'):
+        assert result[key] == expected[key]
+    assert (sorted(example['indices'] for example in result['duplicate_examples'])
+            == [[0, 5], [1, 2]])
+
+
+@pytest.mark.parametrize('rule', [
+    {'column': 'score', 'method': 'mean'},
+    {'column': 'score', 'method': 'median'},
+    {'column': 'team', 'method': 'mode'},
+    {'column': 'score', 'method': 'forward_fill'},
+    {'column': 'score', 'method': 'backward_fill'},
+    {'column': 'team', 'method': 'custom', 'customValue': 'none'},
+], ids=lambda rule: rule['method'])
+def test_imputation_across_partitions_matches_in_memory(partitioned, client, loaded_session, rule):
+    in_memory, out_of_core = loaded_both_ways(loaded_session, GAPPY_CSV)
+
+    for headers in (in_memory, out_of_core):
+        response = client.post('/api/impute-missing', json={'rules': [rule]}, headers=headers)
+        assert response.status_code == 200, response.json
+
+    expected = partitioned.session_store.get(in_memory['X-Session-Id']).data[rule['column']]
+    result = out_of_core_dataset(partitioned, out_of_core).column(rule['column'])
+    assert result.tolist() == expected.tolist()
+
+
+def test_download_of_partitions_matches_in_memory(partitioned, client, loaded_session):
+    in_memory, out_of_core = loaded_both_ways(loaded_session, GAPPY_CSV)
+
+    expected = client.get('/api/download-csv', headers=in_memory)
+    result = client.get('/api/download-csv', headers=out_of_core)
+
+    assert result.status_code == 200
+    assert result.get_data(as_text=True) == expected.get_data(as_text=True)
+    expected.close()
+    result.close()
@@ -0,0 +1,50 @@
+import io
+
+import pandas as pd
+
+FIRST_CSV = b'p,q\n1,2\n3,4\n'
+
+
+def mixed_type_workbook():
+    """An .xlsx whose column mixes ints and text, which pyarrow cannot snapshot"""
+    buffer = io.BytesIO()
+    pd.DataFrame({'m': [1, 'two', 3], 'n': [1.5, 2.5, 3.5]}).to_excel(buffer, index=False)
+    return buffer.getvalue()
+
+
+def test_identical_upload_hits_the_cache(client, upload, headers):
+    content = b'a,b\n1,x\n2,y\n3,z\n'
+    first = upload(headers, content)
+    second = upload(headers, content)
+
+    assert first.json['ingest']['cache_hit'] is False
+    assert second.json['ingest']['cache_hit'] is True
+    assert second.json['shape'] == first.json['shape']
+    assert second.json['columns'] == first.json['columns']
+
+    response = client.post('/api/fix-data-integrity', json={'column': 'a', 'action': 'replace', 'replacement_value': 1},
+                           headers=headers)
+    assert response.status_code == 200, response.json
+
+
+def test_failed_snapshot_is_not_cached(client, upload, headers):
+    assert upload(headers, FIRST_CSV).json['shape'] == [2, 2]
+    workbook = mixed_type_workbook()
+
+    for _ in range(2):
+        response = upload(headers, workbook, filename='mixed.xlsx')
+        assert response.status_code == 200
+        assert response.json['ingest']['cache_hit'] is False
+        assert response.json['shape'] == [3, 2]
+        assert response.json['columns'] == ['m', 'n']
+
+    info = client.get('/api/info', headers=headers).json
+    assert info['shape'] == [3, 2]
+    assert list(info['data_types']) == ['m', 'n']
+
+
+def test_cache_entry_disagreeing_with_its_sidecar_is_ignored(backend):
+    backend.write_snapshot(pd.DataFrame({'p': [1, 2], 'q': [3, 4]}), 'parsed-mismatch',
+                           {'shape': [3, 2], 'columns': ['m', 'n']})
+
+    assert backend.lookup_parsed_cache('parsed-mismatch') is None
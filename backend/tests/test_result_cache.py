@@ -0,0 +1,69 @@
+import pytest
+
+CSV = b'a,b,name\n1,10,x\n,20,y\n3,30,z\n1,10,x\n5,,y\n'
+
+
+@pytest.fixture
+def loaded(loaded_session):
+    return loaded_session(CSV)
+
+
+def endpoint_stats(backend, endpoint):
+    return backend.result_cache.stats()['endpoints'].get(endpoint, {'hits': 0, 'misses': 0})
+
+
+def session_entries(backend, headers):
+    return [key for key in backend.result_cache.entries if key[0] == headers['X-Session-Id']]
+
+
+def test_repeated_request_is_served_from_the_cache(backend, client, loaded):
+    before = endpoint_stats(backend, 'get_data_info')
+    first = client.get('/api/info', headers=loaded)
+    second = client.get('/api/info', headers=loaded)
+    after = endpoint_stats(backend, 'get_data_info')
+
+    assert first.get_data() == second.get_data()
+    assert after['misses'] == before['misses'] + 1
+    assert after['hits'] == before['hits'] + 1
+
+
+def test_parameters_are_part_of_the_key(backend, client, loaded):
+    client.post('/api/detect-outliers', json={'columns': ['a']}, headers=loaded)
+    before = endpoint_stats(backend, 'detect_outliers')
+    client.post('/api/detect-outliers', json={'columns': ['b']}, headers=loaded)
+
+    assert endpoint_stats(backend, 'detect_outliers')['misses'] == before['misses'] + 1
+
+
+def test_column_edit_invalidates_the_session(backend, client, loaded):
+    assert client.get('/api/info', headers=loaded).json['missing_values'] == {'a': 1, 'b': 1}
+    assert session_entries(backend, loaded)
+
+    response = client.post('/api/impute-missing', json={'rules': [{'column': 'a', 'method': 'mean'}]}, headers=loaded)
+    assert response.status_code == 200
+    assert session_entries(backend, loaded) == []
+
+    assert client.get('/api/info', headers=loaded).json['missing_values'] == {'b': 1}
+
+
+def test_row_removal_invalidates_the_session(backend, client, loaded):
+    assert client.get('/api/info', headers=loaded).json['shape'] == [5, 3]
+
+    response = client.post('/api/remove-duplicates', json={}, headers=loaded)
+    assert response.status_code == 200
+    assert session_entries(backend, loaded) == []
+
+    assert client.get('/api/info', headers=loaded).json['shape'] == [4, 3]
+
+
+def test_other_sessions_keep_their_entries(backend, client, upload, loaded, new_headers):
+    other = new_headers()
+    upload(other, CSV)
+    client.get('/api/info', headers=other)
+    client.get('/api/info', headers=loaded)
+
+    client.post('/api/drop-columns', json={'columns': ['name']}, headers=loaded)
+
+    assert session_entries(backend, loaded) == []
+    assert session_entries(backend, other)
+    assert client.get('/api/info', headers=other).json['shape'] == [5, 3]
@@ -0,0 +1,146 @@
+import os
+import time
+
+import pandas as pd
+
+SMALL_CSV = b'a,b\n1,2\n'
+WIDE_CSV = b'x,y,z\n1,2,3\n4,5,6\n'
+
+
+def wait_for_job(client, headers, job_id, timeout=30):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        job = client.get(f'/api/upload-jobs/{job_id}', headers=headers).json
+        if job['status'] != 'running':
+            return job
+        time.sleep(0.05)
+    raise AssertionError(f'upload job {job_id} did not finish')
+
+
+def test_sessions_uploading_the_same_filename_stay_isolated(client, upload, new_headers):
+    first, second = new_headers(), new_headers()
+    assert upload(first, SMALL_CSV, filename='data.csv').json['shape'] == [1, 2]
+    assert upload(second, WIDE_CSV, filename='data.csv').json['shape'] == [2, 3]
+
+    assert client.get('/api/info', headers=first).json['shape'] == [1, 2]
+    assert client.get('/api/info', headers=second).json['shape'] == [2, 3]
+
+
+def test_background_jobs_with_the_same_filename_stay_isolated(client, upload, new_headers):
+    first, second = new_headers(), new_headers()
+    jobs = [
+        (first, upload(first, SMALL_CSV, filename='data.csv', **{'async': 'true'}).json['job_id']),
+        (second, upload(second, WIDE_CSV, filename='data.csv', **{'async': 'true'}).json['job_id']),
+    ]
+    for headers, job_id in jobs:
+        assert wait_for_job(client, headers, job_id)['status'] == 'completed'
+
+    assert client.get('/api/info', headers=first).json['shape'] == [1, 2]
+    assert client.get('/api/info', headers=second).json['shape'] == [2, 3]
+
+
+def test_edits_stay_in_their_session(client, upload, new_headers):
+    first, second = new_headers(), new_headers()
+    upload(first, WIDE_CSV)
+    upload(second, WIDE_CSV)
+
+    response = client.post('/api/drop-columns', json={'columns': ['z']}, headers=first)
+    assert response.status_code == 200
+
+    assert client.get('/api/info', headers=first).json['shape'] == [2, 2]
+    assert client.get('/api/info', headers=second).json['shape'] == [2, 3]
+
+
+def test_saved_uploads_are_per_session_and_removed_after_parsing(backend, upload, headers):
+    upload(headers, SMALL_CSV, filename='data.csv')
+
+    session_folder = os.path.join('uploads', 'sessions', headers['X-Session-Id'])
+    assert os.path.isdir(session_folder)
+    assert os.listdir(session_folder) == []
+    assert not os.path.exists(os.path.join('uploads', 'data.csv'))
+
+
+def test_session_in_use_is_never_spilled_or_evicted(backend, upload, headers):
+    upload(headers, SMALL_CSV)
+    session = backend.session_store.get(headers['X-Session-Id'], acquire=True)
+    try:
+        assert not backend.session_store.spill(session)
+        assert not backend.session_store.evict(session)
+        assert session.data is not None
+    finally:
+        backend.session_store.release(session)
+
+    assert backend.session_store.spill(session)
+    assert session.data is None
+
+
+def test_idle_sessions_are_evicted_and_rebuilt_from_disk(backend, client, upload, headers, monkeypatch):
+    upload(headers, WIDE_CSV)
+    client.post('/api/drop-columns', json={'columns': ['z']}, headers=headers)
+    store = backend.session_store
+    session = store.get(headers['X-Session-Id'])
+    session.last_access -= 24 * 60 * 60
+
+    store.enforce_budget()
+
+    assert session.evicted
+    assert headers['X-Session-Id'] not in store.sessions
+    info = client.get('/api/info', headers=headers).json
+    assert info['shape'] == [2, 2]
+    assert store.get(headers['X-Session-Id']) is not session
+
+
+def test_lookup_racing_an_eviction_gets_the_rebuilt_session(backend, upload, headers):
+    upload(headers, SMALL_CSV)
+    store = backend.session_store
+    stale = store.get(headers['X-Session-Id'])
+    assert store.spill(stale)
+    lookup = store._lookup
+
+    def lookup_then_evict(session_id):
+        # The session is evicted after the lookup found it but before the caller locked it
+        session = lookup(session_id)
+        if session is stale:
+            store.evict(session)
+        return session
+
+    store._lookup = lookup_then_evict
+    try:
+        session = store.get(headers['X-Session-Id'], acquire=True)
+    finally:
+        del store._lookup
+    try:
+        assert session is not stale
+        assert not session.evicted
+        assert session.data.shape == (1, 2)
+    finally:
+        store.release(session)
+
+
+def test_saved_and_downloaded_files_are_per_session(client, upload, new_headers):
+    first, second = new_headers(), new_headers()
+    upload(first, SMALL_CSV, filename='data.csv')
+    upload(second, WIDE_CSV, filename='data.csv')
+
+    saved = [client.post('/api/save-changes', json={}, headers=headers).json['summary']['saved_path']
+             for headers in (first, second)]
+    assert saved[0] != saved[1]
+    assert pd.read_csv(saved[0]).shape == (1, 2)
+    assert pd.read_csv(saved[1]).shape == (2, 3)
+
+    downloads = [client.get('/api/download-csv', headers=headers) for headers in (first, second)]
+    assert [response.get_data(as_text=True).splitlines()[0] for response in downloads] == ['a,b', 'x,y,z']
+    for response in downloads:
+        response.close()
+    for headers in (first, second):
+        folder = os.path.join('uploads', 'sessions', headers['X-Session-Id'], 'cleaned')
+        assert os.listdir(folder) == ['data.csv']
+
+
+def test_save_changes_keeps_the_filename_inside_the_session(client, upload, headers):
+    upload(headers, SMALL_CSV)
+
+    summary = client.post('/api/save-changes', json={'filename': '../../escape.csv'}, headers=headers).json['summary']
+
+    folder = os.path.join('uploads', 'sessions', headers['X-Session-Id'], 'cleaned')
+    assert os.path.dirname(summary['saved_path']) == folder
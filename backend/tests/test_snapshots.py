@@ -0,0 +1,67 @@
+import pandas as pd
+import pytest
+
+SAMPLE_CSV = b'a,b,c\n1,x,2021-01-05\n2,y,2021-02-06\n3,x,2021-03-07\n4,z,\n'
+
+
+@pytest.fixture
+def frame():
+    return pd.DataFrame({
+        'int': [1, 2, 3, 4],
+        'float': [1.5, None, 3.5, 4.5],
+        'text': ['a', None, 'c', 'd'],
+        'category': pd.Categorical(['x', 'y', 'x', 'y']),
+        'date': pd.to_datetime(['2021-01-01', None, '2021-01-03', '2021-01-04']),
+        'nullable': pd.array([1, None, 3, 4], dtype='Int64'),
+        'flag': [True, False, True, False],
+    })
+
+
+def test_snapshot_round_trip_keeps_values_and_dtypes(backend, frame):
+    assert backend.write_snapshot(frame, 'round-trip')
+    restored, meta = backend.read_snapshot('round-trip')
+
+    pd.testing.assert_frame_equal(restored, frame)
+    assert meta['shape'] == [4, 7]
+    assert meta['columns'] == list(frame.columns)
+
+
+def test_restored_snapshot_can_be_edited_in_place(backend, frame):
+    backend.write_snapshot(frame, 'editable')
+    restored, _ = backend.read_snapshot('editable')
+
+    for column in restored.columns:
+        restored.loc[0, column] = restored[column].iloc[2]
+        restored[column].fillna(restored[column].iloc[0], inplace=True)
+    assert restored.notna().all().all()
+
+
+def test_snapshot_column_subset(backend, frame):
+    backend.write_snapshot(frame, 'subset')
+    restored, _ = backend.read_snapshot('subset', columns=['float', 'date'])
+
+    pd.testing.assert_frame_equal(restored, frame[['float', 'date']])
+
+
+def test_edit_after_restore_snapshot_endpoint(client, upload, headers):
+    assert upload(headers, SAMPLE_CSV).status_code == 200
+
+    response = client.post('/api/restore-snapshot', json={}, headers=headers)
+    assert response.status_code == 200
+
+    response = client.post('/api/fix-data-integrity', json={'column': 'a', 'action': 'replace', 'replacement_value': 1},
+                           headers=headers)
+    assert response.status_code == 200, response.json
+
+
+def test_edit_after_spilled_session_reloads(backend, client, upload, headers):
+    assert upload(headers, SAMPLE_CSV).status_code == 200
+    session = backend.session_store.get(headers['X-Session-Id'])
+    assert backend.session_store.spill(session)
+
+    response = client.post('/api/impute-missing', json={'rules': [{'column': 'c', 'method': 'forward_fill'}]},
+                           headers=headers)
+    assert response.status_code == 200, response.json
+    response = client.post('/api/fix-data-integrity', json={'column': 'a', 'action': 'replace', 'replacement_value': 1},
+                           headers=headers)
+    assert response.status_code == 200, response.json
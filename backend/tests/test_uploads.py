@@ -0,0 +1,170 @@
+import gzip
+import hashlib
+import io
+import json
+import time
+import zipfile
+
+import pytest
+
+
+def wide_csv(rows):
+    return ('a,b\n' + ''.join(f'{i},{i * 2}\n' for i in range(rows))).encode()
+
+
+def test_only_upload_routes_accept_large_bodies(backend, client, upload, headers, monkeypatch):
+    monkeypatch.setitem(backend.app.config, 'MAX_CONTENT_LENGTH', 1024)
+    monkeypatch.setitem(backend.app.config, 'UPLOAD_MAX_CONTENT_LENGTH', 64 * 1024)
+
+    assert upload(headers, wide_csv(500)).json['shape'] == [500, 2]
+
+    body = json.dumps({'column': 'a', 'padding': 'x' * 4096})
+    response = client.post('/api/column-analysis', data=body, content_type='application/json', headers=headers)
+    assert response.status_code == 413
+
+
+def test_uploads_over_the_upload_limit_are_rejected(backend, upload, headers, monkeypatch):
+    monkeypatch.setitem(backend.app.config, 'UPLOAD_MAX_CONTENT_LENGTH', 1024)
+
+    assert upload(headers, wide_csv(500)).status_code == 413
+
+
+def start_chunked_upload(client, headers, content, chunk_size):
+    response = client.post('/api/uploads', json={'filename': 'data.csv', 'size': len(content), 'chunk_size': chunk_size},
+                           headers=headers)
+    assert response.status_code == 201
+    return response.json
+
+
+def send_chunk(client, headers, upload, content, index):
+    start = index * upload['chunk_size']
+    return client.put(f"/api/uploads/{upload['upload_id']}/chunks/{index}", data=content[start:start + upload['chunk_size']],
+                      content_type='application/octet-stream', headers=headers)
+
+
+def test_chunked_upload_routes_refuse_other_sessions(client, new_headers):
+    owner, other = new_headers(), new_headers()
+    content = wide_csv(20)
+    upload = start_chunked_upload(client, owner, content, chunk_size=64)
+    upload_url = f"/api/uploads/{upload['upload_id']}"
+
+    assert client.get(upload_url, headers=other).status_code == 403
+    assert send_chunk(client, other, upload, content, 0).status_code == 403
+    assert client.post(f'{upload_url}/finalize', headers=other).status_code == 403
+    assert client.get(upload_url, headers=owner).json['received_chunks'] == []
+
+
+def test_chunked_upload_is_hashed_as_chunks_arrive(backend, client, headers):
+    content = wide_csv(40)
+    upload = start_chunked_upload(client, headers, content, chunk_size=64)
+    digests = backend.chunked_upload_digests
+
+    for index in (0, 2):
+        assert send_chunk(client, headers, upload, content, index).status_code == 200
+    assert digests[upload['upload_id']]['next_chunk'] == 1
+    for index in [1] + list(range(3, upload['total_chunks'])):
+        assert send_chunk(client, headers, upload, content, index).status_code == 200
+    assert digests[upload['upload_id']]['next_chunk'] == upload['total_chunks']
+
+    response = client.post(f"/api/uploads/{upload['upload_id']}/finalize", headers=headers)
+    assert response.status_code == 200
+    assert response.json['content_hash'] == hashlib.sha256(content).hexdigest()
+    assert response.json['shape'] == [40, 2]
+    assert upload['upload_id'] not in digests
+
+
+def test_resent_chunk_restarts_the_digest(backend, client, headers):
+    content = wide_csv(40)
+    upload = start_chunked_upload(client, headers, content, chunk_size=64)
+    for index in range(upload['total_chunks']):
+        assert send_chunk(client, headers, upload, content, index).status_code == 200
+    assert send_chunk(client, headers, upload, content, 1).status_code == 200
+
+    response = client.post(f"/api/uploads/{upload['upload_id']}/finalize", headers=headers)
+    assert response.json['content_hash'] == hashlib.sha256(content).hexdigest()
+
+
+def test_only_background_uploads_publish_a_provisional_frame(backend, client, upload, headers, monkeypatch):
+    monkeypatch.setitem(backend.app.config, 'PROGRESSIVE_MIN_MB', 0)
+    published = []
+    monkeypatch.setattr(backend, 'publish_provisional_frame', lambda *args, **kwargs: published.append(args[2]))
+
+    assert upload(headers, wide_csv(50)).status_code == 200
+    assert published == []
+
+    # Different content, so the parsed cache does not answer the second upload
+    job_id = upload(headers, wide_csv(60), **{'async': 'true'}).json['job_id']
+    deadline = time.time() + 30
+    while client.get(f'/api/upload-jobs/{job_id}', headers=headers).json['status'] == 'running':
+        assert time.time() < deadline
+        time.sleep(0.05)
+    assert published == ['csv']
+
+
+def compressed(content, kind):
+    if kind == 'csv.gz':
+        return gzip.compress(content)
+    if kind == 'csv.zst':
+        zstandard = pytest.importorskip('zstandard')
+        return zstandard.ZstdCompressor().compress(content)
+    archive = io.BytesIO()
+    with zipfile.ZipFile(archive, 'w') as zipped:
+        zipped.writestr('__MACOSX/._data.csv', b'resource fork')
+        zipped.writestr('export/data.csv', content)
+    return archive.getvalue()
+
+
+@pytest.mark.parametrize('kind', ['csv.gz', 'csv.zst', 'zip'])
+@pytest.mark.parametrize('out_of_core', ['false', 'true'])
+def test_compressed_uploads_match_plain_ones(backend, client, loaded_session, kind, out_of_core):
+    content = wide_csv(120)
+    plain = loaded_session(content)
+    packed = loaded_session(compressed(content, kind), filename=f'data.{kind}', out_of_core=out_of_core)
+
+    def downloaded(headers):
+        response = client.get('/api/download-csv', headers=headers)
+        body = response.get_data(as_text=True)
+        response.close()
+        return body
+
+    assert client.get('/api/info', headers=packed).json['shape'] == [120, 2]
+    assert downloaded(packed) == downloaded(plain)
+
+
+def test_chunked_upload_resumes_from_missing_chunks(client, headers):
+    content = wide_csv(40)
+    upload = start_chunked_upload(client, headers, content, chunk_size=50)
+    upload_url = f"/api/uploads/{upload['upload_id']}"
+    sent = [0, 3, 4]
+    for index in sent:
+        assert send_chunk(client, headers, upload, content, index).status_code == 200
+
+    early = client.post(f'{upload_url}/finalize', headers=headers)
+    status = client.get(upload_url, headers=headers).json
+    missing = [index for index in range(upload['total_chunks']) if index not in sent]
+    assert early.status_code == 409
+    assert early.json['missing_chunks'] == missing
+    assert status['missing_chunks'] == missing
+    assert status['received_chunks'] == sent
+
+    # A resuming client sends only what the status reports as missing
+    for index in status['missing_chunks']:
+        assert send_chunk(client, headers, upload, content, index).status_code == 200
+    assert client.get(upload_url, headers=headers).json['complete']
+
+    response = client.post(f'{upload_url}/finalize', headers=headers)
+    assert response.status_code == 200
+    assert response.json['shape'] == [40, 2]
+    assert client.get(upload_url, headers=headers).status_code == 404
+    assert client.post(f'{upload_url}/finalize', headers=headers).status_code == 404
+
+
+def test_chunk_with_a_bad_checksum_is_not_recorded(client, headers):
+    content = wide_csv(10)
+    upload = start_chunked_upload(client, headers, content, chunk_size=32)
+
+    response = client.put(f"/api/uploads/{upload['upload_id']}/chunks/0", data=content[:32],
+                          headers={**headers, 'X-Chunk-Sha256': hashlib.sha256(b'other').hexdigest()},
+                          content_type='application/octet-stream')
+    assert response.status_code == 400
+    assert client.get(f"/api/uploads/{upload['upload_id']}", headers=headers).json['received_chunks'] == []
@@ -10,6 +10,8 @@ const DataPreview = ({ fileInfo, onDataLoad }) => {
   const [showFullData, setShowFullData] = useState(false);
   const [currentPage, setCurrentPage] = useState(1);
   const [rowsPerPage] = useState(50);
+  const [sortColumn, setSortColumn] = useState(null);
+  const [sortOrder, setSortOrder] = useState('asc');
 
   // Safety check for fileInfo
   const safeFileInfo = fileInfo || {};
@@ -37,6 +39,7 @@ const DataPreview = ({ fileInfo, onDataLoad }) => {
     try {
       setLoading(true);
       setError(null);
+      setFullData(null);
       const response = await axios.get(`${API_BASE_URL}/preview`);
       
       if (response.data && response.data.data && response.data.columns) {
@@ -55,19 +58,23 @@ const DataPreview = ({ fileInfo, onDataLoad }) => {
     }
   };
 
-  const loadFullData = async () => {
-    if (fullData) {
-      setShowFullData(true);
-      return;
-    }
-
+  // The server sorts and slices the dataset, so only one page is ever transferred
+  const loadPage = async (page, sort = sortColumn, order = sortOrder) => {
     try {
-      setLoading(true);
       setError(null);
-      const response = await axios.get(`${API_BASE_URL}/data`);
+      const response = await axios.get(`${API_BASE_URL}/data`, {
+        params: {
+          offset: (page - 1) * rowsPerPage,
+          limit: rowsPerPage,
+          ...(sort ? { sort, order } : {})
+        }
+      });
       
       if (response.data && response.data.data && response.data.columns) {
         setFullData(response.data);
+        setCurrentPage(page);
+        setSortColumn(sort);
+        setSortOrder(order);
         setShowFullData(true);
       } else {
         setError('Invalid full data format received from server');
@@ -75,11 +82,25 @@ const DataPreview = ({ fileInfo, onDataLoad }) => {
     } catch (err) {
       setError(err.response?.data?.error || 'Error loading full data');
       console.error('Full data error:', err);
-    } finally {
-      setLoading(false);
     }
   };
 
+  const loadFullData = async () => {
+    if (fullData) {
+      setShowFullData(true);
+      return;
+    }
+
+    setLoading(true);
+    await loadPage(1);
+    setLoading(false);
+  };
+
+  const toggleSort = (column) => {
+    const order = sortColumn === column && sortOrder === 'asc' ? 'desc' : 'asc';
+    loadPage(1, column, order);
+  };
+
   const renderTable = (data, columns, isPreview = false) => {
     if (!data || !columns || !Array.isArray(data) || !Array.isArray(columns)) return null;
 
@@ -87,11 +108,8 @@ const DataPreview = ({ fileInfo, onDataLoad }) => {
     let displayData = data;
     let totalPages = 1;
     
-    if (!isPreview && showFullData && data.length > 0) {
-      const startIndex = (currentPage - 1) * rowsPerPage;
-      const endIndex = startIndex + rowsPerPage;
-      displayData = data.slice(startIndex, endIndex);
-      totalPages = Math.ceil(data.length / rowsPerPage);
+    if (!isPreview && showFullData && fullData) {
+      totalPages = Math.ceil((fullData.filtered_rows ?? fullData.total_rows ?? data.length) / rowsPerPage);
     }
 
     return (
@@ -108,8 +126,13 @@ const DataPreview = ({ fileInfo, onDataLoad }) => {
               <tr>
                 {!isPreview && <th style={{ width: '60px' }}>#</th>}
                 {columns.map((col, index) => (
-                  <th key={index} style={{ minWidth: '120px', whiteSpace: 'nowrap' }}>
+                  <th
+                    key={index}
+                    style={{ minWidth: '120px', whiteSpace: 'nowrap', cursor: isPreview ? 'default' : 'pointer' }}
+                    onClick={isPreview ? undefined : () => toggleSort(col)}
+                  >
                     {col}
+                    {!isPreview && sortColumn === col && (sortOrder === 'asc' ? ' ▲' : ' ▼')}
                   </th>
                 ))}
               </tr>
@@ -161,7 +184,7 @@ const DataPreview = ({ fileInfo, onDataLoad }) => {
           }}>
             <button 
               className="btn btn-secondary"
-              onClick={() => setCurrentPage(prev => Math.max(1, prev - 1))}
+              onClick={() => loadPage(Math.max(1, currentPage - 1))}
               disabled={currentPage === 1}
             >
               Previous
@@ -171,7 +194,7 @@ const DataPreview = ({ fileInfo, onDataLoad }) => {
             </span>
             <button 
               className="btn btn-secondary"
-              onClick={() => setCurrentPage(prev => Math.min(totalPages, prev + 1))}
+              onClick={() => loadPage(Math.min(totalPages, currentPage + 1))}
               disabled={currentPage === totalPages}
             >
               Next
@@ -263,7 +286,7 @@ const DataPreview = ({ fileInfo, onDataLoad }) => {
           </h3>
           {renderTable(fullData.data, fullData.columns, false)}
           <div style={{ marginTop: '1rem', color: '#4a5568', textAlign: 'center' }}>
-            Showing {Math.min(rowsPerPage, (fullData.data?.length || 0) - (currentPage - 1) * rowsPerPage)} 
+            Showing {fullData.data?.length || 0} 
             of {fullData.total_rows || fullData.data?.length || 0} rows
           </div>
         </>
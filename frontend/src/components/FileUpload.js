@@ -3,6 +3,57 @@ import { useDropzone } from 'react-dropzone';
 import axios from 'axios';
 import API_BASE_URL from '../config';
 
+// Files above this size are sent as resumable chunks instead of one multipart request
+const CHUNKED_UPLOAD_THRESHOLD = 16 * 1024 * 1024;
+const CHUNK_RETRIES = 3;
+
+// The upload id is kept per file so a retry after a dropped connection or a reload only sends missing chunks
+const resumableUploadKey = (file) => `datawash-upload:${file.name}:${file.size}:${file.lastModified}`;
+
+const uploadInChunks = async (file) => {
+  const uploadKey = resumableUploadKey(file);
+  let upload = null;
+
+  const savedUploadId = window.sessionStorage.getItem(uploadKey);
+  if (savedUploadId) {
+    try {
+      ({ data: upload } = await axios.get(`${API_BASE_URL}/uploads/${savedUploadId}`));
+    } catch (err) {
+      // Expired, already finalized or started by another session: begin again
+      window.sessionStorage.removeItem(uploadKey);
+    }
+  }
+
+  if (!upload) {
+    ({ data: upload } = await axios.post(`${API_BASE_URL}/uploads`, {
+      filename: file.name,
+      size: file.size
+    }));
+    window.sessionStorage.setItem(uploadKey, upload.upload_id);
+  }
+
+  for (const index of upload.missing_chunks) {
+    const start = index * upload.chunk_size;
+    const chunk = file.slice(start, Math.min(start + upload.chunk_size, file.size));
+    for (let attempt = 1; ; attempt++) {
+      try {
+        await axios.put(`${API_BASE_URL}/uploads/${upload.upload_id}/chunks/${index}`, chunk, {
+          headers: { 'Content-Type': 'application/octet-stream' },
+          timeout: 120000
+        });
+        break;
+      } catch (err) {
+        // A dropped connection only costs this chunk, not the whole transfer
+        if (attempt >= CHUNK_RETRIES) throw err;
+      }
+    }
+  }
+
+  const response = await axios.post(`${API_BASE_URL}/uploads/${upload.upload_id}/finalize`, null, { timeout: 120000 });
+  window.sessionStorage.removeItem(uploadKey);
+  return response;
+};
+
 const FileUpload = ({ onFileUpload }) => {
   const [uploading, setUploading] = useState(false);
   const [error, setError] = useState(null);
@@ -19,8 +70,8 @@ const FileUpload = ({ onFileUpload }) => {
       'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
     ];
     
-    if (!allowedTypes.includes(file.type) && !file.name.match(/\.(csv|xlsx|xls)$/i)) {
-      setError('Please upload a CSV or Excel file');
+    if (!allowedTypes.includes(file.type) && !file.name.match(/\.(csv|xlsx|xls|csv\.gz|csv\.zst|zip)$/i)) {
+      setError('Please upload a CSV or Excel file (CSV may be .gz, .zst or .zip compressed)');
       return;
     }
 
@@ -32,14 +83,16 @@ const FileUpload = ({ onFileUpload }) => {
     formData.append('file', file);
 
     try {
-      const response = await axios.post(`${API_BASE_URL}/upload`, formData, {
-        headers: {
-          'Content-Type': 'multipart/form-data',
-        },
-        timeout: 120000, // 2 minutes timeout for large files
-        maxContentLength: 100 * 1024 * 1024, // 100MB max
-        maxBodyLength: 100 * 1024 * 1024, // 100MB max
-      });
+      const response = file.size > CHUNKED_UPLOAD_THRESHOLD
+        ? await uploadInChunks(file)
+        : await axios.post(`${API_BASE_URL}/upload`, formData, {
+          headers: {
+            'Content-Type': 'multipart/form-data',
+          },
+          timeout: 120000, // 2 minutes timeout for large files
+          maxContentLength: 100 * 1024 * 1024, // 100MB max
+          maxBodyLength: 100 * 1024 * 1024, // 100MB max
+        });
 
       setSuccess(true);
       onFileUpload(response.data);
@@ -54,6 +107,9 @@ const FileUpload = ({ onFileUpload }) => {
     onDrop,
     accept: {
       'text/csv': ['.csv'],
+      'application/gzip': ['.gz'],
+      'application/zstd': ['.zst'],
+      'application/zip': ['.zip'],
       'application/vnd.ms-excel': ['.xls'],
       'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet': ['.xlsx']
     },
@@ -107,7 +163,7 @@ const FileUpload = ({ onFileUpload }) => {
             <div style={{ display: 'flex', gap: '2rem', marginTop: '1rem' }}>
               <div style={{ textAlign: 'center' }}>
                 <div style={{ fontSize: '2rem' }}>📋</div>
-                <p style={{ color: '#718096', fontSize: '0.9rem' }}>CSV Files</p>
+                <p style={{ color: '#718096', fontSize: '0.9rem' }}>CSV Files (.gz, .zst, .zip)</p>
               </div>
               <div style={{ textAlign: 'center' }}>
                 <div style={{ fontSize: '2rem' }}>📑</div>
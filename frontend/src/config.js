@@ -1,5 +1,18 @@
-const API_BASE_URL = process.env.NODE_ENV === 'production' 
-  ? '/api' 
+import axios from 'axios';
+
+const API_BASE_URL = process.env.NODE_ENV === 'production'
+  ? '/api'
   : 'http://localhost:5000/api';
 
-export default API_BASE_URL;
\ No newline at end of file
+// Each browser tab works on its own dataset on the server
+const SESSION_STORAGE_KEY = 'datawash-session-id';
+
+let sessionId = window.sessionStorage.getItem(SESSION_STORAGE_KEY);
+if (!sessionId) {
+  sessionId = Date.now().toString(36) + Math.random().toString(36).slice(2, 10);
+  window.sessionStorage.setItem(SESSION_STORAGE_KEY, sessionId);
+}
+
+axios.defaults.headers.common['X-Session-Id'] = sessionId;
+
+export default API_BASE_URL;